@@ -0,0 +1,87 @@
+"""Add indexes for router filters and joins
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_appointments_date_start_time",
+        "appointments",
+        ["date", "start_time"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_appointments_patient_id_is_paid",
+        "appointments",
+        ["patient_id", "is_paid"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_appointments_unpaid",
+        "appointments",
+        ["patient_id", "date", "start_time"],
+        unique=False,
+        postgresql_where=sa.text("NOT is_paid"),
+        sqlite_where=sa.text("is_paid = 0"),
+    )
+    op.create_index(
+        op.f("ix_appointments_session_note_id"),
+        "appointments",
+        ["session_note_id"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_session_notes_created_at"),
+        "session_notes",
+        ["created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_session_notes_patient_id_created_at",
+        "session_notes",
+        ["patient_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_payments_payment_date"), "payments", ["payment_date"], unique=False
+    )
+    op.create_index(
+        "ix_payments_patient_id_payment_date",
+        "payments",
+        ["patient_id", "payment_date"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_payment_appointments_appointment_id",
+        "payment_appointments",
+        ["appointment_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_payment_appointments_appointment_id", table_name="payment_appointments"
+    )
+    op.drop_index("ix_payments_patient_id_payment_date", table_name="payments")
+    op.drop_index(op.f("ix_payments_payment_date"), table_name="payments")
+    op.drop_index("ix_session_notes_patient_id_created_at", table_name="session_notes")
+    op.drop_index(op.f("ix_session_notes_created_at"), table_name="session_notes")
+    op.drop_index(op.f("ix_appointments_session_note_id"), table_name="appointments")
+    op.drop_index("ix_appointments_unpaid", table_name="appointments")
+    op.drop_index("ix_appointments_patient_id_is_paid", table_name="appointments")
+    op.drop_index("ix_appointments_date_start_time", table_name="appointments")
@@ -0,0 +1,83 @@
+"""Enforce non-overlapping appointments in the database
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 13:00:00.000000
+
+The old check-then-insert booking could race, so a database may already
+hold overlapping or inverted appointments, which the new constraints
+reject. The upgrade looks for them first and stops with their ids; move,
+shorten or delete them (e.g. with PUT/DELETE /appointments/{id}) and run
+``alembic upgrade head`` again.
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+# Listed in the error message, beyond that only counted
+REPORTED = 50
+
+INVERTED = sa.text(
+    "SELECT id FROM appointments WHERE start_time >= end_time ORDER BY id"
+)
+# Same half-open ranges as the exclusion constraint below
+OVERLAPPING = sa.text(
+    "SELECT a.id, b.id FROM appointments a JOIN appointments b "
+    "ON a.date = b.date AND a.id < b.id "
+    "AND a.start_time < b.end_time AND b.start_time < a.end_time "
+    "AND a.start_time < a.end_time AND b.start_time < b.end_time "
+    "ORDER BY a.id, b.id"
+)
+
+
+def _listed(items: list) -> str:
+    shown = ", ".join(str(item) for item in items[:REPORTED])
+    if len(items) > REPORTED:
+        shown += f" and {len(items) - REPORTED} more"
+    return shown
+
+
+def check_existing_appointments() -> None:
+    bind = op.get_bind()
+    # Includes zero-length ones: the CHECK requires start_time < end_time
+    inverted = bind.execute(INVERTED).scalars().all()
+    overlapping = [f"{a}/{b}" for a, b in bind.execute(OVERLAPPING)]
+    problems = []
+    if inverted:
+        problems.append(f"appointments ending before they start: {_listed(inverted)}")
+    if overlapping:
+        problems.append(f"overlapping appointments (id pairs): {_listed(overlapping)}")
+    if problems:
+        raise RuntimeError(
+            "Cannot add the appointment constraints; fix these rows first, "
+            "then rerun the upgrade:\n  " + "\n  ".join(problems)
+        )
+
+
+def upgrade() -> None:
+    check_existing_appointments()
+    op.create_check_constraint(
+        "ck_appointments_time_order",
+        "appointments",
+        "start_time < end_time",
+    )
+    # A single range expression needs no btree_gist; that extension is only
+    # required once a scalar column (e.g. a therapist id) joins the constraint.
+    op.execute(
+        "ALTER TABLE appointments ADD CONSTRAINT ex_appointments_no_overlap "
+        "EXCLUDE USING gist (tsrange(date + start_time, date + end_time) WITH &&)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE appointments DROP CONSTRAINT ex_appointments_no_overlap")
+    op.drop_constraint("ck_appointments_time_order", "appointments", type_="check")
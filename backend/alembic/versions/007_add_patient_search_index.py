@@ -0,0 +1,34 @@
+"""Add trigram index for fuzzy patient search
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+# Must stay identical to app.models.patient.SEARCH_DOCUMENT_SQL
+SEARCH_DOCUMENT_SQL = (
+    "lower(name || ' ' || coalesce(email, '') || ' ' || "
+    "regexp_replace(coalesce(phone, ''), '[^0-9]', '', 'g'))"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_patients_search_trgm ON patients "
+        f"USING gin (({SEARCH_DOCUMENT_SQL}) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX ix_patients_search_trgm")
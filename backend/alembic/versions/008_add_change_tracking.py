@@ -0,0 +1,81 @@
+"""Add table change counters and updated_at for ETags
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+# Must stay identical to app.models.table_version.TRACKED_TABLES
+TRACKED_TABLES = (
+    "patients",
+    "appointments",
+    "session_notes",
+    "payments",
+    "payment_appointments",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), server_default="0", nullable=False),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+    # Counters start at the current time in microseconds, so a recreated
+    # database does not reuse the ETags of its predecessor
+    for table in TRACKED_TABLES:
+        op.execute(
+            "INSERT INTO table_versions (table_name, version) VALUES "
+            f"('{table}', (extract(epoch FROM now()) * 1000000)::bigint)"
+        )
+
+    for table in ("patients", "appointments"):
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(timezone=True),
+                server_default=sa.text("now()"),
+                nullable=True,
+            ),
+        )
+        op.execute(f"UPDATE {table} SET updated_at = created_at")
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_versions SET version = version + 1
+            WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TRACKED_TABLES:
+        op.execute(
+            f"CREATE TRIGGER tr_{table}_version "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            "FOR EACH STATEMENT EXECUTE PROCEDURE bump_table_version()"
+        )
+
+
+def downgrade() -> None:
+    for table in TRACKED_TABLES:
+        op.execute(f"DROP TRIGGER tr_{table}_version ON {table}")
+    op.execute("DROP FUNCTION bump_table_version()")
+    op.drop_column("appointments", "updated_at")
+    op.drop_column("patients", "updated_at")
+    op.drop_table("table_versions")
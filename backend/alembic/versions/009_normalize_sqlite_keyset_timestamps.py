@@ -0,0 +1,37 @@
+"""Pad second-precision SQLite keyset timestamps
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+# Keyset columns that used to be filled by CURRENT_TIMESTAMP alone
+KEYSET_TIMESTAMPS = (("session_notes", "created_at"), ("payments", "payment_date"))
+
+
+def upgrade() -> None:
+    # SQLite stored CURRENT_TIMESTAMP as "YYYY-MM-DD HH:MM:SS" while bound
+    # cursors carry microseconds, so those rows never equal their own cursor.
+    # PostgreSQL compares real timestamps and needs nothing.
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for table, column in KEYSET_TIMESTAMPS:
+        op.execute(
+            f"UPDATE {table} SET {column} = {column} || '.000000' "
+            f"WHERE length({column}) = 19"
+        )
+
+
+def downgrade() -> None:
+    # The padded values are equivalent; nothing to undo.
+    pass
@@ -3,7 +3,7 @@ Core utilities and configuration for TherapyAssistance backend.
 """
 
 from app.core.config import settings
-from app.core.database import Base, engine, get_db
+from app.core.database import Base, engine, get_db, get_read_db
 from app.core.security import (
     create_access_token,
     verify_password,
@@ -16,6 +16,7 @@ __all__ = [
     "Base",
     "engine",
     "get_db",
+    "get_read_db",
     "create_access_token",
     "verify_password",
     "get_password_hash",
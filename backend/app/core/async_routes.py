@@ -0,0 +1,144 @@
+"""
+Async variants of the sync routers, used when DB_ASYNC is enabled.
+
+Rather than maintaining a second copy of every endpoint, each sync endpoint
+that takes a database session is wrapped in an ``async def`` that receives
+an ``AsyncSession`` and runs the original body through
+``AsyncSession.run_sync``. SQLAlchemy executes that body in a greenlet on
+the event loop and awaits the driver (asyncpg/aiosqlite) for I/O, so a
+request no longer holds a threadpool slot while it waits for the database.
+
+Lazy loads are only possible inside ``run_sync``, so the result is validated
+against the route's response model before leaving it.
+"""
+
+import inspect
+from typing import Any, Callable, Dict
+
+from fastapi import APIRouter, Depends, params
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from app.core.database import get_async_db, get_db, get_read_db
+from app.core.deps import get_current_active_user, get_current_active_user_async
+
+# Sync dependency -> async replacement (replica routing is sync-only, so
+# read-only endpoints use the primary here)
+ASYNC_DEPENDENCIES: Dict[Callable[..., Any], Callable[..., Any]] = {
+    get_db: get_async_db,
+    get_read_db: get_async_db,
+    get_current_active_user: get_current_active_user_async,
+}
+
+# Dependencies that provide a database session to the endpoint
+SESSION_DEPENDENCIES = {get_db, get_read_db}
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    async_router = APIRouter()
+    for route in router.routes:
+        if isinstance(route, APIRoute) and _needs_wrapping(route):
+            _add_async_route(async_router, route)
+        else:
+            async_router.routes.append(route)
+    return async_router
+
+
+def _needs_wrapping(route: APIRoute) -> bool:
+    return _takes_session(route.endpoint)
+
+
+def _takes_session(func: Callable[..., Any]) -> bool:
+    if inspect.iscoroutinefunction(func):
+        return False
+    return any(
+        _dependency(parameter) in SESSION_DEPENDENCIES
+        for parameter in inspect.signature(func).parameters.values()
+    )
+
+
+def _dependency(parameter: inspect.Parameter) -> Any:
+    if isinstance(parameter.default, params.Depends):
+        return parameter.default.dependency
+    return None
+
+
+def _asyncify(
+    func: Callable[..., Any], finish: Callable[[Any], Any] = lambda result: result
+) -> Callable[..., Any]:
+    """
+    ``async def`` twin of ``func`` that takes async dependencies and runs
+    ``func`` (and ``finish`` on its result) inside ``AsyncSession.run_sync``.
+    """
+    signature = inspect.signature(func)
+    session_params = []
+    parameters = []
+    for parameter in signature.parameters.values():
+        dependency = _dependency(parameter)
+        if dependency in SESSION_DEPENDENCIES:
+            session_params.append(parameter.name)
+        if dependency in ASYNC_DEPENDENCIES:
+            parameter = parameter.replace(
+                default=Depends(ASYNC_DEPENDENCIES[dependency]),
+                annotation=inspect.Parameter.empty,
+            )
+        parameters.append(parameter)
+
+    def call_sync(kwargs: Dict[str, Any]) -> Any:
+        for name in session_params:
+            kwargs[name] = kwargs[name].sync_session
+        return finish(func(**kwargs))
+
+    async def async_func(**kwargs: Any) -> Any:
+        session = kwargs[session_params[0]]
+        return await session.run_sync(lambda _: call_sync(kwargs))
+
+    async_func.__signature__ = signature.replace(parameters=parameters)
+    async_func.__name__ = func.__name__
+    async_func.__doc__ = func.__doc__
+    return async_func
+
+
+def _add_async_route(async_router: APIRouter, route: APIRoute) -> None:
+    adapter = TypeAdapter(route.response_model) if route.response_model else None
+
+    def validate(result: Any) -> Any:
+        if adapter is None or isinstance(result, Response):
+            return result
+        return adapter.validate_python(result, from_attributes=True)
+
+    # Route-level dependencies that query (e.g. ETag checks) share the
+    # endpoint's AsyncSession instead of opening a sync one in a thread
+    dependencies = [
+        Depends(_asyncify(dependency.dependency), use_cache=dependency.use_cache)
+        if _takes_session(dependency.dependency)
+        else dependency
+        for dependency in route.dependencies
+    ]
+
+    async_router.add_api_route(
+        route.path,
+        _asyncify(route.endpoint, validate),
+        response_model=route.response_model,
+        status_code=route.status_code,
+        tags=route.tags,
+        dependencies=dependencies,
+        summary=route.summary,
+        description=route.description,
+        response_description=route.response_description,
+        responses=route.responses,
+        deprecated=route.deprecated,
+        methods=route.methods,
+        operation_id=route.operation_id,
+        response_model_include=route.response_model_include,
+        response_model_exclude=route.response_model_exclude,
+        response_model_by_alias=route.response_model_by_alias,
+        response_model_exclude_unset=route.response_model_exclude_unset,
+        response_model_exclude_defaults=route.response_model_exclude_defaults,
+        response_model_exclude_none=route.response_model_exclude_none,
+        include_in_schema=route.include_in_schema,
+        response_class=route.response_class,
+        name=route.name,
+        openapi_extra=route.openapi_extra,
+    )
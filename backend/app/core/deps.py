@@ -1,38 +1,59 @@
-from typing import Optional
-from fastapi import Depends, HTTPException, status
+import hmac
+from typing import Optional, Tuple
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.config import settings
+from app.core.principal_cache import principal_cache
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+def _decode_token(token: str) -> Tuple[str, Optional[float]]:
+    """Return the subject email and ``exp`` claim of a valid token."""
     try:
         payload = jwt.decode(
             token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM]
         )
         email: str = payload.get("sub")
         if email is None:
-            raise credentials_exception
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return email, payload.get("exp")
+
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+) -> User:
+    # Plain `def` on purpose: FastAPI runs sync dependencies in the worker
+    # threadpool, so the blocking user lookup never stalls the event loop.
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
 
+    email, exp = _decode_token(token)
+    generation = principal_cache.generation
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
 
+    # Detach so the instance can be shared by later requests with the same token.
+    db.expunge(user)
+    principal_cache.put(token, user, exp, generation)
     return user
 
 
@@ -42,3 +63,50 @@ async def get_current_active_user(
     if not current_user:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """Async counterpart of get_current_user, used when DB_ASYNC is enabled."""
+    cached_user = principal_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    email, exp = _decode_token(token)
+    generation = principal_cache.generation
+    result = await db.execute(select(User).where(User.email == email))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
+
+    db.expunge(user)
+    principal_cache.put(token, user, exp, generation)
+    return user
+
+
+async def get_current_active_user_async(
+    current_user: User = Depends(get_current_user_async),
+) -> User:
+    if not current_user:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+
+async def require_monitoring_token(authorization: str = Header("")) -> None:
+    """
+    Guard for the operational endpoints: they answer only to
+    ``Authorization: Bearer <MONITORING_TOKEN>``, and not at all without one.
+    async, so the check does not take a threadpool slot.
+    """
+    if not settings.MONITORING_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(
+        token.encode(), settings.MONITORING_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Nieprawidłowy token monitoringu",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
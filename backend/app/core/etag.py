@@ -0,0 +1,106 @@
+"""
+Conditional GET (``ETag`` / ``If-None-Match``) for the read endpoints.
+
+The ETag is computed before the endpoint runs, from data much cheaper
+than the response itself:
+
+* lists use the change counters in ``table_versions``, which database
+  triggers bump on every write to a table; one primary-key lookup covers
+  any number of rows;
+* a single patient or appointment uses its ``updated_at``.
+
+Both are mixed with the request path and query string, so every page,
+filter and cursor gets its own tag. When ``If-None-Match`` matches, the
+dependency answers 304 and no rows are loaded or serialized.
+
+    @router.get("", dependencies=[Depends(table_etag("patients"))])
+"""
+
+import hashlib
+from typing import Any, Callable
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
+from app.core.deps import get_current_active_user
+from app.models.table_version import TableVersion
+from app.models.user import User
+
+# Browsers keep the response but revalidate it before every reuse; shared
+# caches must not store it, the data is behind authentication
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison, as RFC 9110 prescribes for ``If-None-Match``."""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def check_etag(request: Request, response: Response, *parts: Any) -> None:
+    """Answer 304 when the client already has this version, else tag it."""
+    etag = make_etag(request.url.path, request.url.query, *parts)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+def table_etag(*tables: str) -> Callable:
+    """Dependency tagging a response with the versions of ``tables``."""
+
+    def dependency(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_read_db),
+        # Resolved first, so a 304 is never sent to an anonymous client
+        current_user: User = Depends(get_current_active_user),
+    ) -> None:
+        versions = db.execute(
+            select(TableVersion.table_name, TableVersion.version)
+            .where(TableVersion.table_name.in_(tables))
+            .order_by(TableVersion.table_name)
+        ).all()
+        check_etag(request, response, [tuple(row) for row in versions])
+
+    return dependency
+
+
+def row_etag(model: Any, path_param: str) -> Callable:
+    """
+    Dependency tagging a single ``model`` row with its ``updated_at``.
+
+    Does nothing when the row does not exist or the id is malformed; the
+    endpoint then answers 404 or 422 as usual.
+    """
+
+    def dependency(
+        request: Request,
+        response: Response,
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(get_current_active_user),
+    ) -> None:
+        try:
+            row_id = int(request.path_params[path_param])
+        except (KeyError, ValueError):
+            return
+        row = db.execute(select(model.updated_at).where(model.id == row_id)).first()
+        if row is not None:
+            check_etag(request, response, row_id, row.updated_at)
+
+    return dependency
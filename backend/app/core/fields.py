@@ -0,0 +1,59 @@
+"""
+Sparse fieldsets (``?fields=id,name``) for the list endpoints.
+
+The requested fields become a column projection: the query loads only
+those columns (``load_only``), so a list that shows names never reads a
+long ``notes`` or ``content`` column. Rows are returned as dicts with just
+the requested keys; the route sets ``response_model_exclude_unset`` so the
+other fields are left out of the JSON rather than sent as null.
+
+Without ``fields`` every field is returned, as before.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import load_only
+
+FIELDS_DESCRIPTION = "Pola do zwrócenia, rozdzielone przecinkami (domyślnie wszystkie)"
+
+
+class FieldSet:
+    """The fields a list can return; ``always`` are added to every request."""
+
+    def __init__(
+        self, model: Any, fields: Sequence[str], always: Sequence[str] = ("id",)
+    ):
+        self.model = model
+        self.fields = list(fields)
+        self.always = list(always)
+
+    def parse(self, fields: Optional[str]) -> List[str]:
+        if fields is None:
+            return list(self.fields)
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = sorted(set(names) - set(self.fields))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"Nieznane pola: {', '.join(unknown)}; "
+                    f"dostępne: {', '.join(self.fields)}"
+                ),
+            )
+        return [name for name in self.fields if name in self.always or name in names]
+
+    def load_only(self, names: Iterable[str], *columns: Any):
+        """
+        Loader option for ``names``, plus ``columns`` the query needs itself
+        (e.g. the keyset columns a cursor is built from).
+        """
+        attributes = [
+            getattr(self.model, name)
+            for name in names
+            if name in self.model.__table__.columns
+        ]
+        return load_only(*attributes, *columns)
+
+    def pick(self, rows: Iterable[Any], names: Sequence[str]) -> List[Dict[str, Any]]:
+        return [{name: getattr(row, name) for name in names} for row in rows]
@@ -0,0 +1,117 @@
+"""
+Bounded process pool for bcrypt.
+
+Password hashing is CPU bound and would otherwise occupy the AnyIO
+threadpool that every sync endpoint shares. Work is sent to a small,
+dedicated process pool instead, and once ``workers + max_pending`` jobs are
+in flight new ones are rejected with ``PasswordHasherBusy`` so the caller
+can shed load rather than queue indefinitely.
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import (
+    configure_bcrypt_rounds,
+    get_password_hash,
+    verify_and_update_password,
+    verify_password,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full."""
+
+
+def _warm_up() -> None:
+    return None
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_pending
+
+    def start(self) -> None:
+        """Spawn the worker processes up front instead of on the first login."""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_warm_up)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            # Copy before shutdown() clears it. Workers still importing after a
+            # quick restart would otherwise hold up interpreter exit.
+            processes = list((self._executor._processes or {}).values())
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+            self._executor = None
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        return await self._run(
+            verify_and_update_password, plain_password, hashed_password
+        )
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        # Only touched from the event loop thread, so no lock is needed.
+        if self.in_flight >= self.capacity:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self.in_flight += 1
+        try:
+            future = self._get_executor().submit(func, *args)
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next call.
+            self._executor = None
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" keeps the workers free of the parent's threads and
+            # open database connections; the bcrypt cost chosen at startup
+            # is handed over explicitly.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=configure_bcrypt_rounds,
+                initargs=(security.bcrypt_rounds,),
+            )
+        return self._executor
+
+
+password_hasher = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,274 @@
+"""
+Request metrics in the Prometheus text exposition format.
+
+``MetricsMiddleware`` records, per route template (``/patients/{patient_id}``
+rather than the raw path), a latency histogram and a request counter by
+status code, plus a gauge of requests in flight. ``render_metrics`` adds
+point-in-time gauges for the database pools, the threadpool used by sync
+endpoints and the password hashing pool, and renders everything for the
+``/metrics`` endpoint.
+
+Observations happen on the event loop, so the registry needs no locking.
+Each uvicorn worker keeps its own numbers; Prometheus tells them apart by
+the scrape target (or sum them when scraping through a load balancer).
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import anyio.to_thread
+from starlette.routing import Match
+
+from app.core.hashing import password_hasher
+from app.core.pool_metrics import pool_report
+
+# Upper bounds in seconds, the Prometheus client defaults
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    7.5,
+    10.0,
+)
+
+# Requests that matched no route share one label, so scanners probing random
+# paths cannot grow the registry without bound
+UNMATCHED_ROUTE = "unmatched"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self):
+        # One slot per bound plus +Inf; cumulated only when rendered
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.latency: Dict[Tuple[str, str], _Histogram] = {}
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float) -> None:
+        histogram = self.latency.get((method, route))
+        if histogram is None:
+            histogram = self.latency[(method, route)] = _Histogram()
+        histogram.observe(seconds)
+        key = (method, route, str(status))
+        self.requests[key] = self.requests.get(key, 0) + 1
+
+    def reset(self) -> None:
+        self.latency.clear()
+        self.requests.clear()
+
+
+registry = MetricsRegistry()
+
+
+def route_template(scope) -> str:
+    """Path template of the route that handled ``scope``."""
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return UNMATCHED_ROUTE
+    # Endpoints registered under several paths are told apart by matching
+    # the path again; everything else is a dictionary lookup.
+    templates = _endpoint_routes(app).get(endpoint, ())
+    if len(templates) == 1:
+        return templates[0].path
+    for route in templates:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+
+def _endpoint_routes(app) -> dict:
+    routes = getattr(app.state, "metrics_endpoint_routes", None)
+    if routes is None:
+        routes = {}
+        for route in app.routes:
+            endpoint = getattr(route, "endpoint", None)
+            if endpoint is not None and hasattr(route, "path"):
+                routes.setdefault(endpoint, []).append(route)
+        app.state.metrics_endpoint_routes = routes
+    return routes
+
+
+class MetricsMiddleware:
+    """Times every HTTP request and records it under its route template."""
+
+    def __init__(self, app, metrics: MetricsRegistry = registry):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(
+                scope["method"],
+                route_template(scope),
+                status,
+                time.perf_counter() - started,
+            )
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels: str) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, **labels: str) -> None:
+        self.lines.append(f"{name}{_labels(**labels)} {value}")
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _threadpool_gauges() -> Optional[Tuple[float, int]]:
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except RuntimeError:
+        # Not called from the event loop
+        return None
+    return limiter.total_tokens, limiter.borrowed_tokens
+
+
+def render_metrics(metrics: MetricsRegistry = registry) -> str:
+    out = _Exposition()
+
+    out.family(
+        "http_request_duration_seconds",
+        "histogram",
+        "Request latency by route template.",
+    )
+    for (method, route), histogram in sorted(metrics.latency.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS, histogram.buckets):
+            cumulative += count
+            out.sample(
+                "http_request_duration_seconds_bucket",
+                cumulative,
+                method=method,
+                route=route,
+                le=_format_bound(bound),
+            )
+        out.sample(
+            "http_request_duration_seconds_bucket",
+            histogram.count,
+            method=method,
+            route=route,
+            le="+Inf",
+        )
+        out.sample(
+            "http_request_duration_seconds_sum",
+            round(histogram.sum, 6),
+            method=method,
+            route=route,
+        )
+        out.sample(
+            "http_request_duration_seconds_count",
+            histogram.count,
+            method=method,
+            route=route,
+        )
+
+    out.family("http_requests_total", "counter", "Requests by route and status.")
+    for (method, route, status), count in sorted(metrics.requests.items()):
+        out.sample("http_requests_total", count, method=method, route=route, status=status)
+
+    out.family("http_requests_in_flight", "gauge", "Requests being served.")
+    out.sample("http_requests_in_flight", metrics.in_flight)
+
+    pools = pool_report()
+    pool_gauges = (
+        ("db_pool_size", "gauge", "Connections the pool keeps open.", "size"),
+        ("db_pool_checked_out", "gauge", "Connections in use.", "checked_out"),
+        ("db_pool_overflow", "gauge", "Connections above the pool size.", "overflow"),
+        ("db_pool_checkouts_total", "counter", "Connection checkouts.", "checkouts"),
+        ("db_pool_timeouts_total", "counter", "Checkouts that timed out.", "timeouts"),
+    )
+    for name, kind, help_text, key in pool_gauges:
+        out.family(name, kind, help_text)
+        for pool in pools:
+            if key in pool:
+                out.sample(name, pool[key], engine=pool["name"])
+    out.family(
+        "db_pool_wait_seconds_total",
+        "counter",
+        "Time spent waiting for a connection.",
+    )
+    for pool in pools:
+        out.sample(
+            "db_pool_wait_seconds_total",
+            round(pool["wait_ms_total"] / 1000, 6),
+            engine=pool["name"],
+        )
+
+    threadpool = _threadpool_gauges()
+    if threadpool is not None:
+        total, borrowed = threadpool
+        out.family("threadpool_threads", "gauge", "Threads available to sync endpoints.")
+        out.sample("threadpool_threads", total)
+        out.family("threadpool_threads_busy", "gauge", "Threads running sync endpoints.")
+        out.sample("threadpool_threads_busy", borrowed)
+
+    hashing = password_hasher.stats()
+    out.family("password_hash_in_flight", "gauge", "Hashes queued or running.")
+    out.sample("password_hash_in_flight", hashing["in_flight"])
+    out.family("password_hash_rejected_total", "counter", "Hashes rejected as overloaded.")
+    out.sample("password_hash_rejected_total", hashing["rejected"])
+
+    return out.text()
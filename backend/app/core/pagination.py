@@ -0,0 +1,144 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Each list has a stable sort key that ends with the primary key, for
+example ``(payment_date, id)``. A cursor encodes the key of the last row
+on a page, and the next page starts after it:
+
+    WHERE (payment_date, id) < (:last_date, :last_id)
+    ORDER BY payment_date DESC, id DESC LIMIT :limit
+
+That query reads one index range however deep the page is. OFFSET, by
+contrast, has to walk past every skipped row. Cursors are opaque to
+clients: URL-safe base64 of the key values, tagged with the sort they
+belong to. ``skip`` keeps working for clients that page by offset.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from enum import Enum
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+_DECODERS = {
+    int: int,
+    date: date.fromisoformat,
+    time: time.fromisoformat,
+    datetime: datetime.fromisoformat,
+}
+
+
+class TotalMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "none"
+
+
+class Keyset:
+    """Sort key of one list: columns, the Python type of each, direction."""
+
+    def __init__(
+        self,
+        name: str,
+        columns: Sequence[Any],
+        types: Sequence[type],
+        descending: bool = False,
+    ):
+        self.name = name
+        self.columns = list(columns)
+        self.types = list(types)
+        self.descending = descending
+
+    def order_by(self) -> list:
+        if self.descending:
+            return [column.desc() for column in self.columns]
+        return [column.asc() for column in self.columns]
+
+    def encode(self, row: Any) -> str:
+        values = []
+        for column in self.columns:
+            value = getattr(row, column.key)
+            values.append(value.isoformat() if hasattr(value, "isoformat") else value)
+        payload = json.dumps([self.name, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> Tuple[Any, ...]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            name, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if name != self.name or len(values) != len(self.types):
+                raise ValueError(cursor)
+            return tuple(
+                _DECODERS[kind](value) for kind, value in zip(self.types, values)
+            )
+        except (ValueError, TypeError, binascii.Error):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Nieprawidłowy kursor paginacji",
+            )
+
+    def after(self, cursor: str):
+        """Filter selecting the rows that follow ``cursor`` in this order."""
+        key = tuple_(*self.columns)
+        values = tuple_(*self.decode(cursor))
+        return key < values if self.descending else key > values
+
+
+def paginate(
+    query: Query, keyset: Keyset, cursor: Optional[str], skip: int, limit: int
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    One page of ``query`` in keyset order, and the cursor of the next page
+    (None on the last page). With a cursor ``skip`` is ignored.
+    """
+    query = query.order_by(*keyset.order_by())
+    if cursor:
+        query = query.filter(keyset.after(cursor))
+    elif skip:
+        query = query.offset(skip)
+    # One extra row tells whether another page exists
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, keyset.encode(rows[-1])
+
+
+def estimate_count(query: Query) -> Optional[int]:
+    """
+    The planner's row estimate for ``query`` on PostgreSQL, without running
+    it. Returns None on databases without one.
+    """
+    session = query.session
+    connection = session.connection()
+    if connection.dialect.name != "postgresql":
+        return None
+    compiled = query.statement.compile(dialect=connection.dialect)
+    if compiled.positional:
+        parameters = tuple(compiled.params[name] for name in compiled.positiontup)
+    else:
+        parameters = compiled.params
+    plan = connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", parameters
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_total(query: Query, mode: TotalMode) -> Tuple[Optional[int], bool]:
+    """Total for ``mode`` and whether it is an estimate."""
+    if mode == TotalMode.NONE:
+        return None, False
+    if mode == TotalMode.ESTIMATE:
+        estimate = estimate_count(query)
+        if estimate is not None:
+            return estimate, True
+    return query.order_by(None).count(), False
@@ -0,0 +1,124 @@
+"""
+Connection pool instrumentation.
+
+``TimedQueuePool`` and its asyncio twin measure how long each checkout waits
+for a connection, and pool events count connects, checkouts and checkins.
+``pool_report`` feeds the ``/health/pool`` endpoint.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.waits = 0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.wait_seconds_total * 1000, 3),
+                "wait_ms_avg": round(self.wait_seconds_total / self.waits * 1000, 3)
+                if self.waits
+                else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+class _TimedPoolMixin:
+    """Records the time each checkout spends acquiring a connection."""
+
+    stats: Optional[PoolStats] = None
+
+    def connect(self):
+        started = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.record_wait(time.perf_counter() - started, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+_engines: Dict[str, Engine] = {}
+_stats: Dict[str, PoolStats] = {}
+
+
+def instrument_engine(engine: Engine, name: str) -> PoolStats:
+    stats = PoolStats()
+    if isinstance(engine.pool, _TimedPoolMixin):
+        engine.pool.stats = stats
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        stats.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        stats.checkouts += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        stats.checkins += 1
+
+    _engines[name] = engine
+    _stats[name] = stats
+    return stats
+
+
+def pool_report() -> List[dict]:
+    report = []
+    for name, engine in _engines.items():
+        pool = engine.pool
+        entry = {"name": name, "pool_class": type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            entry.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+            )
+        entry.update(_stats[name].as_dict())
+        report.append(entry)
+    return report
@@ -0,0 +1,192 @@
+"""
+On-demand sampling profiler for single requests.
+
+A request carrying ``X-Profile: <PROFILING_TOKEN>`` is profiled, and with
+``PROFILING_EVERY_N`` set every Nth request is profiled as well. While such
+a request runs, a background thread samples the interpreter stacks every
+``PROFILING_INTERVAL_MS`` and the result is written to ``PROFILING_DIR`` in
+the collapsed-stack format read by flamegraph.pl and speedscope. The file
+name is returned in the ``X-Profile-File`` response header; only the newest
+``PROFILING_MAX_FILES`` profiles are kept.
+
+Samples are attributed to the request as follows:
+- the event loop thread counts while the request's task is running on it;
+- threadpool threads count while they run code from the ``app`` package,
+  which is where sync endpoints and dependencies live.
+
+A sync endpoint running concurrently for another request can therefore
+show up as well.
+
+Without a token and with ``PROFILING_EVERY_N=0`` the middleware is not
+installed at all.
+"""
+
+import asyncio
+import hmac
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = str(Path(__file__).resolve().parents[1]) + os.sep
+PROFILE_HEADER = b"x-profile"
+
+
+def _frame_label(frame, path_prefixes) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in path_prefixes:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix) :].lstrip(os.sep)
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples the stacks that belong to one request until stopped."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        # Longest first, so site-packages wins over the stdlib directory
+        self._path_prefixes = sorted(filter(None, sys.path), key=len, reverse=True)
+        self._loop_thread = threading.get_ident()
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.current_task()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="request-profiler", daemon=True
+        )
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> float:
+        self._stopped.set()
+        self._thread.join()
+        return time.perf_counter() - self.started
+
+    def _run(self) -> None:
+        own_thread = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            self.sample_count += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                if thread_id == self._loop_thread:
+                    if asyncio.current_task(self._loop) is not self._task:
+                        continue
+                    self._record(frame)
+                elif self._runs_app_code(frame):
+                    self._record(frame)
+
+    @staticmethod
+    def _runs_app_code(frame) -> bool:
+        while frame is not None:
+            if frame.f_code.co_filename.startswith(APP_DIR):
+                return True
+            frame = frame.f_back
+        return False
+
+    def _record(self, frame) -> None:
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame, self._path_prefixes))
+            frame = frame.f_back
+        self.samples[";".join(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+class ProfilingMiddleware:
+    """Profiles requests that ask for it, and every Nth request if enabled."""
+
+    def __init__(self, app):
+        self.app = app
+        self.token = settings.PROFILING_TOKEN.encode()
+        self.every_n = settings.PROFILING_EVERY_N
+        self.directory = Path(settings.PROFILING_DIR)
+        self._counter = itertools.count(1)
+        self._sequence = itertools.count(1)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        filename = "{}-{}-{}-{}.collapsed".format(
+            time.strftime("%Y%m%dT%H%M%S"),
+            f"{os.getpid()}.{next(self._sequence)}",
+            scope["method"].lower(),
+            scope["path"].strip("/").replace("/", "_") or "root",
+        )
+        sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000)
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-file", filename.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            elapsed = sampler.stop()
+            await run_in_threadpool(self._save, filename, label, elapsed, sampler)
+
+    def _wants_profile(self, scope) -> bool:
+        if self.every_n and next(self._counter) % self.every_n == 0:
+            return True
+        if not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    def _save(
+        self, filename: str, label: str, elapsed: float, sampler: StackSampler
+    ) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / filename).write_text(sampler.collapsed())
+            self._prune()
+        except OSError:
+            logger.exception("Could not write profile %s", filename)
+            return
+        logger.info(
+            "Profiled %s: %.1f ms, %d samples, written to %s",
+            label,
+            elapsed * 1000,
+            sampler.sample_count,
+            self.directory / filename,
+        )
+
+    def _prune(self) -> None:
+        profiles = sorted(
+            self.directory.glob("*.collapsed"), key=lambda path: path.stat().st_mtime
+        )
+        for path in profiles[: max(len(profiles) - settings.PROFILING_MAX_FILES, 0)]:
+            path.unlink(missing_ok=True)
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.PROFILING_TOKEN) or settings.PROFILING_EVERY_N > 0
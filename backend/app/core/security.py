@@ -1,11 +1,17 @@
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Union, Any
+from typing import Optional, Union, Any, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt cost currently applied to pwd_context (None = passlib default)
+bcrypt_rounds: Optional[int] = None
+
+BCRYPT_MAX_ROUNDS = 16
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
@@ -13,7 +19,9 @@ def create_access_token(
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(hours=settings.JWT_EXPIRATION_HOURS)
+        expire = datetime.utcnow() + timedelta(
+            minutes=settings.JWT_ACCESS_EXPIRATION_MINUTES
+        )
 
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(
@@ -26,10 +34,75 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify and, if the stored hash uses an outdated cost, return a new hash."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def configure_bcrypt_rounds(rounds: Optional[int]) -> None:
+    """
+    Hash new passwords with ``rounds`` and flag cheaper hashes for rehashing.
+
+    One step above ``rounds`` is still accepted, so workers whose calibration
+    lands on neighbouring costs do not keep rehashing each other's hashes.
+    """
+    global bcrypt_rounds
+    if rounds is None:
+        return
+    pwd_context.update(
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds + 1,
+    )
+    bcrypt_rounds = rounds
+
+
+def calibrate_bcrypt_rounds(
+    target_ms: float, min_rounds: int, max_rounds: int = BCRYPT_MAX_ROUNDS
+) -> int:
+    """Highest bcrypt cost whose hash time on this machine stays within target_ms."""
+    bcrypt = pwd_context.handler("bcrypt")
+    # Each extra round doubles the work, so time one cheap hash and extrapolate.
+    probe_rounds = 8
+    probe = bcrypt.using(rounds=probe_rounds)
+    probe.hash("calibration")  # warm up the backend
+    elapsed_ms = min(_time_hash_ms(probe) for _ in range(3))
+
+    rounds = min_rounds
+    while (
+        rounds < max_rounds
+        and elapsed_ms * 2 ** (rounds + 1 - probe_rounds) <= target_ms
+    ):
+        rounds += 1
+    return rounds
+
+
+def apply_bcrypt_settings() -> Optional[int]:
+    """Pick the bcrypt cost from settings, calibrating on this host if enabled."""
+    if settings.BCRYPT_CALIBRATE:
+        rounds = calibrate_bcrypt_rounds(
+            settings.BCRYPT_TARGET_MS, settings.BCRYPT_MIN_ROUNDS
+        )
+    elif settings.BCRYPT_ROUNDS:
+        rounds = settings.BCRYPT_ROUNDS
+    else:
+        return None
+    configure_bcrypt_rounds(rounds)
+    return rounds
+
+
+def _time_hash_ms(handler) -> float:
+    started = time.perf_counter()
+    handler.hash("calibration")
+    return (time.perf_counter() - started) * 1000
+
+
 def decode_token(token: str) -> Optional[str]:
     try:
         payload = jwt.decode(
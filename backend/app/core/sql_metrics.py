@@ -0,0 +1,185 @@
+"""
+Per-request SQL statistics.
+
+Cursor events on every ``Engine`` record the statement count, total database
+time and how often each statement shape repeats. ``QueryStatsMiddleware``
+opens a fresh ``QueryStats`` for each HTTP request. The stats are reported
+as a ``Server-Timing`` header, and repeated shapes are logged as probable
+N+1 loads. Statements slower than ``SLOW_QUERY_MS`` go to the slow-query
+log whether or not a request is active.
+
+``query_budget`` collects statements from any thread for the duration of a
+``with`` block. Scripts use it to assert how many queries an endpoint may
+issue.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+# Expanded IN lists and VALUES rows differ only in their placeholder count
+_PLACEHOLDER_LIST = re.compile(
+    r"\(\s*(?:\?|%\(\w+\)s|\$\d+)(?:\s*,\s*(?:\?|%\(\w+\)s|\$\d+))*\s*\)"
+)
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", " ".join(statement.split()))
+
+
+class QueryStats:
+    def __init__(self, label: str = ""):
+        self.label = label
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter = Counter()
+        self.statements: List[str] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, seconds: float, batch: bool = False) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            # Repeated executemany batches are bulk writes, not N+1 loads
+            if not batch:
+                self.shapes[shape] += 1
+            self.statements.append(shape)
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+_budgets: List[QueryStats] = []
+_budgets_lock = threading.Lock()
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    elapsed = time.perf_counter() - started
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed, executemany)
+    if _budgets:
+        with _budgets_lock:
+            for budget in _budgets:
+                budget.record(statement, elapsed, executemany)
+
+    if settings.SLOW_QUERY_MS > 0 and elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        slow_query_logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            elapsed * 1000,
+            stats.label if stats is not None else "background task",
+            " ".join(statement.split())[:2000],
+        )
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(context):
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+class QueryStatsMiddleware:
+    """Collects SQL statistics per request and reports them in Server-Timing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(f"{scope['method']} {scope['path']}")
+        token = _request_stats.set(stats)
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            self._report_repeats(stats)
+
+    @staticmethod
+    def _report_repeats(stats: QueryStats) -> None:
+        threshold = settings.N_PLUS_ONE_THRESHOLD
+        if threshold <= 0:
+            return
+        for shape, count in stats.repeated(threshold):
+            logger.warning(
+                "Possible N+1 in %s: statement ran %d times: %s",
+                stats.label,
+                count,
+                shape[:500],
+            )
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "") -> Iterator[QueryStats]:
+    """
+    Fail when more than ``max_queries`` statements run inside the block.
+
+        with query_budget(3, "GET /patients"):
+            client.get("/patients")
+    """
+    stats = QueryStats(label)
+    with _budgets_lock:
+        _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        with _budgets_lock:
+            _budgets.remove(stats)
+    if stats.count > max_queries:
+        statements = "\n".join(f"  {shape}" for shape in stats.statements)
+        raise QueryBudgetExceeded(
+            f"{label or 'block'} ran {stats.count} queries, budget is "
+            f"{max_queries}:\n{statements}"
+        )
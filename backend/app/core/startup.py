@@ -0,0 +1,106 @@
+"""
+Database work done once per process, from the application lifespan.
+
+Nothing here runs at import time, so importing ``app.main`` (every uvicorn
+worker, every ``--reload`` restart) does not open a connection or reflect
+tables, and a slow database cannot stall the import.
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+import app.models  # noqa: F401  registers every table on Base.metadata
+from app.core.config import settings
+from app.core.database import Base, engine, replica_engines
+
+logger = logging.getLogger(__name__)
+
+ALEMBIC_DIR = Path(__file__).resolve().parents[2] / "alembic"
+
+
+def head_revision() -> Optional[str]:
+    # Alembic is only needed here; keep it out of the import path.
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config()
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    return ScriptDirectory.from_config(config).get_current_head()
+
+
+def current_revision(bind: Engine) -> Optional[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    with bind.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def prepare_database(bind: Engine = engine) -> None:
+    """
+    Compare the database revision with the Alembic head.
+
+    A database without an ``alembic_version`` table is not managed by
+    migrations (local SQLite, benchmarks), so its tables are created
+    directly, as the app used to do on import.
+    """
+    current = current_revision(bind)
+    if current is None:
+        Base.metadata.create_all(bind=bind)
+        logger.info("No Alembic revision found, created missing tables")
+        return
+
+    head = head_revision()
+    if current != head:
+        message = (
+            f"Database schema is at revision {current}, expected {head}; "
+            "run `alembic upgrade head`"
+        )
+        if settings.DB_REQUIRE_HEAD:
+            raise RuntimeError(message)
+        logger.warning(message)
+
+
+def warm_pool(bind: Engine, connections: int) -> int:
+    """Open ``connections`` connections up front and return them to the pool."""
+    if not isinstance(bind.pool, QueuePool) or connections <= 0:
+        return 0
+    opened = []
+    try:
+        for _ in range(min(connections, bind.pool.size())):
+            opened.append(bind.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+def warm_pools() -> None:
+    for bind in (engine, *replica_engines):
+        warmed = warm_pool(bind, settings.DB_POOL_WARM)
+        if warmed:
+            logger.info("Warmed %d connections for %s", warmed, bind.url.database)
+
+
+async def warm_async_pool() -> int:
+    from app.core.database import get_async_engine
+
+    async_engine = get_async_engine()
+    if not isinstance(async_engine.pool, QueuePool) or settings.DB_POOL_WARM <= 0:
+        return 0
+    opened = []
+    try:
+        for _ in range(min(settings.DB_POOL_WARM, async_engine.pool.size())):
+            opened.append(await async_engine.connect().start())
+    finally:
+        for connection in opened:
+            await connection.close()
+    return len(opened)
+
+
+def dispose_engines() -> None:
+    for bind in (engine, *replica_engines):
+        bind.dispose()
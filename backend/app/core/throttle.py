@@ -0,0 +1,70 @@
+"""
+Sliding-window throttle for failed login attempts.
+
+An attempt is reserved before any bcrypt work is scheduled, so a
+brute-force run against one account, sequential or parallel, is rejected
+with 429 without costing a hash.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Optional
+
+from app.core.config import settings
+
+
+class SlidingWindowThrottle:
+    def __init__(self, max_attempts: int, window_seconds: int, max_keys: int = 10000):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._attempts: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str) -> Optional[float]:
+        """
+        Reserve an attempt for ``key`` before hashing. Returns None when the
+        attempt may go ahead, or the seconds until ``key`` may try again.
+
+        The reservation counts toward the window at once, so a parallel
+        burst cannot pass the check before any of its failures is recorded.
+        It stays as the failure if the attempt fails; ``reset`` or
+        ``release`` drop it otherwise.
+        """
+        if self.max_attempts <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts is None:
+                attempts = self._attempts[key] = deque()
+            self._attempts.move_to_end(key)
+            self._prune(attempts, now)
+            if len(attempts) >= self.max_attempts:
+                return attempts[0] + self.window_seconds - now
+            attempts.append(now)
+            while len(self._attempts) > self.max_keys:
+                self._attempts.popitem(last=False)
+            return None
+
+    def release(self, key: str) -> None:
+        """Give back a reservation for an attempt that was never checked."""
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if attempts:
+                attempts.pop()
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._attempts.pop(key, None)
+
+    def _prune(self, attempts: Deque[float], now: float) -> None:
+        while attempts and attempts[0] <= now - self.window_seconds:
+            attempts.popleft()
+
+
+login_throttle = SlidingWindowThrottle(
+    max_attempts=settings.LOGIN_MAX_FAILED_ATTEMPTS,
+    window_seconds=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+)
@@ -1,11 +1,67 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import LAST_WRITE_HEADER, SessionLocal, dispose_async_engine
+from app.core.deps import require_monitoring_token
+from app.core.hashing import password_hasher
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.pool_metrics import pool_report
+from app.core.principal_cache import principal_cache
+from app.core.profiling import ProfilingMiddleware, profiling_enabled
+from app.core.security import apply_bcrypt_settings
+from app.core.sql_metrics import QueryStatsMiddleware
+from app.core.startup import (
+    dispose_engines,
+    prepare_database,
+    warm_async_pool,
+    warm_pools,
+)
 from app.routers import auth, patients, appointments, session_notes, payments
+from app.services.free_slots import parse_working_hours
+from app.services.refresh_tokens import revoked_refresh_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def startup():
+    # A malformed WORKING_HOURS should stop the worker, not fail requests
+    parse_working_hours(settings.WORKING_HOURS)
+    prepare_database()
+    warm_pools()
+
+    # The bcrypt cost must be settled before the pool workers are spawned.
+    rounds = apply_bcrypt_settings()
+    if rounds is not None:
+        logger.info("bcrypt cost set to %d rounds", rounds)
+    password_hasher.start()
+
+    db = SessionLocal()
+    try:
+        revoked_refresh_tokens.load(db)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker, before it accepts requests; nothing touches the
+    # database at import time.
+    await run_in_threadpool(startup)
+    if settings.DB_ASYNC:
+        await warm_async_pool()
+    try:
+        yield
+    finally:
+        password_hasher.shutdown()
+        await dispose_async_engine()
+        dispose_engines()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 # Create FastAPI app
 app = FastAPI(
@@ -14,6 +70,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -23,14 +80,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the next-page cursor of list endpoints, the
+    # ETag to send back in If-None-Match and the last-write marker
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", LAST_WRITE_HEADER],
 )
+app.add_middleware(QueryStatsMiddleware)
+if profiling_enabled():
+    app.add_middleware(ProfilingMiddleware)
+if settings.METRICS_ENABLED:
+    # Added last, so it is the outermost middleware and times all of them
+    app.add_middleware(MetricsMiddleware)
+
+
+def include_routers(app: FastAPI) -> None:
+    app.include_router(auth.router)
+    data_routers = (
+        patients.router,
+        appointments.router,
+        session_notes.router,
+        payments.router,
+    )
+    if settings.DB_ASYNC:
+        # Serve them through AsyncSession instead of the threadpool
+        from app.core.async_routes import asyncify_router
 
-# Include routers
-app.include_router(auth.router)
-app.include_router(patients.router)
-app.include_router(appointments.router)
-app.include_router(session_notes.router)
-app.include_router(payments.router)
+        data_routers = tuple(asyncify_router(router) for router in data_routers)
+    for router in data_routers:
+        app.include_router(router)
+
+
+include_routers(app)
 
 
 @app.get("/")
@@ -45,3 +124,27 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+# Internals of the running worker: only for holders of MONITORING_TOKEN
+monitoring = [Depends(require_monitoring_token)]
+
+
+@app.get("/health/principal-cache", dependencies=monitoring)
+def principal_cache_stats():
+    return principal_cache.stats()
+
+
+@app.get("/health/pool", dependencies=monitoring)
+def pool_health():
+    return {"engines": pool_report()}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False, dependencies=monitoring)
+    async def metrics():
+        # async, so reading the threadpool gauges does not occupy a thread
+        return PlainTextResponse(
+            render_metrics(), media_type="text/plain; version=0.0.4"
+        )
@@ -3,5 +3,16 @@ from app.models.patient import Patient
 from app.models.appointment import Appointment
 from app.models.session_note import SessionNote
 from app.models.payment import Payment, PaymentMethod
+from app.models.refresh_token import RefreshToken
+from app.models.table_version import TableVersion
 
-__all__ = ["User", "Patient", "Appointment", "SessionNote", "Payment", "PaymentMethod"]
+__all__ = [
+    "User",
+    "Patient",
+    "Appointment",
+    "SessionNote",
+    "Payment",
+    "PaymentMethod",
+    "RefreshToken",
+    "TableVersion",
+]
@@ -9,10 +9,21 @@ from sqlalchemy import (
     ForeignKey,
     Boolean,
     Numeric,
+    Index,
+    CheckConstraint,
+    DDL,
+    event,
+    text,
 )
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.table_version import updated_now
+
+# Constraint names, matched by the routers to report a conflict as a 400
+OVERLAP_CONSTRAINT = "ex_appointments_no_overlap"
+TIME_ORDER_CONSTRAINT = "ck_appointments_time_order"
 
 
 class Appointment(Base):
@@ -23,10 +34,41 @@ class Appointment(Base):
     date = Column(Date, nullable=False)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
-    session_note_id = Column(Integer, ForeignKey("session_notes.id"), nullable=True)
+    session_note_id = Column(
+        Integer, ForeignKey("session_notes.id"), nullable=True, index=True
+    )
     is_paid = Column(Boolean, default=False, nullable=False)
     price = Column(Numeric(10, 2), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=updated_now,
+        server_default=func.now(),
+        onupdate=updated_now,
+    )
+
+    __table_args__ = (
+        # Date range listings and the overlap check
+        Index("ix_appointments_date_start_time", "date", "start_time"),
+        Index("ix_appointments_patient_id_is_paid", "patient_id", "is_paid"),
+        # Unpaid appointments of a patient, in calendar order
+        Index(
+            "ix_appointments_unpaid",
+            "patient_id",
+            "date",
+            "start_time",
+            postgresql_where=text("NOT is_paid"),
+            sqlite_where=text("is_paid = 0"),
+        ),
+        CheckConstraint("start_time < end_time", name=TIME_ORDER_CONSTRAINT),
+        # No two appointments may overlap; half-open ranges let one end where
+        # the next starts. SQLite gets equivalent triggers below.
+        ExcludeConstraint(
+            (func.tsrange(date + start_time, date + end_time), "&&"),
+            name=OVERLAP_CONSTRAINT,
+            using="gist",
+        ).ddl_if(dialect="postgresql"),
+    )
 
     # Relationships
     patient = relationship("Patient", back_populates="appointments")
@@ -34,3 +76,34 @@ class Appointment(Base):
     payments = relationship(
         "Payment", secondary="payment_appointments", back_populates="appointments"
     )
+
+
+_OVERLAP_CONDITION = """
+    EXISTS (
+        SELECT 1 FROM appointments
+        WHERE date = NEW.date
+          AND start_time < NEW.end_time
+          AND end_time > NEW.start_time
+          AND id IS NOT NEW.id
+    )
+"""
+
+for _statement in (
+    f"""
+    CREATE TRIGGER tr_appointments_no_overlap_insert
+    BEFORE INSERT ON appointments
+    WHEN {_OVERLAP_CONDITION}
+    BEGIN SELECT RAISE(ABORT, '{OVERLAP_CONSTRAINT}'); END
+    """,
+    f"""
+    CREATE TRIGGER tr_appointments_no_overlap_update
+    BEFORE UPDATE OF date, start_time, end_time ON appointments
+    WHEN {_OVERLAP_CONDITION}
+    BEGIN SELECT RAISE(ABORT, '{OVERLAP_CONSTRAINT}'); END
+    """,
+):
+    event.listen(
+        Appointment.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
@@ -1,7 +1,17 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import DDL, Column, Integer, String, DateTime, Text, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.table_version import updated_now
+
+# Text searched by /patients/search: name, email and the digits of the
+# phone number. The trigram index is built on exactly this expression, so
+# queries must repeat it verbatim for PostgreSQL to use the index.
+SEARCH_DOCUMENT_SQL = (
+    "lower(name || ' ' || coalesce(email, '') || ' ' || "
+    "regexp_replace(coalesce(phone, ''), '[^0-9]', '', 'g'))"
+)
+SEARCH_INDEX = "ix_patients_search_trgm"
 
 
 class Patient(Base):
@@ -13,6 +23,12 @@ class Patient(Base):
     email = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        default=updated_now,
+        server_default=func.now(),
+        onupdate=updated_now,
+    )
 
     # Relationships
     appointments = relationship(
@@ -24,3 +40,18 @@ class Patient(Base):
     payments = relationship(
         "Payment", back_populates="patient", cascade="all, delete-orphan"
     )
+
+
+event.listen(
+    Patient.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+event.listen(
+    Patient.__table__,
+    "after_create",
+    DDL(
+        f"CREATE INDEX {SEARCH_INDEX} ON patients "
+        f"USING gin (({SEARCH_DOCUMENT_SQL}) gin_trgm_ops)"
+    ).execute_if(dialect="postgresql"),
+)
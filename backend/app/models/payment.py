@@ -7,10 +7,12 @@ from sqlalchemy import (
     Enum,
     Table,
     Numeric,
+    Index,
 )
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
+from app.models.table_version import updated_now
 import enum
 
 
@@ -25,6 +27,8 @@ payment_appointments = Table(
     Base.metadata,
     Column("payment_id", Integer, ForeignKey("payments.id"), primary_key=True),
     Column("appointment_id", Integer, ForeignKey("appointments.id"), primary_key=True),
+    # The primary key only serves lookups by payment_id
+    Index("ix_payment_appointments_appointment_id", "appointment_id"),
 )
 
 
@@ -34,19 +38,27 @@ class Payment(Base):
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
     amount = Column(Numeric(10, 2), nullable=False)
+    # Written by the app so SQLite keeps the microseconds cursors compare on
     payment_date = Column(
-        DateTime(timezone=True), nullable=False, server_default=func.now()
+        DateTime(timezone=True),
+        nullable=False,
+        default=updated_now,
+        server_default=func.now(),
+        index=True,
     )
     payment_method = Column(Enum(PaymentMethod), nullable=False)
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_payments_patient_id_payment_date", "patient_id", "payment_date"),
+    )
+
     # Relationships
     patient = relationship("Patient", back_populates="payments")
     appointments = relationship(
         "Appointment",
         secondary=payment_appointments,
         back_populates="payments",
-        lazy="joined",
     )
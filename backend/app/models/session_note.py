@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import query_expression, relationship
 from app.core.database import Base
+from app.models.table_version import updated_now
 
 
 class SessionNote(Base):
@@ -10,7 +11,19 @@ class SessionNote(Base):
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
     content = Column(Text, nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Written by the app so SQLite keeps the microseconds cursors compare on
+    created_at = Column(
+        DateTime(timezone=True),
+        default=updated_now,
+        server_default=func.now(),
+        index=True,
+    )
+    # Start of content computed by the query (with_expression), for previews
+    content_preview = query_expression()
+
+    __table_args__ = (
+        Index("ix_session_notes_patient_id_created_at", "patient_id", "created_at"),
+    )
 
     # Relationships
     patient = relationship("Patient", back_populates="session_notes")
@@ -0,0 +1,92 @@
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, String, event, text
+
+from app.core.database import Base
+
+# Tables whose writes bump their row in table_versions. List endpoints derive
+# their ETag from these counters instead of from the rows they return.
+TRACKED_TABLES = (
+    "patients",
+    "appointments",
+    "session_notes",
+    "payments",
+    "payment_appointments",
+)
+
+
+def updated_now() -> datetime:
+    """
+    Python-side ``default`` and ``onupdate`` for ``updated_at`` and
+    ``default`` for keyset timestamps: SQLite's CURRENT_TIMESTAMP has second precision, so two
+    edits within a second would share an ETag, and a stored
+    ``YYYY-MM-DD HH:MM:SS`` never equals the ``.000000`` form its cursor
+    is bound in.
+    """
+    return datetime.now(timezone.utc)
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String, primary_key=True)
+    # Incremented by triggers on every write to the table, never reset
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+
+
+_BUMP = (
+    "UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}'"
+)
+
+# PostgreSQL bumps once per statement, so a bulk insert or a set-based
+# delete costs one extra UPDATE rather than one per row.
+_POSTGRESQL_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1
+    WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+_POSTGRESQL_TRIGGER = """
+CREATE TRIGGER tr_{table}_version
+AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+FOR EACH STATEMENT EXECUTE PROCEDURE bump_table_version()
+"""
+
+# SQLite has no statement-level triggers
+_SQLITE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS tr_{table}_version_{event}
+AFTER {event} ON {table}
+BEGIN {bump}; END
+"""
+
+
+def version_trigger_statements(dialect: str) -> list:
+    if dialect == "postgresql":
+        return [_POSTGRESQL_FUNCTION] + [
+            _POSTGRESQL_TRIGGER.format(table=table) for table in TRACKED_TABLES
+        ]
+    return [
+        _SQLITE_TRIGGER.format(table=table, event=event, bump=_BUMP.format(table=table))
+        for table in TRACKED_TABLES
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ]
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_version_triggers(target, connection, tables=(), **kw) -> None:
+    # Runs after every table exists; the triggers reference two tables each.
+    if TableVersion.__table__ not in tables:
+        return
+    # Counters start at the creation time, so a recreated database does not
+    # hand out the ETags of its predecessor for different rows.
+    start = time.time_ns() // 1000
+    connection.execute(
+        TableVersion.__table__.insert(),
+        [{"table_name": table, "version": start} for table in TRACKED_TABLES],
+    )
+    for statement in version_trigger_statements(connection.dialect.name):
+        connection.exec_driver_sql(statement)
@@ -1,12 +1,20 @@
-from datetime import date, datetime
-from typing import Any, List
+from datetime import date, datetime, time
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_active_user
-from app.models.appointment import Appointment
+from app.core.etag import check_etag, row_etag, table_etag
+from app.core.pagination import NEXT_CURSOR_HEADER, Keyset, paginate
+from app.models.appointment import (
+    OVERLAP_CONSTRAINT,
+    TIME_ORDER_CONSTRAINT,
+    Appointment,
+)
 from app.models.patient import Patient
 from app.models.user import User
 from app.schemas.appointment import (
@@ -15,22 +23,79 @@ from app.schemas.appointment import (
 from app.schemas.appointment import (
     AppointmentCreate,
     AppointmentUpdate,
+    Calendar,
+    FreeSlots,
 )
+from app.services.calendar import calendar_days, calendar_version
+from app.services.free_slots import free_slots
 
 router = APIRouter(prefix="/appointments", tags=["appointments"])
 
+APPOINTMENT_KEYSET = Keyset(
+    "appointments",
+    [Appointment.date, Appointment.start_time, Appointment.id],
+    [date, time, int],
+)
+
+
+def _commit_appointment(db: Session) -> None:
+    """
+    Commit, turning the database's overlap and time-order constraints into
+    400 responses. Overlaps are enforced by the database (an exclusion
+    constraint on PostgreSQL, triggers on SQLite), so concurrent bookings
+    cannot both succeed and no check-then-insert query is needed.
+    """
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        message = str(exc.orig)
+        if OVERLAP_CONSTRAINT in message:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Wizyta koliduje z inną wizytą w tym terminie",
+            )
+        if TIME_ORDER_CONSTRAINT in message:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Godzina zakończenia wizyty musi być późniejsza niż godzina rozpoczęcia",
+            )
+        raise
+
+
+def _check_range(date_from: date, date_to: date) -> None:
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Data końcowa nie może być wcześniejsza niż początkowa",
+        )
+    if (date_to - date_from).days >= settings.CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Zakres nie może przekraczać {settings.CALENDAR_MAX_DAYS} dni",
+        )
 
-@router.get("", response_model=List[AppointmentSchema])
+
+@router.get(
+    "",
+    response_model=List[AppointmentSchema],
+    dependencies=[Depends(table_etag("appointments"))],
+)
 def get_appointments(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
     date_from: date = None,
     date_to: date = None,
+    cursor: Optional[str] = None,
 ) -> Any:
     """
     Pobierz listę wszystkich wizyt
+
+    Kolejna strona: parametr `cursor` z nagłówka `X-Next-Cursor` poprzedniej
+    odpowiedzi (zamiast `skip`).
     """
     query = db.query(Appointment)
 
@@ -39,14 +104,80 @@ def get_appointments(
     if date_to:
         query = query.filter(Appointment.date <= date_to)
 
-    appointments = query.offset(skip).limit(limit).all()
+    appointments, next_cursor = paginate(
+        query, APPOINTMENT_KEYSET, cursor, skip, limit
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return appointments
 
 
-@router.get("/{appointment_id}", response_model=AppointmentSchema)
+@router.get("/calendar", response_model=Calendar)
+def get_calendar(
+    request: Request,
+    response: Response,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Pobierz wizyty z zakresu dat pogrupowane według dni
+
+    Każda wizyta zawiera imię i nazwisko pacjenta, informację o płatności
+    i identyfikator notatki z sesji. Zwracane są tylko dni z wizytami.
+    Odpowiedź ma ETag zależny wyłącznie od wizyt z tego zakresu, więc
+    zmiany w innych tygodniach nie unieważniają jej w pamięci podręcznej.
+    """
+    _check_range(date_from, date_to)
+    check_etag(request, response, *calendar_version(db, date_from, date_to))
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "days": calendar_days(db, date_from, date_to),
+    }
+
+
+@router.get("/free-slots", response_model=FreeSlots)
+def get_free_slots(
+    request: Request,
+    response: Response,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    duration: int = Query(50, ge=5, le=12 * 60),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Znajdź wolne terminy na wizytę o podanej długości (w minutach)
+
+    Wolne terminy to godziny pracy (ustawienie `WORKING_HOURS`) bez
+    istniejących wizyt. Każdy zwrócony przedział mieści wizytę o długości
+    `duration`; zwracane są tylko dni z co najmniej jednym wolnym terminem.
+    """
+    _check_range(date_from, date_to)
+    check_etag(
+        request,
+        response,
+        settings.WORKING_HOURS,
+        *calendar_version(db, date_from, date_to),
+    )
+    return {
+        "date_from": date_from,
+        "date_to": date_to,
+        "duration": duration,
+        "days": free_slots(db, date_from, date_to, duration),
+    }
+
+
+@router.get(
+    "/{appointment_id}",
+    response_model=AppointmentSchema,
+    dependencies=[Depends(row_etag(Appointment, "appointment_id"))],
+)
 def get_appointment(
     appointment_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -80,26 +211,9 @@ def create_appointment(
             detail="Pacjent nie został znaleziony",
         )
 
-    # Check for overlapping appointments
-    overlapping = (
-        db.query(Appointment)
-        .filter(
-            Appointment.date == appointment_data.date,
-            Appointment.start_time < appointment_data.end_time,
-            Appointment.end_time > appointment_data.start_time,
-        )
-        .first()
-    )
-
-    if overlapping:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Wizyta koliduje z inną wizytą w tym terminie",
-        )
-
     db_appointment = Appointment(**appointment_data.model_dump())
     db.add(db_appointment)
-    db.commit()
+    _commit_appointment(db)
     db.refresh(db_appointment)
     return db_appointment
 
@@ -151,33 +265,10 @@ def update_appointment(
                 detail="Pacjent nie został znaleziony",
             )
 
-    # Check for overlapping appointments if date/time is being updated
-    if any(field in update_data for field in ["date", "start_time", "end_time"]):
-        check_date = update_data.get("date", appointment.date)
-        check_start = update_data.get("start_time", appointment.start_time)
-        check_end = update_data.get("end_time", appointment.end_time)
-
-        overlapping = (
-            db.query(Appointment)
-            .filter(
-                Appointment.id != appointment_id,
-                Appointment.date == check_date,
-                Appointment.start_time < check_end,
-                Appointment.end_time > check_start,
-            )
-            .first()
-        )
-
-        if overlapping:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Wizyta koliduje z inną wizytą w tym terminie",
-            )
-
     for field, value in update_data.items():
         setattr(appointment, field, value)
 
-    db.commit()
+    _commit_appointment(db)
     db.refresh(appointment)
     return appointment
 
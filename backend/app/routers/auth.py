@@ -1,63 +1,162 @@
+import math
+from typing import Any, Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from datetime import timedelta
-from typing import Any
 
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
-from app.core.config import settings
+from app.core.hashing import PasswordHasherBusy, password_hasher
+from app.core.security import create_access_token
+from app.core.throttle import login_throttle
 from app.models.user import User
-from app.schemas.user import UserCreate, User as UserSchema, Token
+from app.services.refresh_tokens import (
+    PASSWORD_REHASH,
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from app.schemas.user import Token, TokenRefresh, UserCreate
+from app.schemas.user import User as UserSchema
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
+# Endpoints here are async so that waiting for the bcrypt process pool does
+# not hold a threadpool slot; database calls are pushed to the threadpool.
+
+
+def _get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _add_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _update_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    # Same password, new cost: the user's refresh tokens stay valid
+    db.info[PASSWORD_REHASH] = True
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Serwer jest przeciążony, spróbuj ponownie za chwilę",
+        headers={"Retry-After": "1"},
+    )
+
 
 @router.post("/register", response_model=UserSchema)
-def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
+async def register(user_data: UserCreate, db: Session = Depends(get_db)) -> Any:
     """
     Rejestracja nowego użytkownika
     """
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await run_in_threadpool(_get_user_by_email, db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email już jest zarejestrowany",
         )
 
-    # Create new user
-    db_user = User(
-        email=user_data.email, hashed_password=get_password_hash(user_data.password)
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        hashed_password = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise _hashing_busy()
 
-    return db_user
+    # Create new user
+    db_user = User(email=user_data.email, hashed_password=hashed_password)
+    return await run_in_threadpool(_add_user, db, db_user)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
 ) -> Any:
     """
     Logowanie użytkownika i zwrócenie tokenu JWT
     """
-    # Find user by email
-    user = db.query(User).filter(User.email == form_data.username).first()
+    throttle_key = form_data.username.strip().lower()
+    retry_after = login_throttle.try_acquire(throttle_key)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Zbyt wiele nieudanych prób logowania, spróbuj ponownie później",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    password_ok, new_hash = False, None
+    try:
+        # Find user by email
+        user = await run_in_threadpool(_get_user_by_email, db, form_data.username)
+        if user is not None:
+            password_ok, new_hash = await password_hasher.verify_and_update(
+                form_data.password, user.hashed_password
+            )
+    except PasswordHasherBusy:
+        login_throttle.release(throttle_key)
+        raise _hashing_busy()
+    except Exception:
+        # A lookup or hashing error says nothing about the password
+        login_throttle.release(throttle_key)
+        raise
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Only a wrong password (or unknown email) keeps its reservation
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Nieprawidłowy email lub hasło",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Create access token
-    access_token_expires = timedelta(hours=settings.JWT_EXPIRATION_HOURS)
-    access_token = create_access_token(
-        subject=user.email, expires_delta=access_token_expires
-    )
+    login_throttle.reset(throttle_key)
+
+    # The stored hash uses an outdated bcrypt cost; migrate it transparently.
+    if new_hash:
+        await run_in_threadpool(_update_password_hash, db, user, new_hash)
+
+    # Create access and refresh tokens
+    access_token = create_access_token(subject=user.email)
+    refresh_token = await run_in_threadpool(issue_refresh_token, db, user.id)
+
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(token_data: TokenRefresh, db: Session = Depends(get_db)) -> Any:
+    """
+    Wymiana tokenu odświeżającego na nową parę tokenów (bez ponownego logowania)
+    """
+    rotated = rotate_refresh_token(db, token_data.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Nieprawidłowy lub wygasły token odświeżający",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, refresh_token = rotated
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": create_access_token(subject=user.email),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout")
+def logout(token_data: TokenRefresh, db: Session = Depends(get_db)) -> Any:
+    """
+    Unieważnienie tokenu odświeżającego
+    """
+    revoke_refresh_token(db, token_data.refresh_token)
+    return {"detail": "Wylogowano"}
@@ -1,36 +1,99 @@
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_active_user
+from app.core.etag import check_etag, row_etag, table_etag
+from app.core.fields import FIELDS_DESCRIPTION, FieldSet
+from app.core.pagination import NEXT_CURSOR_HEADER, Keyset, paginate
 from app.models.patient import Patient
 from app.models.user import User
 from app.schemas.patient import Patient as PatientSchema
-from app.schemas.patient import PatientCreate, PatientUpdate
+from app.schemas.patient import (
+    PatientCreate,
+    PatientImportReport,
+    PatientListItem,
+    PatientOverview,
+    PatientUpdate,
+)
+from app.services.patient_deletion import delete_patient_cascade
+from app.services.patient_import import (
+    CONTENT_TYPES,
+    ImportFormat,
+    ImportFormatError,
+    import_patients,
+)
+from app.services.patient_overview import overview_version, patient_overview
+from app.services.patient_search import patient_search_index, search_patients
 
 router = APIRouter(prefix="/patients", tags=["patients"])
 
+PATIENT_KEYSET = Keyset("patients", [Patient.id], [int])
+PATIENT_FIELDS = FieldSet(Patient, list(PatientListItem.model_fields))
 
-@router.get("", response_model=List[PatientSchema])
+
+@router.get(
+    "",
+    response_model=List[PatientListItem],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(table_etag("patients"))],
+)
 def get_patients(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
 ) -> Any:
     """
     Pobierz listę wszystkich pacjentów
+
+    Kolejna strona: parametr `cursor` z nagłówka `X-Next-Cursor` poprzedniej
+    odpowiedzi (zamiast `skip`). Parametr `fields` (np. `id,name`) ogranicza
+    odpowiedź do wybranych pól; `id` jest zwracane zawsze.
     """
-    patients = db.query(Patient).offset(skip).limit(limit).all()
-    return patients
+    names = PATIENT_FIELDS.parse(fields)
+    query = db.query(Patient).options(
+        PATIENT_FIELDS.load_only(names, *PATIENT_KEYSET.columns)
+    )
+    patients, next_cursor = paginate(query, PATIENT_KEYSET, cursor, skip, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return PATIENT_FIELDS.pick(patients, names)
+
+
+@router.get(
+    "/search",
+    response_model=List[PatientSchema],
+    dependencies=[Depends(table_etag("patients"))],
+)
+def search(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Wyszukaj pacjentów po imieniu i nazwisku, emailu lub numerze telefonu
+
+    Wyszukiwanie toleruje literówki; wyniki są posortowane od najlepiej
+    dopasowanych. Numer telefonu można podać w dowolnym formacie.
+    """
+    return search_patients(db, q, limit)
 
 
-@router.get("/{patient_id}", response_model=PatientSchema)
+@router.get(
+    "/{patient_id}",
+    response_model=PatientSchema,
+    dependencies=[Depends(row_etag(Patient, "patient_id"))],
+)
 def get_patient(
     patient_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -45,6 +108,46 @@ def get_patient(
     return patient
 
 
+@router.get("/{patient_id}/overview", response_model=PatientOverview)
+def get_patient_overview(
+    patient_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_user),
+    appointments_limit: int = Query(20, ge=1, le=200),
+    appointments_cursor: Optional[str] = None,
+    upcoming_limit: int = Query(5, ge=0, le=50),
+    notes_limit: int = Query(5, ge=0, le=50),
+    payments_limit: int = Query(10, ge=0, le=100),
+) -> Any:
+    """
+    Pobierz wszystkie dane strony pacjenta jednym żądaniem
+
+    Zawiera dane pacjenta, statystyki wizyt i płatności (w tym kwotę do
+    zapłaty), najbliższe wizyty, stronę wcześniejszych wizyt, ostatnie
+    notatki z sesji i ostatnie płatności. Kolejna strona wcześniejszych
+    wizyt: parametr `appointments_cursor` z pola
+    `recent_appointments_next_cursor`.
+    """
+    check_etag(request, response, *overview_version(db, patient_id))
+    overview = patient_overview(
+        db,
+        patient_id,
+        appointments_limit=appointments_limit,
+        appointments_cursor=appointments_cursor,
+        upcoming_limit=upcoming_limit,
+        notes_limit=notes_limit,
+        payments_limit=payments_limit,
+    )
+    if overview is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pacjent nie został znaleziony",
+        )
+    return overview
+
+
 @router.post("", response_model=PatientSchema)
 def create_patient(
     patient_data: PatientCreate,
@@ -58,9 +161,39 @@ def create_patient(
     db.add(db_patient)
     db.commit()
     db.refresh(db_patient)
+    patient_search_index.put(db_patient)
     return db_patient
 
 
+@router.post("/import", response_model=PatientImportReport)
+async def import_patients_file(
+    request: Request,
+    import_format: Optional[ImportFormat] = Query(None, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Zaimportuj pacjentów z pliku CSV lub NDJSON przesłanego w treści żądania
+
+    Format wynika z nagłówka Content-Type (`text/csv`, `application/x-ndjson`)
+    lub z parametru `format`. Plik CSV musi mieć nagłówek z kolumną `name`
+    (opcjonalnie `phone`, `email`, `notes`). Plik jest przetwarzany
+    strumieniowo, partiami; błędne wiersze są pomijane i opisane w raporcie.
+    """
+    if import_format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0]
+        import_format = CONTENT_TYPES.get(content_type.strip().lower())
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Nieobsługiwany format pliku, użyj CSV lub NDJSON",
+        )
+    try:
+        return await import_patients(db, request.stream(), import_format)
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
 @router.put("/{patient_id}", response_model=PatientSchema)
 def update_patient(
     patient_id: int,
@@ -85,6 +218,7 @@ def update_patient(
 
     db.commit()
     db.refresh(patient)
+    patient_search_index.put(patient)
     return patient
 
 
@@ -97,13 +231,14 @@ def delete_patient(
     """
     Usuń pacjenta
     """
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
+    exists = db.query(Patient.id).filter(Patient.id == patient_id).first()
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pacjent nie został znaleziony",
         )
 
-    db.delete(patient)
+    delete_patient_cascade(db, patient_id)
     db.commit()
+    patient_search_index.remove(patient_id)
     return {"detail": "Pacjent został usunięty"}
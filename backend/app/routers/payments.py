@@ -2,11 +2,19 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_active_user
+from app.core.etag import table_etag
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    Keyset,
+    TotalMode,
+    count_total,
+    paginate,
+)
 from app.models.appointment import Appointment
 from app.models.patient import Patient
 from app.models.payment import Payment, PaymentMethod
@@ -23,6 +31,16 @@ from app.schemas.payment import (
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
+# Payments are returned with their patient and linked appointments
+payments_etag = table_etag(
+    "payments", "payment_appointments", "appointments", "patients"
+)
+
+# Newest first, as before
+PAYMENT_KEYSET = Keyset(
+    "payments", [Payment.payment_date, Payment.id], [datetime, int], descending=True
+)
+
 
 @router.post("", response_model=PaymentSchema)
 def create_payment(
@@ -104,9 +122,14 @@ def create_payment(
     return db_payment
 
 
-@router.get("", response_model=PaymentListResponse)
+@router.get(
+    "",
+    response_model=PaymentListResponse,
+    dependencies=[Depends(payments_etag)],
+)
 def get_payments(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
@@ -114,14 +137,18 @@ def get_payments(
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
     payment_method: Optional[PaymentMethod] = Query(None),
+    cursor: Optional[str] = Query(None),
+    total: Optional[TotalMode] = Query(None),
 ):
     """
     Pobierz listę płatności z możliwością filtrowania
+
+    Kolejna strona: parametr `cursor` z pola `next_cursor` poprzedniej
+    odpowiedzi (zamiast `skip`). Parametr `total` określa liczenie wyników:
+    `exact` (domyślnie przy `skip`), `estimate` (szacunek planera PostgreSQL)
+    lub `none` (domyślnie przy `cursor`).
     """
-    query = db.query(Payment).options(
-        joinedload(Payment.patient),
-        joinedload(Payment.appointments),
-    )
+    query = db.query(Payment)
 
     # Filtry
     if patient_id:
@@ -137,14 +164,24 @@ def get_payments(
     if payment_method:
         query = query.filter(Payment.payment_method == payment_method)
 
-    # Sortowanie - najnowsze najpierw
-    query = query.order_by(Payment.payment_date.desc())
-
     # Liczba wszystkich wyników
-    total = query.count()
+    if total is None:
+        total = TotalMode.NONE if cursor else TotalMode.EXACT
+    total_count, total_is_estimate = count_total(query, total)
 
-    # Paginacja
-    payments = query.offset(skip).limit(limit).all()
+    # Strona wyników - najnowsze najpierw
+    payments, next_cursor = paginate(
+        query.options(
+            joinedload(Payment.patient),
+            selectinload(Payment.appointments),
+        ),
+        PAYMENT_KEYSET,
+        cursor,
+        skip,
+        limit,
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
     # Przygotuj odpowiedź z dodatkowymi danymi pacjenta
     payments_with_patient = []
@@ -165,13 +202,22 @@ def get_payments(
         }
         payments_with_patient.append(PaymentWithPatient(**payment_dict))
 
-    return PaymentListResponse(total=total, payments=payments_with_patient)
+    return PaymentListResponse(
+        total=total_count,
+        total_is_estimate=total_is_estimate,
+        next_cursor=next_cursor,
+        payments=payments_with_patient,
+    )
 
 
-@router.get("/{payment_id}", response_model=PaymentWithPatient)
+@router.get(
+    "/{payment_id}",
+    response_model=PaymentWithPatient,
+    dependencies=[Depends(payments_etag)],
+)
 def get_payment(
     payment_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
@@ -181,7 +227,7 @@ def get_payment(
         db.query(Payment)
         .options(
             joinedload(Payment.patient),
-            joinedload(Payment.appointments),
+            selectinload(Payment.appointments),
         )
         .filter(Payment.id == payment_id)
         .first()
@@ -223,7 +269,7 @@ def update_payment(
     """
     payment = (
         db.query(Payment)
-        .options(joinedload(Payment.appointments))
+        .options(selectinload(Payment.appointments))
         .filter(Payment.id == payment_id)
         .first()
     )
@@ -329,7 +375,7 @@ def delete_payment(
     """
     payment = (
         db.query(Payment)
-        .options(joinedload(Payment.appointments))
+        .options(selectinload(Payment.appointments))
         .filter(Payment.id == payment_id)
         .first()
     )
@@ -350,10 +396,14 @@ def delete_payment(
     return {"detail": "Płatność została usunięta, wizyty oznaczone jako nieopłacone"}
 
 
-@router.get("/patient/{patient_id}/unpaid-appointments", response_model=List[int])
+@router.get(
+    "/patient/{patient_id}/unpaid-appointments",
+    response_model=List[int],
+    dependencies=[Depends(table_etag("patients", "appointments"))],
+)
 def get_unpaid_appointments(
     patient_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
@@ -379,9 +429,9 @@ def get_unpaid_appointments(
     return [app_id[0] for app_id in unpaid_appointments]
 
 
-@router.get("/statistics/summary")
+@router.get("/statistics/summary", dependencies=[Depends(table_etag("payments"))])
 def get_payment_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     date_from: Optional[date] = Query(None),
     date_to: Optional[date] = Query(None),
@@ -1,10 +1,18 @@
-from typing import Any, List
+from datetime import datetime
+from enum import Enum
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Query as OrmQuery
+from sqlalchemy.orm import Session, with_expression
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.deps import get_current_active_user
+from app.core.config import settings
+from app.core.etag import table_etag
+from app.core.fields import FIELDS_DESCRIPTION, FieldSet
+from app.core.pagination import NEXT_CURSOR_HEADER, Keyset, paginate
 from app.models.patient import Patient
 from app.models.session_note import SessionNote
 from app.models.user import User
@@ -13,60 +21,143 @@ from app.schemas.session_note import (
 )
 from app.schemas.session_note import (
     SessionNoteCreate,
+    SessionNoteListItem,
     SessionNoteUpdate,
 )
 
 router = APIRouter(prefix="/session_notes", tags=["session_notes"])
 
+# Newest first, as before
+SESSION_NOTE_KEYSET = Keyset(
+    "session_notes",
+    [SessionNote.created_at, SessionNote.id],
+    [datetime, int],
+    descending=True,
+)
+# `content_truncated` comes with `content`
+SESSION_NOTE_FIELDS = FieldSet(
+    SessionNote, ["id", "patient_id", "content", "created_at"]
+)
+
+
+class NoteContent(str, Enum):
+    PREVIEW = "preview"
+    FULL = "full"
+
+
+def _list_notes(
+    query: OrmQuery,
+    response: Response,
+    fields: Optional[str],
+    content: NoteContent,
+    cursor: Optional[str],
+    skip: int,
+    limit: int,
+) -> List[dict]:
+    names = SESSION_NOTE_FIELDS.parse(fields)
+    preview = content == NoteContent.PREVIEW and "content" in names
+    length = settings.SESSION_NOTE_PREVIEW_LENGTH
+    loaded = [name for name in names if not (preview and name == "content")]
+    query = query.options(
+        SESSION_NOTE_FIELDS.load_only(loaded, *SESSION_NOTE_KEYSET.columns)
+    )
+    if preview:
+        # One character more than the preview tells whether the note goes on;
+        # PostgreSQL then only decompresses the start of a long note.
+        query = query.options(
+            with_expression(
+                SessionNote.content_preview,
+                func.substr(SessionNote.content, 1, length + 1),
+            )
+        )
 
-@router.get("", response_model=List[SessionNoteSchema])
+    notes, next_cursor = paginate(query, SESSION_NOTE_KEYSET, cursor, skip, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    items = SESSION_NOTE_FIELDS.pick(
+        notes, [name for name in names if name != "content"]
+    )
+    if "content" in names:
+        for item, note in zip(items, notes):
+            text = note.content_preview if preview else note.content
+            item["content"] = text[:length] if preview else text
+            item["content_truncated"] = preview and len(text) > length
+    return items
+
+
+@router.get(
+    "",
+    response_model=List[SessionNoteListItem],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(table_etag("session_notes"))],
+)
 def get_all_session_notes(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    content: NoteContent = NoteContent.PREVIEW,
 ) -> Any:
     """
     Pobierz wszystkie notatki z sesji
+
+    Kolejna strona: parametr `cursor` z nagłówka `X-Next-Cursor` poprzedniej
+    odpowiedzi (zamiast `skip`). Domyślnie `content` zawiera tylko początek
+    notatki (`content_truncated` mówi, czy została skrócona); pełną treść
+    zwraca `content=full`. Parametr `fields` ogranicza odpowiedź do
+    wybranych pól.
     """
-    session_notes = (
-        db.query(SessionNote)
-        .order_by(SessionNote.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    return _list_notes(
+        db.query(SessionNote), response, fields, content, cursor, skip, limit
     )
-    return session_notes
 
 
-@router.get("/{patient_id}", response_model=List[SessionNoteSchema])
+@router.get(
+    "/{patient_id}",
+    response_model=List[SessionNoteListItem],
+    response_model_exclude_unset=True,
+    dependencies=[Depends(table_etag("patients", "session_notes"))],
+)
 def get_session_notes(
     patient_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    content: NoteContent = NoteContent.PREVIEW,
 ) -> Any:
     """
     Pobierz notatki z sesji dla konkretnego pacjenta
+
+    Kolejna strona: parametr `cursor` z nagłówka `X-Next-Cursor` poprzedniej
+    odpowiedzi (zamiast `skip`). Domyślnie `content` zawiera tylko początek
+    notatki; pełną treść zwraca `content=full`. Parametr `fields` ogranicza
+    odpowiedź do wybranych pól.
     """
     # Check if patient exists
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = db.query(Patient.id).filter(Patient.id == patient_id).first()
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Pacjent nie został znaleziony",
         )
 
-    session_notes = (
-        db.query(SessionNote)
-        .filter(SessionNote.patient_id == patient_id)
-        .order_by(SessionNote.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    return _list_notes(
+        db.query(SessionNote).filter(SessionNote.patient_id == patient_id),
+        response,
+        fields,
+        content,
+        cursor,
+        skip,
+        limit,
     )
-    return session_notes
 
 
 @router.post("", response_model=SessionNoteSchema)
@@ -93,10 +184,14 @@ def create_session_note(
     return db_note
 
 
-@router.get("/note/{note_id}", response_model=SessionNoteSchema)
+@router.get(
+    "/note/{note_id}",
+    response_model=SessionNoteSchema,
+    dependencies=[Depends(table_etag("session_notes"))],
+)
 def get_session_note_by_id(
     note_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
@@ -1,5 +1,5 @@
 from app.schemas.user import User, UserCreate, UserLogin, Token
-from app.schemas.patient import Patient, PatientCreate, PatientUpdate
+from app.schemas.patient import Patient, PatientCreate, PatientOverview, PatientUpdate
 from app.schemas.appointment import Appointment, AppointmentCreate, AppointmentUpdate
 from app.schemas.session_note import SessionNote, SessionNoteCreate
 
@@ -11,6 +11,7 @@ __all__ = [
     "Patient",
     "PatientCreate",
     "PatientUpdate",
+    "PatientOverview",
     "Appointment",
     "AppointmentCreate",
     "AppointmentUpdate",
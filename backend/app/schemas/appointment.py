@@ -1,6 +1,6 @@
 from pydantic import BaseModel, field_validator, ConfigDict
 from datetime import datetime, date, time
-from typing import Optional, Any
+from typing import Any, List, Optional
 from decimal import Decimal
 
 
@@ -44,5 +44,49 @@ class AppointmentUpdate(BaseModel):
 class Appointment(AppointmentBase):
     id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class CalendarAppointment(BaseModel):
+    id: int
+    start_time: time
+    end_time: time
+    patient_id: int
+    patient_name: str
+    is_paid: bool
+    price: Optional[Decimal] = None
+    # None when the visit has no session note
+    session_note_id: Optional[int] = None
+
+
+class CalendarDay(BaseModel):
+    date: date
+    appointments: List[CalendarAppointment]
+
+
+class Calendar(BaseModel):
+    date_from: date
+    date_to: date
+    # Only days with appointments, in date order
+    days: List[CalendarDay]
+
+
+class FreeSlot(BaseModel):
+    start_time: time
+    end_time: time
+
+
+class FreeSlotDay(BaseModel):
+    date: date
+    slots: List[FreeSlot]
+
+
+class FreeSlots(BaseModel):
+    date_from: date
+    date_to: date
+    # Minutes; every slot is at least this long
+    duration: int
+    # Only working days with at least one free slot
+    days: List[FreeSlotDay]
@@ -1,6 +1,11 @@
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from typing import List, Optional
+
+from app.schemas.appointment import Appointment
+from app.schemas.payment import Payment
+from app.schemas.session_note import SessionNote
 
 
 class PatientBase(BaseModel):
@@ -21,6 +26,60 @@ class PatientUpdate(PatientBase):
 class Patient(PatientBase):
     id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
+
+
+class PatientListItem(BaseModel):
+    """A patient in a list; with `fields=` only the requested keys are present."""
+
+    id: int
+    name: Optional[str] = None
+    phone: Optional[str] = None
+    email: Optional[str] = None
+    notes: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+
+class PatientStats(BaseModel):
+    appointments: int
+    upcoming_appointments: int
+    paid_appointments: int
+    unpaid_appointments: int
+    # Sum of the prices of unpaid appointments
+    unpaid_amount: Decimal
+    payments: int
+    payments_amount: Decimal
+    session_notes: int
+
+
+class PatientOverview(BaseModel):
+    """Everything the patient page shows, from a fixed number of queries."""
+
+    patient: Patient
+    stats: PatientStats
+    # Soonest first
+    upcoming_appointments: List[Appointment]
+    # Newest first; the next page comes from `recent_appointments_next_cursor`
+    recent_appointments: List[Appointment]
+    recent_appointments_next_cursor: Optional[str] = None
+    # Newest first
+    session_notes: List[SessionNote]
+    payments: List[Payment]
+
+
+class PatientImportError(BaseModel):
+    # Line of the file where the record starts (the CSV header is line 1)
+    row: int
+    errors: List[str]
+
+
+class PatientImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[PatientImportError]
+    # True when more rows failed than `errors` lists
+    errors_truncated: bool = False
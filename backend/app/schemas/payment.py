@@ -63,5 +63,8 @@ class PaymentWithPatient(Payment):
 
 
 class PaymentListResponse(BaseModel):
-    total: int
+    # None when the client asked for no total (the default with a cursor)
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
     payments: List[PaymentWithPatient]
@@ -22,3 +22,17 @@ class SessionNote(SessionNoteBase):
 
     class Config:
         from_attributes = True
+
+
+class SessionNoteListItem(BaseModel):
+    """
+    A note in a list. `content` is a preview unless the list is requested
+    with `content=full`; with `fields=` only the requested keys are present.
+    """
+
+    id: int
+    patient_id: Optional[int] = None
+    content: Optional[str] = None
+    # True when `content` is a preview cut short of the full note
+    content_truncated: Optional[bool] = None
+    created_at: Optional[datetime] = None
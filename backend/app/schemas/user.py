@@ -26,6 +26,11 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
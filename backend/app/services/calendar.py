@@ -0,0 +1,73 @@
+"""
+Day-grouped appointments for the calendar views.
+
+A month view used to fetch ``/appointments`` (100 rows at most, so later
+weeks were silently missing) plus every patient, and join names in the
+browser. ``calendar_days`` reads one date range through
+``ix_appointments_date_start_time``, joined to the patient's name, and
+returns only what a calendar cell shows.
+
+``calendar_version`` is the ETag source: the number of appointments in the
+range, the sum of their ids, their latest ``updated_at`` and the patients
+table version (names). Edits move the latest ``updated_at``; the id sum
+changes when one appointment leaves the range and another arrives, even
+within the resolution of the clock. A booking, edit, move or deletion in
+another week leaves it unchanged, so a client keeps its cached weeks.
+"""
+
+from datetime import date
+from itertools import groupby
+from typing import List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.patient import Patient
+from app.models.table_version import TableVersion
+
+
+def _in_range(date_from: date, date_to: date):
+    return Appointment.date.between(date_from, date_to)
+
+
+def calendar_version(db: Session, date_from: date, date_to: date) -> Tuple:
+    patients_version = (
+        select(TableVersion.version)
+        .where(TableVersion.table_name == "patients")
+        .scalar_subquery()
+    )
+    return tuple(
+        db.execute(
+            select(
+                func.count(Appointment.id),
+                func.sum(Appointment.id),
+                func.max(Appointment.updated_at),
+                patients_version,
+            ).where(_in_range(date_from, date_to))
+        ).one()
+    )
+
+
+def calendar_days(db: Session, date_from: date, date_to: date) -> List[dict]:
+    """Days of the range that have appointments, each in start-time order."""
+    rows = db.execute(
+        select(
+            Appointment.id,
+            Appointment.date,
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.patient_id,
+            Patient.name.label("patient_name"),
+            Appointment.is_paid,
+            Appointment.price,
+            Appointment.session_note_id,
+        )
+        .join(Patient, Patient.id == Appointment.patient_id)
+        .where(_in_range(date_from, date_to))
+        .order_by(Appointment.date, Appointment.start_time)
+    ).mappings()
+    return [
+        {"date": day, "appointments": list(appointments)}
+        for day, appointments in groupby(rows, key=lambda row: row["date"])
+    ]
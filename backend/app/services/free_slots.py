@@ -0,0 +1,141 @@
+"""
+Free time for new visits, from the working hours minus the appointments.
+
+One query reads the start and end of every appointment in the range in
+calendar order (``ix_appointments_date_start_time``). Each day is then a
+single sweep: a cursor walks through the day's working windows and
+appointments together, and every gap of at least ``duration`` minutes
+between the cursor and the next appointment (or the end of the window) is
+a free slot. No query runs per day or per candidate start.
+
+Working hours come from ``WORKING_HOURS``: ``;``-separated entries of ISO
+weekdays (1 = Monday, a single day or a range) and comma-separated time
+windows, for example ``1-4 08:00-12:00,13:00-19:00; 5 08:00-14:00``.
+Days without an entry are days off.
+"""
+
+from datetime import date, time, timedelta
+from functools import lru_cache
+from itertools import groupby
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.appointment import Appointment
+
+# Minutes since midnight
+Window = Tuple[int, int]
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = value.split(":")
+    result = int(hours) * 60 + int(minutes)
+    if not 0 <= result <= 24 * 60 or not 0 <= int(minutes) < 60:
+        raise ValueError(value)
+    return result
+
+
+@lru_cache
+def parse_working_hours(spec: str) -> Dict[int, List[Window]]:
+    """ISO weekday -> sorted, non-overlapping working windows."""
+    hours: Dict[int, List[Window]] = {}
+    try:
+        for entry in filter(None, (part.strip() for part in spec.split(";"))):
+            days, windows = entry.split(None, 1)
+            first, _, last = days.partition("-")
+            for weekday in range(int(first), int(last or first) + 1):
+                if not 1 <= weekday <= 7:
+                    raise ValueError(days)
+                for window in windows.split(","):
+                    start, end = (_minutes(part.strip()) for part in window.split("-"))
+                    if start >= end:
+                        raise ValueError(window)
+                    hours.setdefault(weekday, []).append((start, end))
+    except ValueError:
+        raise ValueError(f"Invalid WORKING_HOURS entry in {spec!r}")
+    for weekday, windows in hours.items():
+        windows.sort()
+        if any(prev[1] > nxt[0] for prev, nxt in zip(windows, windows[1:])):
+            raise ValueError(f"Overlapping WORKING_HOURS windows for day {weekday}")
+    return hours
+
+
+def _start_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+def _end_minutes(value: time) -> int:
+    # Rounded up, so a slot never starts inside an appointment
+    return _start_minutes(value) + bool(value.second or value.microsecond)
+
+
+def _as_time(minutes: int) -> time:
+    # A window may end at 24:00, which time() cannot hold
+    return time.max if minutes >= 24 * 60 else time(minutes // 60, minutes % 60)
+
+
+def day_free_slots(
+    windows: List[Window], booked: List[Window], duration: int
+) -> List[Window]:
+    """
+    Gaps of at least ``duration`` minutes in ``windows`` not covered by
+    ``booked``; both sorted by start. Linear in windows plus appointments.
+    """
+    slots = []
+    index = 0
+    for window_start, window_end in windows:
+        # Appointments that ended before this window cannot block it
+        while index < len(booked) and booked[index][1] <= window_start:
+            index += 1
+        cursor = window_start
+        scan = index
+        while scan < len(booked) and booked[scan][0] < window_end:
+            start, end = booked[scan]
+            if start - cursor >= duration:
+                slots.append((cursor, start))
+            cursor = max(cursor, end)
+            scan += 1
+        if window_end - cursor >= duration:
+            slots.append((cursor, window_end))
+    return slots
+
+
+def _days(date_from: date, date_to: date) -> Iterable[date]:
+    for offset in range((date_to - date_from).days + 1):
+        yield date_from + timedelta(days=offset)
+
+
+def free_slots(
+    db: Session, date_from: date, date_to: date, duration: int
+) -> List[dict]:
+    """Days of the range with at least one free slot, and their slots."""
+    hours = parse_working_hours(settings.WORKING_HOURS)
+    rows = db.execute(
+        select(Appointment.date, Appointment.start_time, Appointment.end_time)
+        .where(Appointment.date.between(date_from, date_to))
+        .order_by(Appointment.date, Appointment.start_time)
+    ).all()
+    booked = {
+        day: [(_start_minutes(start), _end_minutes(end)) for _, start, end in day_rows]
+        for day, day_rows in groupby(rows, key=lambda row: row[0])
+    }
+
+    days = []
+    for day in _days(date_from, date_to):
+        windows = hours.get(day.isoweekday())
+        if not windows:
+            continue
+        slots = day_free_slots(windows, booked.get(day, []), duration)
+        if slots:
+            days.append(
+                {
+                    "date": day,
+                    "slots": [
+                        {"start_time": _as_time(start), "end_time": _as_time(end)}
+                        for start, end in slots
+                    ],
+                }
+            )
+    return days
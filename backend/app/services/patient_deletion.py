@@ -0,0 +1,44 @@
+"""
+Deleting a patient together with everything that belongs to them.
+
+``db.delete(patient)`` makes the ORM cascade load every appointment,
+session note, payment and payment link into the session and delete them
+row by row, which for a long-term patient is thousands of statements.
+Here each table is cleared with one set-based statement instead, in an
+order that keeps foreign keys satisfied at every step. The schema has no
+``ON DELETE CASCADE``, and SQLite does not enforce foreign keys anyway, so
+the statements do not rely on the database to cascade.
+"""
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.appointment import Appointment
+from app.models.patient import Patient
+from app.models.payment import Payment, payment_appointments
+from app.models.session_note import SessionNote
+
+
+def delete_patient_cascade(db: Session, patient_id: int) -> None:
+    """Delete the patient and its rows; the caller commits."""
+    appointment_ids = select(Appointment.id).where(Appointment.patient_id == patient_id)
+    payment_ids = select(Payment.id).where(Payment.patient_id == patient_id)
+    note_ids = select(SessionNote.id).where(SessionNote.patient_id == patient_id)
+
+    for statement in (
+        delete(payment_appointments).where(
+            or_(
+                payment_appointments.c.payment_id.in_(payment_ids),
+                payment_appointments.c.appointment_id.in_(appointment_ids),
+            )
+        ),
+        delete(Payment).where(Payment.patient_id == patient_id),
+        delete(Appointment).where(Appointment.patient_id == patient_id),
+        # The ORM cascade detached notes from other patients' appointments
+        update(Appointment)
+        .where(Appointment.session_note_id.in_(note_ids))
+        .values(session_note_id=None),
+        delete(SessionNote).where(SessionNote.patient_id == patient_id),
+        delete(Patient).where(Patient.id == patient_id),
+    ):
+        db.execute(statement.execution_options(synchronize_session=False))
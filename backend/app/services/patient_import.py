@@ -0,0 +1,232 @@
+"""
+Bulk patient import from a streamed CSV or NDJSON body.
+
+The request body is read chunk by chunk and split into records; every
+``PATIENT_IMPORT_BATCH_SIZE`` records are validated with ``PatientCreate``
+and the valid ones inserted with one executemany and committed. Only one
+batch is held at a time, plus at most ``PATIENT_IMPORT_MAX_ERRORS`` row
+errors, so memory does not grow with the size of the file. A record longer
+than ``PATIENT_IMPORT_MAX_RECORD_LENGTH`` characters (a file without
+newlines, a CSV cell whose quote is never closed) is dropped as it grows,
+reported as a failed row, and reading resumes at the next line.
+
+A batch is its own transaction: rows of earlier batches stay imported when
+a later batch fails to commit, and the report lists what was skipped.
+
+CSV needs a header row with at least a ``name`` column; ``phone``,
+``email`` and ``notes`` are optional and empty cells mean no value. Quoted
+cells may span lines. NDJSON has one JSON object per line.
+"""
+
+import codecs
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.patient import Patient
+from app.schemas.patient import PatientCreate
+from app.services.patient_search import patient_search_index
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+CONTENT_TYPES = {
+    "text/csv": ImportFormat.CSV,
+    "application/csv": ImportFormat.CSV,
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+}
+
+
+class ImportFormatError(ValueError):
+    """The body cannot be read as the requested format at all."""
+
+
+# (line number where the record starts, record text or None if too long)
+Record = Tuple[int, Optional[str]]
+
+
+async def _lines(
+    chunks: AsyncIterator[bytes], limit: int
+) -> AsyncIterator[Optional[str]]:
+    """Lines of the body; None for a line longer than ``limit``, never held."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending, overlong = "", False
+    try:
+        async for chunk in chunks:
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield None if overlong or len(line) > limit else line
+                overlong = False
+            if len(pending) > limit:
+                # Drop the rest of this line as it arrives
+                pending, overlong = "", True
+        pending += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ImportFormatError("Plik musi być zapisany w kodowaniu UTF-8")
+    if overlong or len(pending) > limit:
+        yield None
+    elif pending:
+        yield pending
+
+
+async def records(
+    chunks: AsyncIterator[bytes], fmt: ImportFormat
+) -> AsyncIterator[Record]:
+    """Non-blank records of the body; a CSV record may span several lines."""
+    limit = settings.PATIENT_IMPORT_MAX_RECORD_LENGTH
+    start, number, parts, length, quotes = 0, 0, [], 0, 0
+    async for line in _lines(chunks, limit):
+        number += 1
+        if not parts:
+            start = number
+        if line is None or length + len(line) > limit:
+            # Report the record as failed and resume with the next line
+            parts, length, quotes = [], 0, 0
+            yield start, None
+            continue
+        parts.append(line)
+        length += len(line) + 1
+        if fmt == ImportFormat.CSV:
+            # An odd number of quotes so far means a quoted cell continues
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+        text = "\n".join(parts)
+        parts, length, quotes = [], 0, 0
+        if text.strip():
+            yield start, text
+    if parts and "\n".join(parts).strip():
+        yield start, "\n".join(parts)
+
+
+def _messages(exc: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    ]
+
+
+class PatientImporter:
+    """Validates and inserts batches of records, and keeps the report."""
+
+    def __init__(self, db: Session, fmt: ImportFormat):
+        self.db = db
+        self.fmt = fmt
+        self.columns: Optional[List[str]] = None
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+
+    def _fail(self, line: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.PATIENT_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": line, "errors": messages})
+
+    def _parse(self, text: str) -> dict:
+        if self.fmt == ImportFormat.NDJSON:
+            try:
+                data = json.loads(text)
+            except ValueError:
+                raise ValueError("Nieprawidłowy JSON")
+            if not isinstance(data, dict):
+                raise ValueError("Wiersz musi być obiektem JSON")
+            return data
+        values = next(csv.reader(io.StringIO(text)))
+        if len(values) != len(self.columns):
+            raise ValueError(
+                f"Oczekiwano {len(self.columns)} kolumn, otrzymano {len(values)}"
+            )
+        return {
+            column: value.strip() or None
+            for column, value in zip(self.columns, values)
+        }
+
+    def _read_header(self, text: str) -> None:
+        self.columns = [
+            column.strip().lower() for column in next(csv.reader(io.StringIO(text)))
+        ]
+        if "name" not in self.columns:
+            raise ImportFormatError("Nagłówek CSV musi zawierać kolumnę name")
+
+    def write(self, batch: List[Record]) -> None:
+        rows, lines = [], []
+        for line, text in batch:
+            if text is None:
+                if self.fmt == ImportFormat.CSV and self.columns is None:
+                    raise ImportFormatError("Nagłówek CSV jest za długi")
+                self._fail(
+                    line,
+                    [
+                        "Wiersz przekracza "
+                        f"{settings.PATIENT_IMPORT_MAX_RECORD_LENGTH} znaków"
+                    ],
+                )
+                continue
+            if self.fmt == ImportFormat.CSV and self.columns is None:
+                self._read_header(text)
+                continue
+            try:
+                patient = PatientCreate(**self._parse(text))
+            except ValidationError as exc:
+                self._fail(line, _messages(exc))
+                continue
+            except ValueError as exc:
+                self._fail(line, [str(exc)])
+                continue
+            rows.append(patient.dict())
+            lines.append(line)
+        if not rows:
+            return
+        try:
+            self.db.execute(insert(Patient), rows)
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            for line in lines:
+                self._fail(line, ["Nie udało się zapisać wiersza w bazie danych"])
+            return
+        self.imported += len(rows)
+
+    def report(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def import_patients(
+    db: Session, chunks: AsyncIterator[bytes], fmt: ImportFormat
+) -> dict:
+    importer = PatientImporter(db, fmt)
+    batch: List[Record] = []
+    try:
+        async for record in records(chunks, fmt):
+            batch.append(record)
+            if len(batch) >= settings.PATIENT_IMPORT_BATCH_SIZE:
+                await run_in_threadpool(importer.write, batch)
+                batch = []
+        if batch:
+            await run_in_threadpool(importer.write, batch)
+    finally:
+        if importer.imported:
+            patient_search_index.invalidate()
+    if fmt == ImportFormat.CSV and importer.columns is None:
+        raise ImportFormatError("Plik CSV jest pusty")
+    return importer.report()
@@ -0,0 +1,157 @@
+"""
+Data for the patient page in one request.
+
+The page used to call four endpoints. It also downloaded every appointment
+and filtered them in the browser. ``patient_overview`` issues six
+statements whatever the size of the patient's history:
+
+1. the patient with its counts and sums, as correlated subqueries;
+2. upcoming appointments;
+3. a page of past appointments (keyset, newest first);
+4. the latest session notes;
+5. the latest payments;
+6. the appointments of those payments (``selectinload``).
+
+``overview_version`` is the ETag source. Besides the change counters of
+the tables shown, it includes the id of the patient's next upcoming
+appointment: when that appointment starts, the page moves it from the
+upcoming to the past appointments without any write to the database.
+"""
+
+from datetime import date, datetime, time
+from typing import Optional, Tuple
+
+from sqlalchemy import Numeric, func, select, tuple_
+from sqlalchemy.orm import Session, selectinload
+
+from app.core.pagination import Keyset, paginate
+from app.models.appointment import Appointment
+from app.models.patient import Patient
+from app.models.payment import Payment
+from app.models.session_note import SessionNote
+from app.models.table_version import TRACKED_TABLES, TableVersion
+
+PAST_APPOINTMENT_KEYSET = Keyset(
+    "patient_appointments",
+    [Appointment.date, Appointment.start_time, Appointment.id],
+    [date, time, int],
+    descending=True,
+)
+
+
+def _count(model, *conditions):
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(model.patient_id == Patient.id, *conditions)
+        .scalar_subquery()
+    )
+
+
+def _total(column, *conditions):
+    return (
+        select(func.coalesce(func.sum(column), 0, type_=Numeric(10, 2)))
+        .where(column.table.c.patient_id == Patient.id, *conditions)
+        .scalar_subquery()
+    )
+
+
+def _is_upcoming(now: datetime):
+    starts_at = tuple_(Appointment.date, Appointment.start_time)
+    return starts_at >= tuple_(now.date(), now.time())
+
+
+def overview_version(db: Session, patient_id: int) -> Tuple:
+    next_upcoming = (
+        select(Appointment.id)
+        .where(Appointment.patient_id == patient_id, _is_upcoming(datetime.now()))
+        .order_by(Appointment.date, Appointment.start_time, Appointment.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    return tuple(
+        tuple(row)
+        for row in db.execute(
+            select(TableVersion.table_name, TableVersion.version, next_upcoming)
+            .where(TableVersion.table_name.in_(TRACKED_TABLES))
+            .order_by(TableVersion.table_name)
+        )
+    )
+
+
+def patient_overview(
+    db: Session,
+    patient_id: int,
+    appointments_limit: int,
+    appointments_cursor: Optional[str],
+    upcoming_limit: int,
+    notes_limit: int,
+    payments_limit: int,
+) -> Optional[dict]:
+    """The overview of ``patient_id``, or None when there is no such patient."""
+    is_upcoming = _is_upcoming(datetime.now())
+    row = (
+        db.query(
+            Patient,
+            _count(Appointment).label("appointments"),
+            _count(Appointment, is_upcoming).label("upcoming_appointments"),
+            _count(Appointment, Appointment.is_paid).label("paid_appointments"),
+            _total(Appointment.price, ~Appointment.is_paid).label("unpaid_amount"),
+            _count(Payment).label("payments"),
+            _total(Payment.amount).label("payments_amount"),
+            _count(SessionNote).label("session_notes"),
+        )
+        .filter(Patient.id == patient_id)
+        .first()
+    )
+    if row is None:
+        return None
+
+    appointments = db.query(Appointment).filter(Appointment.patient_id == patient_id)
+    upcoming = (
+        appointments.filter(is_upcoming)
+        .order_by(Appointment.date, Appointment.start_time, Appointment.id)
+        .limit(upcoming_limit)
+        .all()
+    )
+    recent, next_cursor = paginate(
+        appointments.filter(~is_upcoming),
+        PAST_APPOINTMENT_KEYSET,
+        appointments_cursor,
+        0,
+        appointments_limit,
+    )
+    session_notes = (
+        db.query(SessionNote)
+        .filter(SessionNote.patient_id == patient_id)
+        .order_by(SessionNote.created_at.desc(), SessionNote.id.desc())
+        .limit(notes_limit)
+        .all()
+    )
+    payments = (
+        db.query(Payment)
+        .options(selectinload(Payment.appointments))
+        .filter(Payment.patient_id == patient_id)
+        .order_by(Payment.payment_date.desc(), Payment.id.desc())
+        .limit(payments_limit)
+        .all()
+    )
+
+    return {
+        "patient": row.Patient,
+        "stats": {
+            "appointments": row.appointments,
+            "upcoming_appointments": row.upcoming_appointments,
+            "paid_appointments": row.paid_appointments,
+            "unpaid_appointments": row.appointments - row.paid_appointments,
+            "unpaid_amount": row.unpaid_amount,
+            "payments": row.payments,
+            "payments_amount": row.payments_amount,
+            "session_notes": row.session_notes,
+        },
+        "upcoming_appointments": upcoming,
+        "recent_appointments": recent,
+        "recent_appointments_next_cursor": next_cursor,
+        "session_notes": session_notes,
+        "payments": payments,
+    }
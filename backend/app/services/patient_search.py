@@ -0,0 +1,217 @@
+"""
+Fuzzy patient search over name, email and phone number.
+
+On PostgreSQL the query runs against a pg_trgm GIN index on
+``SEARCH_DOCUMENT_SQL`` (migration 007). A patient matches when the query
+is a substring of that text or when ``word_similarity`` passes the
+``pg_trgm.word_similarity_threshold`` setting (0.6 by default). Matches
+are ranked by similarity, so typos such as "kowalsky" still find
+"Kowalski".
+
+Other databases (SQLite during development) have no trigram index, so
+an equivalent one is kept in process memory. It is built on the first
+search and rebuilt after ``PATIENT_SEARCH_INDEX_TTL_SECONDS``. Writes made
+through the API update it right away. Rows written by another process or
+straight to the database show up once the index is rebuilt.
+"""
+
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, literal, literal_column, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.patient import SEARCH_DOCUMENT_SQL, Patient
+
+# pg_trgm's default word_similarity_threshold, used by the in-process index
+SIMILARITY_THRESHOLD = 0.6
+
+_PHONE_QUERY = re.compile(r"[\d\s()+\-./]+")
+_WORD = re.compile(r"\w+")
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case the query; a phone number is reduced to its digits."""
+    query = query.strip().lower()
+    if _PHONE_QUERY.fullmatch(query) and any(char.isdigit() for char in query):
+        return re.sub(r"\D", "", query)
+    return query
+
+
+def search_document(name: str, email: Optional[str], phone: Optional[str]) -> str:
+    """Python twin of SEARCH_DOCUMENT_SQL."""
+    digits = re.sub(r"[^0-9]", "", phone or "")
+    return f"{name} {email or ''} {digits}".lower()
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of every word, padded the way pg_trgm pads them."""
+    grams = set()
+    for word in _WORD.findall(text):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class TrigramIndex:
+    """Search documents of all patients and the ids containing each trigram."""
+
+    def __init__(self):
+        self._documents: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._built_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        if self._built_at is None:
+            return True
+        age = time.monotonic() - self._built_at
+        return age > settings.PATIENT_SEARCH_INDEX_TTL_SECONDS
+
+    def build(
+        self, rows: Iterable[Tuple[int, str, Optional[str], Optional[str]]]
+    ) -> None:
+        """Replace the index with ``(id, name, email, phone)`` rows."""
+        documents = {}
+        postings: Dict[str, Set[int]] = {}
+        for patient_id, name, email, phone in rows:
+            document = search_document(name, email, phone)
+            documents[patient_id] = document
+            for gram in trigrams(document):
+                postings.setdefault(gram, set()).add(patient_id)
+        with self._lock:
+            self._documents = documents
+            self._postings = postings
+            self._built_at = time.monotonic()
+
+    def put(self, patient: Patient) -> None:
+        if self._built_at is None:
+            return
+        document = search_document(patient.name, patient.email, patient.phone)
+        with self._lock:
+            self._discard(patient.id)
+            self._documents[patient.id] = document
+            for gram in trigrams(document):
+                self._postings.setdefault(gram, set()).add(patient.id)
+
+    def remove(self, patient_id: int) -> None:
+        with self._lock:
+            self._discard(patient_id)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._documents = {}
+            self._postings = {}
+            self._built_at = None
+
+    def _discard(self, patient_id: int) -> None:
+        document = self._documents.pop(patient_id, None)
+        if document is None:
+            return
+        for gram in trigrams(document):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(patient_id)
+
+    def search(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        """Up to ``limit`` (patient id, score) pairs, best first."""
+        grams = trigrams(query)
+        if not grams:
+            return []
+        with self._lock:
+            postings = self._rarest_first(grams)
+            needed = math.ceil(SIMILARITY_THRESHOLD * len(grams))
+            # A document with ``needed`` of the query's trigrams has at least
+            # one of its rarest ``len - needed + 1``; only those are counted
+            candidates = set().union(*postings[: len(grams) - needed + 1])
+            hits: Counter = Counter()
+            for ids in postings:
+                hits.update(candidates & ids)
+            scores = {
+                patient_id: count / len(grams)
+                for patient_id, count in hits.items()
+                if count >= needed
+            }
+            # Substring matches below the similarity threshold
+            if len(scores) < limit:
+                for patient_id in self._containing(query):
+                    if patient_id not in scores:
+                        count = sum(patient_id in ids for ids in postings)
+                        scores[patient_id] = count / len(grams)
+            return heapq.nsmallest(
+                limit,
+                scores.items(),
+                key=lambda item: (-item[1], self._documents[item[0]], item[0]),
+            )
+
+    def _containing(self, query: str) -> List[int]:
+        # Every trigram inside a query word occurs in a matching document
+        inner = {
+            word[i : i + 3]
+            for word in _WORD.findall(query)
+            for i in range(len(word) - 2)
+        }
+        if inner:
+            ids: Iterable[int] = set.intersection(*self._rarest_first(inner))
+        else:
+            ids = self._documents
+        documents = self._documents
+        return [patient_id for patient_id in ids if query in documents[patient_id]]
+
+    def _rarest_first(self, grams: Iterable[str]) -> List[Set[int]]:
+        return sorted((self._postings.get(gram, set()) for gram in grams), key=len)
+
+
+patient_search_index = TrigramIndex()
+
+
+def search_patients(db: Session, query: str, limit: int) -> List[Patient]:
+    term = normalize_query(query)
+    if not term:
+        return []
+    if db.connection().dialect.name == "postgresql":
+        return _search_postgresql(db, term, limit)
+    return _search_in_process(db, term, limit)
+
+
+def _search_postgresql(db: Session, term: str, limit: int) -> List[Patient]:
+    document = literal_column(SEARCH_DOCUMENT_SQL)
+    pattern = "%" + re.sub(r"([/%_])", r"/\1", term) + "%"
+    # Both conditions can use the GIN index; the ORDER BY only ranks matches
+    return (
+        db.query(Patient)
+        .filter(
+            or_(
+                literal(term).op("<%")(document),
+                document.like(pattern, escape="/"),
+            )
+        )
+        .order_by(
+            func.word_similarity(term, document).desc(), Patient.name, Patient.id
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+def _search_in_process(db: Session, term: str, limit: int) -> List[Patient]:
+    if patient_search_index.is_stale():
+        patient_search_index.build(
+            db.query(Patient.id, Patient.name, Patient.email, Patient.phone)
+        )
+    ranked = patient_search_index.search(term, limit)
+    if not ranked:
+        return []
+    patients = {
+        patient.id: patient
+        for patient in db.query(Patient).filter(
+            Patient.id.in_([patient_id for patient_id, _ in ranked])
+        )
+    }
+    return [patients[patient_id] for patient_id, _ in ranked if patient_id in patients]
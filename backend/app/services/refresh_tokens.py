@@ -0,0 +1,181 @@
+"""
+Rotating refresh tokens.
+
+Tokens are random strings stored as SHA-256 digests: they carry enough
+entropy that a slow password hash adds nothing, and a digest can be looked
+up through a unique index. Each refresh revokes the presented token and
+issues a new one.
+
+Revoked digests are also kept in an in-memory set, loaded at startup and
+updated when a revocation commits, so replayed tokens are rejected without
+a database round trip. The database stays the source of truth: a token
+revoked by another worker is still refused by the conditional UPDATE.
+
+A new password hash revokes every outstanding token of the user, except
+for the transparent rehash at login (same password, new bcrypt cost).
+"""
+
+import hashlib
+import secrets
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect, update
+from sqlalchemy.orm import Session, object_session
+
+from app.core.config import settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevokedTokenSet:
+    def __init__(self):
+        self._expiry_by_hash: Dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> int:
+        """Load revoked tokens that have not expired yet; returns their count."""
+        rows = (
+            db.query(RefreshToken.token_hash, RefreshToken.expires_at)
+            .filter(
+                RefreshToken.revoked_at.isnot(None),
+                RefreshToken.expires_at > _now(),
+            )
+            .all()
+        )
+        with self._lock:
+            self._expiry_by_hash = {
+                token_hash: _as_utc(expires_at) for token_hash, expires_at in rows
+            }
+            return len(self._expiry_by_hash)
+
+    def add(self, token_hash: str, expires_at: datetime) -> None:
+        with self._lock:
+            self._expiry_by_hash[token_hash] = _as_utc(expires_at)
+            if len(self._expiry_by_hash) % 1000 == 0:
+                self._prune()
+
+    def __contains__(self, token_hash: str) -> bool:
+        with self._lock:
+            return token_hash in self._expiry_by_hash
+
+    def __len__(self) -> int:
+        return len(self._expiry_by_hash)
+
+    def _prune(self) -> None:
+        now = _now()
+        for token_hash, expires_at in list(self._expiry_by_hash.items()):
+            if expires_at <= now:
+                del self._expiry_by_hash[token_hash]
+
+
+revoked_refresh_tokens = RevokedTokenSet()
+
+# Session.info keys: digests revoked in the open transaction, and the flag
+# set by a login that only rehashes the password it has just verified
+_PENDING = "revoked_refresh_tokens"
+PASSWORD_REHASH = "password_rehash"
+
+
+def issue_refresh_token(db: Session, user_id: int) -> str:
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(token),
+            expires_at=_now() + timedelta(days=settings.JWT_REFRESH_EXPIRATION_DAYS),
+        )
+    )
+    db.commit()
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[Tuple[User, str]]:
+    """Revoke ``token`` and issue its successor; None if it is not usable."""
+    token_hash = hash_refresh_token(token)
+    revoked = _revoke(db, token_hash)
+    if revoked is None:
+        return None
+    user_id, _ = revoked
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is None:
+        db.commit()
+        return None
+    return user, issue_refresh_token(db, user.id)
+
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    revoked = _revoke(db, hash_refresh_token(token))
+    db.commit()
+    return revoked is not None
+
+
+def _revoke(db: Session, token_hash: str) -> Optional[Tuple[int, datetime]]:
+    if token_hash in revoked_refresh_tokens:
+        return None
+    now = _now()
+    # A single conditional UPDATE both validates and consumes the token, so two
+    # concurrent refreshes with the same token cannot both succeed.
+    row = db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.expires_at)
+    ).first()
+    if row is None:
+        return None
+    db.info.setdefault(_PENDING, []).append((token_hash, row.expires_at))
+    return row.user_id, row.expires_at
+
+
+@event.listens_for(User, "after_update")
+def _revoke_on_password_change(mapper, connection, target: User) -> None:
+    if not inspect(target).attrs.hashed_password.history.has_changes():
+        return
+    session = object_session(target)
+    if session.info.pop(PASSWORD_REHASH, False):
+        return
+    now = _now()
+    rows = connection.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.user_id == target.id,
+            RefreshToken.revoked_at.is_(None),
+            RefreshToken.expires_at > now,
+        )
+        .values(revoked_at=now)
+        .returning(RefreshToken.token_hash, RefreshToken.expires_at)
+    ).all()
+    session.info.setdefault(_PENDING, []).extend(rows)
+
+
+# A revocation reaches the in-memory set only once it is committed, so a
+# rolled-back one does not leave a token refused by this worker alone.
+@event.listens_for(Session, "after_commit")
+def _publish_revocations(session) -> None:
+    for token_hash, expires_at in session.info.pop(_PENDING, ()):
+        revoked_refresh_tokens.add(token_hash, expires_at)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_revocations(session) -> None:
+    session.info.pop(_PENDING, None)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
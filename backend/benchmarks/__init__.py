@@ -0,0 +1,7 @@
+"""
+Benchmarks for TherapyAssistance backend.
+
+Each module is runnable on its own, e.g. ``python -m benchmarks.auth_concurrency``
+from the ``backend`` directory. Unless ``DATABASE_URL`` is set explicitly the
+benchmarks run against a throwaway SQLite file.
+"""
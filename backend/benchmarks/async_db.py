@@ -0,0 +1,113 @@
+"""
+Sync (threadpool) versus async (AsyncSession) database path.
+
+Each mode runs in its own process because DB_ASYNC is read at import time.
+Reports throughput and memory per in-flight request for the same workload.
+
+    python -m benchmarks.async_db --clients 100 --requests 3000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    run_clients,
+    use_benchmark_database,
+)
+
+
+def _seed(patients: int) -> None:
+    from app.core.database import SessionLocal
+    from app.models.patient import Patient
+
+    ensure_user()
+    db = SessionLocal()
+    try:
+        if db.query(Patient).count() == 0:
+            db.add_all(Patient(name=f"Pacjent {i}") for i in range(patients))
+            db.commit()
+    finally:
+        db.close()
+
+
+async def _run_worker(clients: int, total: int) -> dict:
+    from app.core.database import dispose_async_engine
+    from app.main import app
+
+    async with asgi_client(app, headers=auth_headers()) as client:
+        request = lambda c: c.get("/patients", params={"limit": 50})
+        await run_clients(client, request, clients, clients)
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        result = await run_clients(client, request, clients, total)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    await dispose_async_engine()
+    result["python_heap_kib_per_in_flight"] = round((peak - baseline) / 1024 / clients, 1)
+    result["max_rss_growth_kib"] = rss_after - rss_before
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--worker", choices=["sync", "async"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(asyncio.run(_run_worker(args.clients, args.requests))))
+        return
+
+    database_url = use_benchmark_database("async_db")
+    _seed(args.patients)
+
+    report = {"clients": args.clients, "database_url": database_url}
+    for mode in ("sync", "async"):
+        # Both modes get a pool slot per client: with fewer slots the sync path
+        # can deadlock, as waiters hold every threadpool thread that the
+        # session cleanup of connection holders needs.
+        env = dict(
+            os.environ,
+            DB_ASYNC="true" if mode == "async" else "false",
+            DB_POOL_SIZE=str(args.clients),
+            DB_MAX_OVERFLOW="0",
+        )
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.async_db",
+                "--worker",
+                mode,
+                "--clients",
+                str(args.clients),
+                "--requests",
+                str(args.requests),
+            ],
+            env=env,
+            check=True,
+            stdout=subprocess.PIPE,
+            text=True,
+        ).stdout
+        report[mode] = json.loads(output.strip().splitlines()[-1])
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Throughput of authenticated requests with the old event-loop-blocking auth
+dependency versus the current threadpool one.
+
+    python -m benchmarks.auth_concurrency --clients 50 --requests 2000
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.common import (
+    add_db_latency,
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    run_clients,
+    use_benchmark_database,
+)
+
+
+async def _measure(app, headers, clients: int, total: int) -> dict:
+    async with asgi_client(app, headers=headers) as client:
+        # Warm up connections and caches before measuring.
+        await run_clients(client, lambda c: c.get("/patients"), clients, clients)
+        return await run_clients(client, lambda c: c.get("/patients"), clients, total)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--db-latency-ms",
+        type=float,
+        default=2.0,
+        help="artificial delay added to every SQL statement",
+    )
+    args = parser.parse_args()
+
+    use_benchmark_database("auth_concurrency")
+
+    from fastapi import Depends
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.core.database import DATABASE_URL, SessionLocal, get_db
+    from app.core.deps import get_current_user, oauth2_scheme
+    from app.main import app
+
+    # The old dependency checks connections out on the event loop thread. With
+    # more clients than pool slots it deadlocks until pool_timeout: connections
+    # are only returned by cleanup code the blocked loop never gets to run.
+    # Size the pool to the client count so the baseline measures throughput.
+    engine = create_engine(
+        DATABASE_URL, pool_size=args.clients, max_overflow=args.clients
+    )
+    SessionLocal.configure(bind=engine)
+    ensure_user()
+    add_db_latency(engine, args.db_latency_ms / 1000)
+    headers = auth_headers()
+
+    async def blocking_get_current_user(
+        token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    ):
+        # The pre-change dependency: an `async def` running the query inline.
+        return get_current_user(token=token, db=db)
+
+    app.dependency_overrides[get_current_user] = blocking_get_current_user
+    before = asyncio.run(_measure(app, headers, args.clients, args.requests))
+    app.dependency_overrides.clear()
+    after = asyncio.run(_measure(app, headers, args.clients, args.requests))
+
+    print_report(
+        {
+            "clients": args.clients,
+            "db_latency_ms": args.db_latency_ms,
+            "blocking_async_dependency": before,
+            "threadpool_dependency": after,
+            "speedup": round(after["rps"] / before["rps"], 2) if before["rps"] else None,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Concurrent booking of overlapping appointments.
+
+For each slot, ``--contenders`` clients try to book overlapping times at
+once. Compares the old check-then-insert endpoint with ``POST /appointments``,
+which relies on the database constraint. Reports successful bookings,
+double bookings found afterwards, and SQL statements per request.
+
+The old endpoint can only race on SQLite, so the triggers are dropped from
+the throwaway benchmark database for that phase. Elsewhere it is skipped.
+
+    python -m benchmarks.booking_race --slots 20 --contenders 10
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.common import (
+    add_db_latency,
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+
+
+def _count_double_bookings(engine, first_day: date, last_day: date) -> int:
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT count(*) FROM appointments a JOIN appointments b "
+                "ON a.id < b.id AND a.date = b.date "
+                "AND a.start_time < b.end_time AND a.end_time > b.start_time "
+                "WHERE a.date BETWEEN :first_day AND :last_day"
+            ),
+            {"first_day": first_day, "last_day": last_day},
+        ).scalar()
+
+
+async def _book(app, path: str, patient_id: int, first_day: date, args) -> dict:
+    from app.core.database import engine
+    from sqlalchemy import event
+
+    statements = 0
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        if "FROM users" not in statement:
+            statements += 1
+
+    def _payload(day: date, offset: int) -> dict:
+        return {
+            "patient_id": patient_id,
+            "date": day.isoformat(),
+            "start_time": f"10:{5 * offset:02d}:00",
+            "end_time": f"11:{5 * offset:02d}:00",
+            "price": "150.00",
+        }
+
+    statuses: Counter = Counter()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        async with asgi_client(app, headers=auth_headers()) as client:
+            # One booking without contention, on a day outside the checked range
+            response = await client.post(
+                path, json=_payload(first_day - timedelta(days=1), 0)
+            )
+            response.raise_for_status()
+            statements_per_booking = statements
+            statements = 0
+
+            for slot in range(args.slots):
+                day = first_day + timedelta(days=slot)
+                responses = await asyncio.gather(
+                    *(
+                        client.post(path, json=_payload(day, i))
+                        for i in range(args.contenders)
+                    )
+                )
+                statuses.update(response.status_code for response in responses)
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    requests = args.slots * args.contenders
+    last_day = first_day + timedelta(days=args.slots - 1)
+    return {
+        "requests": requests,
+        "statuses": dict(statuses),
+        "booked": statuses[200],
+        "double_bookings": _count_double_bookings(engine, first_day, last_day),
+        "statements_per_request": round(statements / requests, 2),
+        "statements_per_uncontended_booking": statements_per_booking,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=20)
+    parser.add_argument("--contenders", type=int, default=10)
+    parser.add_argument(
+        "--latency-ms",
+        type=float,
+        default=2.0,
+        help="simulated round trip per statement, widens the race window",
+    )
+    args = parser.parse_args()
+
+    use_benchmark_database("booking_race")
+
+    from fastapi import Depends, HTTPException
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    from app.core.database import engine, get_db
+    from app.main import app
+    from app.models.appointment import Appointment
+    from app.models.patient import Patient
+    from app.schemas.appointment import AppointmentCreate
+
+    def legacy_create_appointment(
+        appointment_data: AppointmentCreate, db: Session = Depends(get_db)
+    ):
+        # The pre-change endpoint: patient check, overlap check, insert.
+        patient = (
+            db.query(Patient).filter(Patient.id == appointment_data.patient_id).first()
+        )
+        if not patient:
+            raise HTTPException(status_code=404)
+        overlapping = (
+            db.query(Appointment)
+            .filter(
+                Appointment.date == appointment_data.date,
+                Appointment.start_time < appointment_data.end_time,
+                Appointment.end_time > appointment_data.start_time,
+            )
+            .first()
+        )
+        if overlapping:
+            raise HTTPException(status_code=400)
+        db_appointment = Appointment(**appointment_data.model_dump())
+        db.add(db_appointment)
+        db.commit()
+        db.refresh(db_appointment)
+        return {"id": db_appointment.id}
+
+    app.add_api_route(
+        "/bench/legacy-appointments", legacy_create_appointment, methods=["POST"]
+    )
+    ensure_user()
+    with engine.begin() as conn:
+        patient_id = conn.execute(
+            Patient.__table__.insert().values(name="Pacjent"), {}
+        ).inserted_primary_key[0]
+    add_db_latency(engine, args.latency_ms / 1000)
+
+    report = {
+        "dialect": engine.dialect.name,
+        "slots": args.slots,
+        "contenders_per_slot": args.contenders,
+        "constraint": asyncio.run(
+            _book(app, "/appointments", patient_id, date(2030, 1, 1), args)
+        ),
+    }
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("DROP TRIGGER tr_appointments_no_overlap_insert"))
+            conn.execute(text("DROP TRIGGER tr_appointments_no_overlap_update"))
+        report["check_then_insert"] = asyncio.run(
+            _book(app, "/bench/legacy-appointments", patient_id, date(2031, 1, 1), args)
+        )
+    else:
+        report["check_then_insert"] = "skipped: needs the constraint dropped"
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Loading a month view: /appointments plus /patients versus the calendar.
+
+Loads a practice with ``benchmarks.dataset`` and opens ``--months``
+consecutive month grids (six weeks, Monday to Sunday) three ways:
+
+* ``list_default``: what the calendar used to send, ``/appointments`` and
+  ``/patients`` with their default page size;
+* ``list_complete``: the same two lists, filtered to the grid and with a
+  limit large enough to return every row;
+* ``calendar``: one ``/appointments/calendar?from=&to=`` request.
+
+Reports requests, statements, response bytes, median wall time, and how
+many of the grid's appointments the view actually received.
+
+    python -m benchmarks.calendar --appointments 100000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import generate
+
+
+def month_grid(year: int, month: int) -> tuple:
+    first = date(year, month, 1)
+    start = first - timedelta(days=first.weekday())
+    return start, start + timedelta(days=41)
+
+
+def list_default(start: date, end: date) -> list:
+    return [("/appointments", {}), ("/patients", {})]
+
+
+def list_complete(start: date, end: date) -> list:
+    grid = {"date_from": start.isoformat(), "date_to": end.isoformat()}
+    return [
+        ("/appointments", {**grid, "limit": 10**5}),
+        ("/patients", {"limit": 10**5}),
+    ]
+
+
+def calendar(start: date, end: date) -> list:
+    grid = {"from": start.isoformat(), "to": end.isoformat()}
+    return [("/appointments/calendar", grid)]
+
+
+def received(responses: list, start: date, end: date) -> int:
+    data = responses[0].json()
+    if isinstance(data, dict):
+        return sum(len(day["appointments"]) for day in data["days"])
+    return sum(start <= date.fromisoformat(row["date"]) <= end for row in data)
+
+
+async def month_view(client, requests: list, start: date, end: date) -> dict:
+    from app.core.sql_metrics import query_budget
+
+    with query_budget(10**6) as stats:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get(path, params=params) for path, params in requests)
+        )
+        elapsed = time.perf_counter() - started
+    for response in responses:
+        response.raise_for_status()
+    return {
+        "requests": len(requests),
+        "statements": stats.count,
+        "kb": sum(len(response.content) for response in responses) / 1024,
+        "ms": elapsed * 1000,
+        "appointments": received(responses, start, end),
+    }
+
+
+async def run(grids: list) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        # Resolve the principal once so auth lookups are not counted
+        await client.get("/patients", params={"limit": 1})
+        for name, pattern in (
+            ("list_default", list_default),
+            ("list_complete", list_complete),
+            ("calendar", calendar),
+        ):
+            views = [
+                await month_view(client, pattern(start, end), start, end)
+                for start, end in grids
+            ]
+            report[name] = {
+                key: round(statistics.median(view[key] for view in views), 2)
+                for key in ("requests", "statements", "kb", "ms", "appointments")
+            }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=1_000)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--months", type=int, default=6)
+    args = parser.parse_args()
+
+    use_benchmark_database("calendar")
+    ensure_user()
+    generate(
+        patients=args.patients,
+        appointments=args.appointments,
+        payments=args.appointments // 2,
+        notes=args.appointments // 4,
+    )
+    grids = [month_grid(2026, month) for month in range(1, 1 + args.months)]
+    print_report(asyncio.run(run(grids)))
+
+
+if __name__ == "__main__":
+    main()
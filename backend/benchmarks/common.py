@@ -0,0 +1,124 @@
+"""
+Shared helpers for the benchmark scripts.
+
+``use_benchmark_database`` has to be called before anything from ``app`` is
+imported, because the engine is created from ``DATABASE_URL`` at import time.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+
+def use_benchmark_database(name: str = "bench", fresh: bool = True) -> str:
+    """Point DATABASE_URL at a SQLite file unless one is already set.
+
+    The file is recreated unless ``fresh`` is false.
+    """
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.gettempdir(), f"therapyassistance_{name}.db")
+        if fresh and os.path.exists(path):
+            os.remove(path)
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    return os.environ["DATABASE_URL"]
+
+
+def ensure_user(email: str = BENCH_EMAIL, password: str = BENCH_PASSWORD) -> None:
+    """Create the schema (the lifespan does not run under ASGITransport) and user."""
+    from app.core.database import SessionLocal
+    from app.core.security import get_password_hash
+    from app.core.startup import prepare_database
+    from app.models.user import User
+
+    prepare_database()
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.email == email).first():
+            db.add(User(email=email, hashed_password=get_password_hash(password)))
+            db.commit()
+    finally:
+        db.close()
+
+
+def auth_headers(email: str = BENCH_EMAIL) -> Dict[str, str]:
+    from app.core.security import create_access_token
+
+    return {"Authorization": f"Bearer {create_access_token(subject=email)}"}
+
+
+def add_db_latency(engine, seconds: float) -> None:
+    """Simulate a network round trip to the database on every statement."""
+    from sqlalchemy import event
+
+    if seconds <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _sleep(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(seconds)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def asgi_client(app, **kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://bench",
+        **kwargs,
+    )
+
+
+async def run_clients(
+    client: httpx.AsyncClient,
+    request: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]],
+    concurrency: int,
+    total: int,
+    latencies: Optional[List[float]] = None,
+) -> dict:
+    """Run ``total`` requests split across ``concurrency`` parallel clients."""
+    latencies = [] if latencies is None else latencies
+    errors = 0
+    remaining = total
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await request(client)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def print_report(report: dict) -> None:
+    print(json.dumps(report, indent=2, ensure_ascii=False))
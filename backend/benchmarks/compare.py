@@ -0,0 +1,83 @@
+"""
+Compare two ``benchmarks.suite`` reports, e.g. from two commits.
+
+Prints the change in throughput per mix and in p50/p95/p99 per endpoint.
+With ``--fail-above PCT`` it exits with status 1 when any p95 got slower,
+or any mix's throughput dropped, by more than PCT percent.
+
+    python -m benchmarks.compare before.json after.json --fail-above 15
+"""
+
+import argparse
+import json
+import sys
+from typing import Optional
+
+
+def _change(before: float, after: float) -> Optional[float]:
+    if not before:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def compare(before: dict, after: dict) -> dict:
+    mixes = {}
+    for name, new in after["mixes"].items():
+        old = before["mixes"].get(name)
+        if old is None:
+            continue
+        endpoints = {}
+        for endpoint, new_stats in new["endpoints"].items():
+            old_stats = old["endpoints"].get(endpoint)
+            if old_stats is None:
+                continue
+            endpoints[endpoint] = {
+                f"{metric}_change_pct": _change(old_stats[metric], new_stats[metric])
+                for metric in ("p50_ms", "p95_ms", "p99_ms")
+            }
+            endpoints[endpoint].update(
+                p95_ms_before=old_stats["p95_ms"], p95_ms_after=new_stats["p95_ms"]
+            )
+        mixes[name] = {
+            "rps_before": old["rps"],
+            "rps_after": new["rps"],
+            "rps_change_pct": _change(old["rps"], new["rps"]),
+            "endpoints": endpoints,
+        }
+    return {
+        "before": before["meta"].get("commit"),
+        "after": after["meta"].get("commit"),
+        "mixes": mixes,
+    }
+
+
+def regressions(comparison: dict, threshold: float) -> list:
+    found = []
+    for name, mix in comparison["mixes"].items():
+        if mix["rps_change_pct"] is not None and mix["rps_change_pct"] < -threshold:
+            found.append(f"{name}: throughput {mix['rps_change_pct']}%")
+        for endpoint, stats in mix["endpoints"].items():
+            change = stats["p95_ms_change_pct"]
+            if change is not None and change > threshold:
+                found.append(f"{name} {endpoint}: p95 +{change}%")
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--fail-above", type=float, metavar="PCT")
+    args = parser.parse_args()
+
+    with open(args.before) as before, open(args.after) as after:
+        comparison = compare(json.load(before), json.load(after))
+    if args.fail_above is not None:
+        comparison["regressions"] = regressions(comparison, args.fail_above)
+    print(json.dumps(comparison, indent=2, ensure_ascii=False))
+    if comparison.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Revalidating unchanged pages with If-None-Match.
+
+Loads a practice with ``benchmarks.dataset`` and requests the lists the
+frontend re-fetches on every page visit, each ``--repeat`` times:
+
+* ``full``: a plain GET, as the frontend used to send;
+* ``revalidated``: the same GET with the ``ETag`` of the first response in
+  ``If-None-Match``, which returns 304 without loading any rows.
+
+Reports status, statements, response bytes and median wall time.
+
+    python -m benchmarks.conditional_get --patients 1000 --appointments 100000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import generate
+
+PATHS = [
+    ("/patients", {"limit": 1000}),
+    ("/appointments", {"limit": 1000}),
+    ("/session_notes", {"limit": 1000}),
+    ("/payments", {"limit": 100}),
+    ("/patients/1/overview", {}),
+]
+
+
+async def measure(client, path: str, params: dict, headers: dict, repeat: int):
+    from app.core.sql_metrics import query_budget
+
+    timings = []
+    for _ in range(repeat):
+        with query_budget(10**6) as stats:
+            started = time.perf_counter()
+            response = await client.get(path, params=params, headers=headers)
+            timings.append(time.perf_counter() - started)
+    return {
+        "status": response.status_code,
+        "statements": stats.count,
+        "bytes": len(response.content),
+        "ms": round(statistics.median(timings) * 1000, 2),
+    }
+
+
+async def run(repeat: int) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        # Resolve the principal once so auth lookups are not counted
+        await client.get("/patients", params={"limit": 1})
+        for path, params in PATHS:
+            etag = (await client.get(path, params=params)).headers["etag"]
+            report[path] = {
+                "full": await measure(client, path, params, {}, repeat),
+                "revalidated": await measure(
+                    client, path, params, {"If-None-Match": etag}, repeat
+                ),
+            }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=1_000)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_benchmark_database("conditional_get")
+    ensure_user()
+    generate(
+        patients=args.patients,
+        appointments=args.appointments,
+        payments=args.appointments // 2,
+        notes=args.appointments // 4,
+    )
+    print_report(asyncio.run(run(args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
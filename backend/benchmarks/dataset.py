@@ -0,0 +1,297 @@
+"""
+Synthetic practice of configurable size for the benchmark suite.
+
+Rows are generated and written in batches, so a million appointments do
+not have to fit in memory. On PostgreSQL (psycopg2) each batch is streamed
+with ``COPY ... FROM STDIN``; other databases get one executemany per
+batch and table. The overlap constraint covers the whole
+calendar, so appointments fill consecutive slots going back from
+``LAST_DAY`` and a large practice spans many years of history. Paid
+appointments get one payment each. A matching share of appointments gets
+a session note.
+
+    python -m benchmarks.dataset --preset large
+"""
+
+import argparse
+import csv
+import enum
+import io
+import random
+import time as clock
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List
+
+from benchmarks.common import ensure_user, print_report, use_benchmark_database
+
+LAST_DAY = date(2026, 12, 31)
+SLOT_MINUTES = 30
+SESSION_MINUTES = 25
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+PRESETS: Dict[str, Dict[str, int]] = {
+    "small": {"patients": 200, "appointments": 10_000, "payments": 5_000, "notes": 2_500},
+    "medium": {
+        "patients": 1_000,
+        "appointments": 100_000,
+        "payments": 50_000,
+        "notes": 25_000,
+    },
+    "large": {
+        "patients": 5_000,
+        "appointments": 1_000_000,
+        "payments": 500_000,
+        "notes": 250_000,
+    },
+}
+
+FIRST_NAMES = [
+    "Anna", "Jan", "Maria", "Piotr", "Katarzyna", "Tomasz", "Ewa", "Paweł",
+    "Agnieszka", "Krzysztof", "Magdalena", "Michał", "Joanna", "Marcin",
+    "Zofia", "Jakub", "Barbara", "Andrzej", "Natalia", "Łukasz",
+]  # fmt: skip
+# Surnames are stem + suffix, so search sees hundreds of distinct names
+SURNAME_STEMS = [
+    "Kowal", "Nowak", "Wiśniew", "Wójcik", "Kamiń", "Lewandow", "Zieliń",
+    "Szymań", "Woźniak", "Dąbrow", "Kozłow", "Jankow", "Mazur", "Kwiatkow",
+    "Krawczyk", "Piotrow", "Grabow", "Nowakow", "Pawłow", "Michal",
+    "Adam", "Dudek", "Zając", "Wieczor", "Jabłoń", "Król", "Majew",
+    "Olszew", "Jawor", "Wróbl",
+]  # fmt: skip
+SURNAME_SUFFIXES = ["ski", "ska", "czyk", "iak", "ek", "owicz", "ewicz", "ny", "ka", ""]
+PRICES = [Decimal("150.00"), Decimal("180.00"), Decimal("200.00")]
+
+
+def _slot(index: int, total: int) -> tuple:
+    """Date and start time of appointment ``index``; the last one ends on LAST_DAY."""
+    slot = total - 1 - index
+    day = LAST_DAY - timedelta(days=slot // SLOTS_PER_DAY)
+    minutes = (SLOTS_PER_DAY - 1 - slot % SLOTS_PER_DAY) * SLOT_MINUTES
+    return day, time(minutes // 60, minutes % 60)
+
+
+def _batches(
+    rng: random.Random,
+    patients: int,
+    appointments: int,
+    payments: int,
+    notes: int,
+    batch_size: int,
+) -> Iterator[Dict[str, List[dict]]]:
+    from app.models.payment import PaymentMethod
+
+    paid_share = payments / appointments if appointments else 0
+    note_share = notes / appointments if appointments else 0
+    methods = list(PaymentMethod)
+    ids = {"notes": 0, "payments": 0}
+
+    for start in range(0, appointments, batch_size):
+        batch = {"notes": [], "appointments": [], "payments": [], "links": []}
+        for index in range(start, min(start + batch_size, appointments)):
+            appointment_id = index + 1
+            patient_id = rng.randint(1, patients)
+            day, start_time = _slot(index, appointments)
+            starts_at = datetime.combine(day, start_time)
+            note_id = None
+            if rng.random() < note_share:
+                ids["notes"] += 1
+                note_id = ids["notes"]
+                batch["notes"].append(
+                    {
+                        "id": note_id,
+                        "patient_id": patient_id,
+                        "content": "Notatka z sesji",
+                        "created_at": starts_at + timedelta(hours=1),
+                    }
+                )
+            is_paid = rng.random() < paid_share
+            price = rng.choice(PRICES)
+            batch["appointments"].append(
+                {
+                    "id": appointment_id,
+                    "patient_id": patient_id,
+                    "date": day,
+                    "start_time": start_time,
+                    "end_time": (starts_at + timedelta(minutes=SESSION_MINUTES)).time(),
+                    "is_paid": is_paid,
+                    "price": price,
+                    "session_note_id": note_id,
+                }
+            )
+            if is_paid:
+                ids["payments"] += 1
+                batch["payments"].append(
+                    {
+                        "id": ids["payments"],
+                        "patient_id": patient_id,
+                        "amount": price,
+                        "payment_date": starts_at + timedelta(days=rng.randint(0, 7)),
+                        "payment_method": rng.choice(methods),
+                    }
+                )
+                batch["links"].append(
+                    {"payment_id": ids["payments"], "appointment_id": appointment_id}
+                )
+        yield batch
+
+
+class BulkWriter:
+    """Writes batches of rows with COPY where the driver supports it."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.use_copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+
+    def write(self, table, rows: List[dict]) -> None:
+        if not rows:
+            return
+        if self.use_copy:
+            self._copy(table, rows)
+        else:
+            self.conn.execute(table.insert(), rows)
+
+    def _copy(self, table, rows: List[dict]) -> None:
+        columns = list(rows[0])
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # Unquoted empty fields are NULL in COPY's CSV format
+            writer.writerow(
+                value.name if isinstance(value, enum.Enum) else value
+                for value in (row[column] for column in columns)
+            )
+        buffer.seek(0)
+        cursor = self.conn.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer,
+            )
+        finally:
+            cursor.close()
+
+
+def _reset_sequences(conn) -> None:
+    from sqlalchemy import text
+
+    if conn.dialect.name != "postgresql":
+        return
+    # Rows were inserted with explicit ids
+    for table in ("patients", "session_notes", "appointments", "payments"):
+        conn.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"coalesce((SELECT max(id) FROM {table}), 1))"
+            )
+        )
+
+
+def generate(
+    patients: int,
+    appointments: int,
+    payments: int,
+    notes: int,
+    seed: int = 42,
+    batch_size: int = 10_000,
+) -> dict:
+    """Insert the dataset into an empty database and return what was created."""
+    from sqlalchemy import text
+
+    from app.core.database import engine
+    from app.models.appointment import Appointment
+    from app.models.patient import Patient
+    from app.models.payment import Payment, payment_appointments
+    from app.models.session_note import SessionNote
+
+    rng = random.Random(seed)
+    started = clock.perf_counter()
+    counts = {"patients": patients, "appointments": 0, "payments": 0, "notes": 0}
+
+    with engine.begin() as conn:
+        writer = BulkWriter(conn)
+        for first in range(1, patients + 1, batch_size):
+            writer.write(
+                Patient.__table__,
+                [
+                    {
+                        "id": patient_id,
+                        "name": (
+                            f"{rng.choice(FIRST_NAMES)} "
+                            f"{rng.choice(SURNAME_STEMS)}{rng.choice(SURNAME_SUFFIXES)}"
+                        ),
+                        "email": f"pacjent{patient_id}@example.com",
+                        "phone": f"+48 600 {patient_id:06d}",
+                    }
+                    for patient_id in range(first, min(first + batch_size, patients + 1))
+                ],
+            )
+
+        for batch in _batches(rng, patients, appointments, payments, notes, batch_size):
+            for table, key in (
+                (SessionNote.__table__, "notes"),
+                (Appointment.__table__, "appointments"),
+                (Payment.__table__, "payments"),
+                (payment_appointments, "links"),
+            ):
+                writer.write(table, batch[key])
+                if key in counts:
+                    counts[key] += len(batch[key])
+
+        _reset_sequences(conn)
+        conn.execute(text("ANALYZE"))
+
+    counts["method"] = "copy" if writer.use_copy else "executemany"
+    counts["seconds"] = round(clock.perf_counter() - started, 1)
+    return counts
+
+
+def ensure_dataset(preset: str, **overrides: int) -> dict:
+    """Generate the dataset unless the database already has patients."""
+    from app.core.database import SessionLocal
+    from app.models.patient import Patient
+
+    ensure_user()
+    db = SessionLocal()
+    try:
+        existing = db.query(Patient.id).count()
+    finally:
+        db.close()
+    if existing:
+        return {"reused": True, "patients": existing}
+
+    sizes = dict(PRESETS[preset])
+    sizes.update({key: value for key, value in overrides.items() if value is not None})
+    return generate(**sizes)
+
+
+def add_size_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name in ("patients", "appointments", "payments", "notes"):
+        parser.add_argument(f"--{name}", type=int, help="overrides the preset")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_size_arguments(parser)
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="reuse the benchmark database if it already holds a dataset",
+    )
+    args = parser.parse_args()
+
+    use_benchmark_database(f"suite_{args.preset}", fresh=not args.keep)
+    print_report(
+        ensure_dataset(
+            args.preset,
+            patients=args.patients,
+            appointments=args.appointments,
+            payments=args.payments,
+            notes=args.notes,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
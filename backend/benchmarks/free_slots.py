@@ -0,0 +1,203 @@
+"""
+Free-slot search over a quarter of dense calendars.
+
+Books three quarters of working days (the default ``WORKING_HOURS``,
+Monday to Friday 08:00-20:00) with ``--visit``-minute visits separated by
+``--break`` minutes, then cancels a share of them so each quarter has a
+different density:
+
+* ``full``: every visit kept, only the breaks are free;
+* ``busy``: ``--busy`` of the visits kept;
+* ``quiet``: ``--quiet`` of the visits kept.
+
+For each quarter, ``/appointments/free-slots`` is requested ``--repeat``
+times. The benchmark reports statements, free slots found, and median
+times for the request and for ``free_slots`` alone. ``per_slot_probe`` is
+the approach the sweep replaces: one overlap query per candidate start
+every ``--step`` minutes, run on the busy quarter.
+
+    python -m benchmarks.free_slots --duration 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time as clock
+from datetime import date, time, timedelta
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+
+QUARTERS = {
+    "full": (date(2027, 1, 1), date(2027, 3, 31)),
+    "busy": (date(2027, 4, 1), date(2027, 6, 30)),
+    "quiet": (date(2027, 7, 1), date(2027, 9, 30)),
+}
+DAY_START, DAY_END = 8 * 60, 20 * 60
+
+
+def days(first: date, last: date):
+    day = first
+    while day <= last:
+        if day.isoweekday() <= 5:
+            yield day
+        day += timedelta(days=1)
+
+
+def as_time(minutes: int) -> time:
+    return time(minutes // 60, minutes % 60)
+
+
+def book(visit: int, pause: int, kept: dict, patients: int = 50) -> int:
+    from app.core.database import engine
+    from app.models.appointment import Appointment
+    from app.models.patient import Patient
+
+    rng = random.Random(7)
+    rows = []
+    for name, (first, last) in QUARTERS.items():
+        for day in days(first, last):
+            start = DAY_START
+            while start + visit <= DAY_END:
+                if rng.random() < kept[name]:
+                    rows.append(
+                        {
+                            "patient_id": rng.randint(1, patients),
+                            "date": day,
+                            "start_time": as_time(start),
+                            "end_time": as_time(start + visit),
+                            "price": 200,
+                        }
+                    )
+                start += visit + pause
+    with engine.begin() as conn:
+        conn.execute(
+            Patient.__table__.insert(),
+            [
+                {"id": index, "name": f"Pacjent {index}"}
+                for index in range(1, patients + 1)
+            ],
+        )
+        conn.execute(Appointment.__table__.insert(), rows)
+    return len(rows)
+
+
+def service_ms(first: date, last: date, duration: int, repeat: int) -> float:
+    from app.core.database import SessionLocal
+    from app.services.free_slots import free_slots
+
+    db = SessionLocal()
+    try:
+        timings = []
+        for _ in range(repeat):
+            started = clock.perf_counter()
+            free_slots(db, first, last, duration)
+            timings.append(clock.perf_counter() - started)
+    finally:
+        db.close()
+    return round(statistics.median(timings) * 1000, 2)
+
+
+def per_slot_probe(first: date, last: date, duration: int, step: int) -> dict:
+    from sqlalchemy import and_, exists, select
+
+    from app.core.database import SessionLocal
+    from app.core.sql_metrics import query_budget
+    from app.models.appointment import Appointment
+
+    db = SessionLocal()
+    free = 0
+    try:
+        with query_budget(10**6) as stats:
+            started = clock.perf_counter()
+            for day in days(first, last):
+                for start in range(DAY_START, DAY_END - duration + 1, step):
+                    taken = db.execute(
+                        select(
+                            exists().where(
+                                and_(
+                                    Appointment.date == day,
+                                    Appointment.start_time < as_time(start + duration),
+                                    Appointment.end_time > as_time(start),
+                                )
+                            )
+                        )
+                    ).scalar()
+                    free += not taken
+            elapsed = clock.perf_counter() - started
+    finally:
+        db.close()
+    return {
+        "statements": stats.count,
+        "free_starts": free,
+        "ms": round(elapsed * 1000, 1),
+    }
+
+
+async def endpoint(client, first: date, last: date, duration: int, repeat: int):
+    from app.core.sql_metrics import query_budget
+
+    params = {
+        "from": first.isoformat(),
+        "to": last.isoformat(),
+        "duration": duration,
+    }
+    timings = []
+    for _ in range(repeat):
+        with query_budget(10**6) as stats:
+            started = clock.perf_counter()
+            response = await client.get("/appointments/free-slots", params=params)
+            timings.append(clock.perf_counter() - started)
+        response.raise_for_status()
+    data = response.json()
+    return {
+        "statements": stats.count,
+        "days": len(data["days"]),
+        "slots": sum(len(day["slots"]) for day in data["days"]),
+        "ms": round(statistics.median(timings) * 1000, 2),
+    }
+
+
+async def run(duration: int, repeat: int) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        # Resolve the principal once so auth lookups are not counted
+        await client.get("/patients", params={"limit": 1})
+        for name, (first, last) in QUARTERS.items():
+            report[name] = await endpoint(client, first, last, duration, repeat)
+            report[name]["service_ms"] = service_ms(first, last, duration, repeat)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--visit", type=int, default=50)
+    parser.add_argument("--break", dest="pause", type=int, default=10)
+    parser.add_argument("--busy", type=float, default=0.85)
+    parser.add_argument("--quiet", type=float, default=0.4)
+    parser.add_argument("--duration", type=int, default=50)
+    parser.add_argument("--step", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_benchmark_database("free_slots")
+    ensure_user()
+    kept = {"full": 1.0, "busy": args.busy, "quiet": args.quiet}
+    report = {"appointments": book(args.visit, args.pause, kept)}
+    report.update(asyncio.run(run(args.duration, args.repeat)))
+    report["per_slot_probe"] = per_slot_probe(
+        *QUARTERS["busy"], args.duration, args.step
+    )
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Latency of ``GET /patients`` while a burst of logins is in progress.
+
+Compares the old inline bcrypt login (sync endpoint, hashing in the shared
+threadpool) with the bounded process pool used by ``/auth/login`` now.
+Every login client has its own account: ``/auth/login`` lets at most
+``LOGIN_MAX_FAILED_ATTEMPTS`` attempts per account be in flight.
+
+    python -m benchmarks.login_storm --login-clients 20 --requests 200
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+
+from benchmarks.common import (
+    BENCH_PASSWORD,
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    run_clients,
+    use_benchmark_database,
+)
+
+
+def storm_emails(count: int) -> list:
+    return [f"storm{index}@example.com" for index in range(count)]
+
+
+async def _measure(app, login_path: str, args) -> dict:
+    statuses: Counter = Counter()
+    done = asyncio.Event()
+
+    async def storm(client, email: str):
+        while not done.is_set():
+            response = await client.post(
+                login_path,
+                data={"username": email, "password": BENCH_PASSWORD},
+            )
+            statuses[response.status_code] += 1
+
+    async with asgi_client(app) as client:
+        storm_tasks = [
+            asyncio.create_task(storm(client, email))
+            for email in storm_emails(args.login_clients)
+        ]
+        await asyncio.sleep(0.5)
+        patients = await run_clients(
+            client,
+            lambda c: c.get("/patients", headers=auth_headers()),
+            args.clients,
+            args.requests,
+        )
+        done.set()
+        await asyncio.gather(*storm_tasks)
+
+    return {"patients": patients, "login_statuses": dict(statuses)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--login-clients", type=int, default=20)
+    args = parser.parse_args()
+
+    use_benchmark_database("login_storm")
+
+    from fastapi import Depends, HTTPException
+    from fastapi.security import OAuth2PasswordRequestForm
+    from sqlalchemy.orm import Session
+
+    from app.core.database import get_db
+    from app.core.hashing import password_hasher
+    from app.core.principal_cache import principal_cache
+    from app.core.security import create_access_token, verify_password
+    from app.main import app
+    from app.models.user import User
+
+    def inline_login(
+        form_data: OAuth2PasswordRequestForm = Depends(),
+        db: Session = Depends(get_db),
+    ):
+        # The pre-change login: bcrypt inside a threadpool worker.
+        user = db.query(User).filter(User.email == form_data.username).first()
+        if not user or not verify_password(form_data.password, user.hashed_password):
+            raise HTTPException(status_code=401)
+        return {"access_token": create_access_token(subject=user.email)}
+
+    app.add_api_route("/bench/inline-login", inline_login, methods=["POST"])
+    ensure_user()
+    for email in storm_emails(args.login_clients):
+        ensure_user(email)
+    # Keep the principal cache out of the picture; every request authenticates.
+    principal_cache.max_size = 0
+    password_hasher.start()
+
+    try:
+        inline = asyncio.run(_measure(app, "/bench/inline-login", args))
+        pooled = asyncio.run(_measure(app, "/auth/login", args))
+    finally:
+        password_hasher.shutdown()
+
+    print_report(
+        {
+            "login_clients": args.login_clients,
+            "hash_workers": password_hasher.workers,
+            "hash_max_pending": password_hasher.max_pending,
+            "inline_bcrypt": inline,
+            "process_pool_bcrypt": pooled,
+        }
+    )
+
+
+if __name__ == "__main__":
+    main()
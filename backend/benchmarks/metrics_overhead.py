@@ -0,0 +1,162 @@
+"""
+Cost of the Prometheus metrics middleware.
+
+Two measurements:
+
+* microseconds the middleware adds per request, wrapping an ASGI app that
+  returns immediately, so nothing else hides the cost;
+* throughput of the whole API with and without the middleware in its
+  stack. Both stacks are built in one process and alternate for
+  ``--repeat`` rounds; the round with the median throughput is reported,
+  since separate processes on a busy machine differ more than the
+  middleware does.
+
+Also reports how long rendering ``/metrics`` takes with every route seen.
+
+    python -m benchmarks.metrics_overhead --requests 3000 --repeat 3
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    run_clients,
+    use_benchmark_database,
+)
+
+MONITORING_TOKEN = "bench-monitoring"
+
+
+async def _empty_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _middleware_cost(calls: int) -> dict:
+    from app.core.metrics import MetricsMiddleware, MetricsRegistry
+    from app.main import app
+
+    # As the router leaves it, so the route template lookup is included
+    route = next(route for route in app.routes if route.path == "/patients/{patient_id}")
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/patients/1",
+        "app": app,
+        "endpoint": route.endpoint,
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    async def timed(app) -> float:
+        started = time.perf_counter()
+        for _ in range(calls):
+            await app(dict(scope), receive, send)
+        return (time.perf_counter() - started) / calls
+
+    bare = await timed(_empty_app)
+    wrapped = await timed(MetricsMiddleware(_empty_app, MetricsRegistry()))
+    return {
+        "calls": calls,
+        "bare_us": round(bare * 1e6, 2),
+        "with_middleware_us": round(wrapped * 1e6, 2),
+        "overhead_us": round((wrapped - bare) * 1e6, 2),
+    }
+
+
+def _stacks(app) -> dict:
+    """The app's middleware stack with and without MetricsMiddleware."""
+    from app.core.metrics import MetricsMiddleware
+
+    with_metrics = app.build_middleware_stack()
+    middleware = list(app.user_middleware)
+    app.user_middleware = [m for m in middleware if m.cls is not MetricsMiddleware]
+    try:
+        without_metrics = app.build_middleware_stack()
+    finally:
+        app.user_middleware = middleware
+    return {"metrics_enabled": with_metrics, "metrics_disabled": without_metrics}
+
+
+async def _throughput(clients: int, total: int, repeat: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.main import app
+    from app.models.patient import Patient
+
+    db = SessionLocal()
+    try:
+        patient_id = db.query(Patient.id).first()[0]
+    finally:
+        db.close()
+
+    stacks = _stacks(app)
+    paths = {"health": "/health", "patient": f"/patients/{patient_id}"}
+    rounds = {mode: {name: [] for name in paths} for mode in stacks}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        for _ in range(repeat):
+            for mode, stack in stacks.items():
+                app.middleware_stack = stack
+                for name, path in paths.items():
+                    request = lambda c, path=path: c.get(path)
+                    await run_clients(client, request, clients, clients)
+                    rounds[mode][name].append(
+                        await run_clients(client, request, clients, total)
+                    )
+
+        started = time.perf_counter()
+        response = await client.get(
+            "/metrics", headers={"Authorization": f"Bearer {MONITORING_TOKEN}"}
+        )
+        render_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    report = {
+        mode: {name: _median_round(results) for name, results in by_path.items()}
+        for mode, by_path in rounds.items()
+    }
+    report["render_metrics_ms"] = render_ms
+    report["metrics_bytes"] = len(response.content)
+    return report
+
+
+def _median_round(results: list) -> dict:
+    return sorted(results, key=lambda result: result["rps"])[len(results) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    use_benchmark_database("metrics_overhead")
+    os.environ["MONITORING_TOKEN"] = MONITORING_TOKEN
+    ensure_user()
+    from app.core.database import SessionLocal
+    from app.models.patient import Patient
+
+    db = SessionLocal()
+    try:
+        db.add(Patient(name="Pacjent"))
+        db.commit()
+    finally:
+        db.close()
+
+    report = {"middleware": asyncio.run(_middleware_cost(args.calls))}
+    report.update(asyncio.run(_throughput(args.clients, args.requests, args.repeat)))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Deep pages: OFFSET versus keyset cursors.
+
+Loads a practice with ``benchmarks.dataset`` and times a page of
+``--limit`` rows at increasing depths of ``/appointments`` and
+``/payments``. Each depth is requested once with ``skip`` and once with
+the cursor of the row before it. The ``skip`` requests also pay for the
+exact ``total`` of ``/payments``; the cursor requests skip it by default.
+
+It then books ``--burst`` visits, notes and payments for one patient
+through the API, so their timestamps share a second, and follows every
+cursor of the lists with ``--walk-limit`` rows a page. A list that repeats
+a row or never ends is a failure and the command exits with status 1.
+
+    python -m benchmarks.pagination --appointments 200000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import generate
+
+# After the generated calendar, which ends with benchmarks.dataset.LAST_DAY
+BURST_FROM = date(2031, 1, 1)
+
+
+async def _timed(client, path: str, params: dict, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(path, params=params)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return round(statistics.median(timings) * 1000, 2)
+
+
+async def _cursor_at(client, path: str, depth: int) -> str:
+    """Cursor of the row just before ``depth``, found with one offset query."""
+    response = await client.get(path, params={"skip": depth - 1, "limit": 1})
+    response.raise_for_status()
+    return response.headers["x-next-cursor"]
+
+
+async def walk(client, path: str, params: dict, limit: int) -> dict:
+    """Follow every cursor of ``path``; raises on a row seen twice."""
+    seen, pages, cursor = set(), 0, None
+    while True:
+        page = {**params, "limit": limit}
+        if cursor:
+            page["cursor"] = cursor
+        response = await client.get(path, params=page)
+        response.raise_for_status()
+        data = response.json()
+        ids = [row["id"] for row in (data["payments"] if "payments" in data else data)]
+        repeated = seen.intersection(ids)
+        if repeated:
+            raise AssertionError(
+                f"{path} page {pages + 1} repeats rows {sorted(repeated)}"
+            )
+        seen.update(ids)
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return {"path": path, "rows": len(seen), "pages": pages}
+
+
+async def burst(client, visits: int) -> int:
+    """One patient with ``visits`` paid, noted visits written back to back."""
+    response = await client.post("/patients", json={"name": "Pacjent Kursor"})
+    response.raise_for_status()
+    patient_id = response.json()["id"]
+    for day in range(visits):
+        response = await client.post(
+            "/appointments",
+            json={
+                "patient_id": patient_id,
+                "date": (BURST_FROM + timedelta(days=day)).isoformat(),
+                "start_time": "10:00",
+                "end_time": "10:50",
+                "price": "200",
+            },
+        )
+        response.raise_for_status()
+        for path, payload in (
+            ("/session_notes", {"content": f"Notatka {day}"}),
+            (
+                "/payments",
+                {
+                    "amount": "200",
+                    "payment_method": "CASH",
+                    "appointment_ids": [response.json()["id"]],
+                },
+            ),
+        ):
+            created = await client.post(
+                path, json={"patient_id": patient_id, **payload}
+            )
+            created.raise_for_status()
+    return patient_id
+
+
+async def round_trip(visits: int, limit: int) -> dict:
+    from app.main import app
+
+    results, failures = [], []
+    async with asgi_client(app, headers=auth_headers()) as client:
+        patient_id = await burst(client, visits)
+        for path, params in (
+            ("/appointments", {"date_from": BURST_FROM.isoformat()}),
+            ("/session_notes", {}),
+            (f"/session_notes/{patient_id}", {}),
+            ("/payments", {"patient_id": patient_id}),
+        ):
+            try:
+                results.append(await walk(client, path, params, limit))
+            except AssertionError as exc:
+                failures.append(str(exc))
+    return {"results": results, "failures": failures}
+
+
+async def run(depths: list, limit: int, repeat: int) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        for path in ("/appointments", "/payments"):
+            rows = []
+            for depth in depths:
+                cursor = await _cursor_at(client, path, depth)
+                rows.append(
+                    {
+                        "depth": depth,
+                        "offset_ms": await _timed(
+                            client, path, {"skip": depth, "limit": limit}, repeat
+                        ),
+                        "cursor_ms": await _timed(
+                            client, path, {"cursor": cursor, "limit": limit}, repeat
+                        ),
+                    }
+                )
+            report[path] = rows
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=1000)
+    parser.add_argument("--appointments", type=int, default=200_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--burst", type=int, default=20)
+    parser.add_argument("--walk-limit", type=int, default=3)
+    args = parser.parse_args()
+
+    use_benchmark_database("pagination")
+    ensure_user()
+    generate(
+        patients=args.patients,
+        appointments=args.appointments,
+        payments=args.appointments // 2,
+        notes=0,
+    )
+    payments = args.appointments // 2
+    depths = [
+        depth
+        for depth in (100, 1_000, 10_000, 50_000, 90_000)
+        if depth + args.limit < payments
+    ]
+    report = asyncio.run(run(depths, args.limit, args.repeat))
+    report["round_trip"] = asyncio.run(round_trip(args.burst, args.walk_limit))
+    print_report(report)
+    sys.exit(1 if report["round_trip"]["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Deleting a patient with a long history.
+
+Loads two patients sharing ``--appointments`` appointments (about half
+each, with payments and session notes) and deletes one of them each way:
+
+* ``orm_cascade``: ``db.delete(patient)``, the ORM cascade the endpoint
+  used to rely on;
+* ``set_based``: ``DELETE /patients/{id}``.
+
+Reports statements, wall time and the rows left behind.
+
+    python -m benchmarks.patient_delete --appointments 10000
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import generate
+
+
+def history_size(patient_id: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.models.appointment import Appointment
+    from app.models.payment import Payment
+    from app.models.session_note import SessionNote
+
+    db = SessionLocal()
+    try:
+        return {
+            "appointments": db.query(Appointment)
+            .filter(Appointment.patient_id == patient_id)
+            .count(),
+            "payments": db.query(Payment).filter(Payment.patient_id == patient_id).count(),
+            "session_notes": db.query(SessionNote)
+            .filter(SessionNote.patient_id == patient_id)
+            .count(),
+        }
+    finally:
+        db.close()
+
+
+def orphaned_links() -> int:
+    from sqlalchemy import text
+
+    from app.core.database import engine
+
+    with engine.connect() as conn:
+        return conn.execute(
+            text(
+                "SELECT count(*) FROM payment_appointments "
+                "WHERE payment_id NOT IN (SELECT id FROM payments) "
+                "OR appointment_id NOT IN (SELECT id FROM appointments)"
+            )
+        ).scalar()
+
+
+def orm_cascade(patient_id: int) -> dict:
+    from app.core.database import SessionLocal
+    from app.core.sql_metrics import query_budget
+    from app.models.patient import Patient
+
+    db = SessionLocal()
+    try:
+        with query_budget(10**6) as stats:
+            started = time.perf_counter()
+            db.delete(db.get(Patient, patient_id))
+            db.commit()
+            elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+    return {"statements": stats.count, "ms": round(elapsed * 1000, 1)}
+
+
+async def set_based(patient_id: int) -> dict:
+    from app.core.sql_metrics import query_budget
+    from app.main import app
+
+    async with asgi_client(app, headers=auth_headers()) as client:
+        # Resolve the principal first so auth lookups are not counted
+        await client.get("/patients", params={"limit": 1})
+        with query_budget(10**6) as stats:
+            started = time.perf_counter()
+            response = await client.delete(f"/patients/{patient_id}")
+            elapsed = time.perf_counter() - started
+        response.raise_for_status()
+    return {"statements": stats.count, "ms": round(elapsed * 1000, 1)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--appointments", type=int, default=10_000)
+    args = parser.parse_args()
+
+    use_benchmark_database("patient_delete")
+    ensure_user()
+    generate(
+        patients=2,
+        appointments=args.appointments,
+        payments=args.appointments // 2,
+        notes=args.appointments // 4,
+    )
+
+    report = {}
+    for name, patient_id in (("orm_cascade", 1), ("set_based", 2)):
+        history = history_size(patient_id)
+        if name == "orm_cascade":
+            result = orm_cascade(patient_id)
+        else:
+            result = asyncio.run(set_based(patient_id))
+        report[name] = {
+            "history": history,
+            **result,
+            "rows_left": history_size(patient_id),
+        }
+    report["orphaned_payment_links"] = orphaned_links()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Patient import: one POST per patient versus a streamed POST /patients/import.
+
+Creates ``--single`` patients one request at a time, then streams CSV and
+NDJSON files of increasing size to the import endpoint. The bodies are
+generated while they are sent, so neither side holds a whole file. Peak
+Python memory of each import (``tracemalloc``) should stay flat as the
+files grow, also for ``runaway`` bodies whose records never end: NDJSON
+without newlines and CSV with a quote opened in the first row and never
+closed.
+
+    python -m benchmarks.patient_import --rows 10000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+def patient(index: int) -> dict:
+    return {
+        "name": f"Pacjent Importowany {index}",
+        "email": f"import{index}@example.com",
+        "phone": f"+48 700 {index:06d}",
+        "notes": "Przeniesiony z poprzedniego systemu",
+    }
+
+
+async def body(fmt: str, rows: int, lines_per_chunk: int = 200):
+    if fmt == "csv":
+        yield b"name,email,phone,notes\n"
+    lines = []
+    for index in range(rows):
+        row = patient(index)
+        if fmt == "csv":
+            lines.append(",".join(row.values()))
+        else:
+            lines.append(json.dumps(row))
+        if len(lines) == lines_per_chunk:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def runaway(fmt: str, rows: int):
+    chunks = body(fmt, rows)
+    if fmt == "csv":
+        yield await chunks.__anext__()
+        yield b'"'
+    async for chunk in chunks:
+        yield chunk.replace(b"\n", b" ") if fmt == "ndjson" else chunk
+
+
+async def single_posts(client, count: int) -> dict:
+    started = time.perf_counter()
+    for index in range(count):
+        response = await client.post("/patients", json=patient(index))
+        response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return {
+        "rows": count,
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(count / elapsed),
+    }
+
+
+async def streamed(client, fmt: str, rows: int, content=None) -> dict:
+    tracemalloc.reset_peak()
+    started = time.perf_counter()
+    response = await client.post(
+        "/patients/import",
+        content=content or body(fmt, rows),
+        headers={"content-type": CONTENT_TYPES[fmt]},
+    )
+    elapsed = time.perf_counter() - started
+    response.raise_for_status()
+    report = response.json()
+    return {
+        "rows": rows,
+        "imported": report["imported"],
+        "failed": report["failed"],
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed),
+        "peak_mib": round(tracemalloc.get_traced_memory()[1] / 2**20, 2),
+    }
+
+
+async def run(single: int, sizes: list) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers(), timeout=600.0) as client:
+        report["single_posts"] = await single_posts(client, single)
+        tracemalloc.start()
+        for fmt in ("csv", "ndjson"):
+            report[fmt] = [await streamed(client, fmt, rows) for rows in sizes]
+        report["runaway"] = {
+            fmt: await streamed(client, fmt, sizes[-1], runaway(fmt, sizes[-1]))
+            for fmt in ("csv", "ndjson")
+        }
+        tracemalloc.stop()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--single", type=int, default=500)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    use_benchmark_database("patient_import")
+    ensure_user()
+    print_report(asyncio.run(run(args.single, args.rows)))
+
+
+if __name__ == "__main__":
+    main()
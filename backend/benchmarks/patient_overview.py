@@ -0,0 +1,102 @@
+"""
+The patient page: four calls versus /patients/{id}/overview.
+
+Loads a practice with ``benchmarks.dataset`` and opens the page of
+``--sample`` random patients both ways:
+
+* ``four_calls``: what ``PatientDetail.tsx`` used to do, the patient,
+  ``/appointments`` (filtered in the browser), the patient's session notes
+  and ``/payments?patient_id=``, sent concurrently;
+* ``overview``: one ``/patients/{id}/overview`` request.
+
+Reports statements, response bytes and wall time per page view (medians).
+
+    python -m benchmarks.patient_overview --appointments 100000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import generate
+
+
+def four_calls(patient_id: int) -> list:
+    return [
+        (f"/patients/{patient_id}", {}),
+        ("/appointments", {}),
+        (f"/session_notes/{patient_id}", {}),
+        ("/payments", {"patient_id": patient_id}),
+    ]
+
+
+def overview(patient_id: int) -> list:
+    return [(f"/patients/{patient_id}/overview", {})]
+
+
+async def page_view(client, requests: list) -> dict:
+    from app.core.sql_metrics import query_budget
+
+    with query_budget(10**6) as stats:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.get(path, params=params) for path, params in requests)
+        )
+        elapsed = time.perf_counter() - started
+    for response in responses:
+        response.raise_for_status()
+    return {
+        "requests": len(requests),
+        "statements": stats.count,
+        "bytes": sum(len(response.content) for response in responses),
+        "ms": elapsed * 1000,
+    }
+
+
+async def run(patient_ids: list) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        # Resolve the principal once so auth lookups are not counted
+        await client.get("/patients", params={"limit": 1})
+        for name, pattern in (("four_calls", four_calls), ("overview", overview)):
+            views = [await page_view(client, pattern(pid)) for pid in patient_ids]
+            report[name] = {
+                key: round(statistics.median(view[key] for view in views), 2)
+                for key in ("requests", "statements", "bytes", "ms")
+            }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=1_000)
+    parser.add_argument("--appointments", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=50)
+    args = parser.parse_args()
+
+    use_benchmark_database("patient_overview")
+    ensure_user()
+    generate(
+        patients=args.patients,
+        appointments=args.appointments,
+        payments=args.appointments // 2,
+        notes=args.appointments // 4,
+    )
+    rng = random.Random(7)
+    patient_ids = [rng.randint(1, args.patients) for _ in range(args.sample)]
+    print_report(asyncio.run(run(patient_ids)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Latency of /patients/search on a large patient list.
+
+Loads ``--patients`` patients with ``benchmarks.dataset`` and times a set
+of queries: exact and misspelled names, a partial email and phone numbers
+typed in different formats. The first request on SQLite also builds the
+in-process trigram index and is reported separately. On PostgreSQL
+(``DATABASE_URL`` set) the pg_trgm index is used instead.
+
+    python -m benchmarks.patient_search --patients 100000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import generate
+
+QUERIES = [
+    "kowalski",
+    "kowalsky",
+    "anna nowakowska",
+    "wiśniewska",
+    "pacjent4242",
+    "+48 600 004 242",
+    "600-004-242",
+]
+
+
+async def run(limit: int, repeat: int) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        started = time.perf_counter()
+        response = await client.get("/patients/search", params={"q": "nowak"})
+        response.raise_for_status()
+        report["first_request_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        for query in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                response = await client.get(
+                    "/patients/search", params={"q": query, "limit": limit}
+                )
+                timings.append(time.perf_counter() - started)
+                response.raise_for_status()
+            results = response.json()
+            report[query] = {
+                "p50_ms": round(statistics.median(timings) * 1000, 2),
+                "results": len(results),
+                "top": results[0]["name"] if results else None,
+            }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    use_benchmark_database("patient_search")
+    ensure_user()
+    generate(patients=args.patients, appointments=0, payments=0, notes=0)
+    print_report(asyncio.run(run(args.limit, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
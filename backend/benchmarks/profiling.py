@@ -0,0 +1,95 @@
+"""
+Cost of the request profiler.
+
+* microseconds the middleware adds to a request that is not profiled, with
+  a token configured (without one the middleware is not installed);
+* latency of ``GET /payments/statistics/summary`` with and without
+  ``X-Profile``, and the number of samples a profiled request collects.
+
+    python -m benchmarks.profiling --requests 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    run_clients,
+    use_benchmark_database,
+)
+from benchmarks.query_plans import seed
+
+TOKEN = "bench-profiling-token"
+
+
+async def _middleware_cost(calls: int) -> dict:
+    from app.core.profiling import ProfilingMiddleware
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/payments/statistics/summary",
+        "headers": [(b"host", b"bench"), (b"authorization", b"Bearer x")],
+    }
+
+    async def empty_app(scope, receive, send):
+        pass
+
+    async def timed(app) -> float:
+        started = time.perf_counter()
+        for _ in range(calls):
+            await app(scope, None, None)
+        return (time.perf_counter() - started) / calls
+
+    bare = await timed(empty_app)
+    wrapped = await timed(ProfilingMiddleware(empty_app))
+    return {"calls": calls, "overhead_us": round((wrapped - bare) * 1e6, 2)}
+
+
+async def _profiled_requests(total: int) -> dict:
+    from app.main import app
+
+    path = "/payments/statistics/summary"
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        await client.get(path)
+        report["plain"] = await run_clients(client, lambda c: c.get(path), 1, total)
+        profiled = lambda c: c.get(path, headers={"X-Profile": TOKEN})
+        report["profiled"] = await run_clients(client, profiled, 1, total)
+        response = await profiled(client)
+    report["profile_file"] = os.path.join(
+        os.environ["PROFILING_DIR"], response.headers["x-profile-file"]
+    )
+    with open(report["profile_file"]) as profile:
+        report["profile_samples"] = sum(int(line.rsplit(" ", 1)[1]) for line in profile)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--patients", type=int, default=500)
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    use_benchmark_database("profiling")
+    os.environ["PROFILING_TOKEN"] = TOKEN
+    os.environ.setdefault(
+        "PROFILING_DIR", os.path.join(tempfile.gettempdir(), "therapyassistance_profiles")
+    )
+    ensure_user()
+    seed(args.patients, appointments_per_patient=10, notes_per_patient=1)
+
+    report = {"untriggered_middleware": asyncio.run(_middleware_cost(args.calls))}
+    report.update(asyncio.run(_profiled_requests(args.requests)))
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Query budget per endpoint.
+
+Runs the same requests as ``benchmarks.query_plans`` on a smaller dataset,
+wrapping each in ``query_budget``. Exits with status 1 when an endpoint
+issues more statements than its budget, for example after a lazy load
+starts firing once per row. Also prints the ``Server-Timing`` header that
+the API returns.
+
+    python -m benchmarks.query_budgets
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import sys
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.query_plans import scenarios, seed
+
+# (method, path prefix) -> statements allowed, auth lookups excluded.
+# The first match wins, so longer prefixes come first; ``*`` matches an id.
+# Every GET includes the lookup behind its ETag.
+BUDGETS = [
+    ("GET", "/patients/*/overview", 7),
+    ("GET", "/patients", 2),
+    ("GET", "/appointments/calendar", 2),
+    ("GET", "/appointments/free-slots", 2),
+    ("GET", "/appointments", 2),
+    ("GET", "/session_notes/note/", 2),
+    ("GET", "/session_notes", 3),
+    ("GET", "/payments/patient/", 3),
+    ("GET", "/payments/statistics/", 2),
+    ("GET", "/payments", 4),
+    ("POST", "/appointments", 3),
+    ("DELETE", "/appointments/", 4),
+    ("DELETE", "/session_notes/", 4),
+    ("DELETE", "/patients/", 7),
+]
+
+
+def budget_for(method: str, path: str) -> int:
+    for budget_method, prefix, budget in BUDGETS:
+        if method == budget_method and fnmatch.fnmatchcase(path, prefix + "*"):
+            return budget
+    raise KeyError(f"No query budget for {method} {path}")
+
+
+async def run(ids: dict) -> dict:
+    from app.core.sql_metrics import QueryBudgetExceeded, query_budget
+    from app.main import app
+
+    results, failures = [], []
+    async with asgi_client(app, headers=auth_headers()) as client:
+        # Resolve the principal once so auth lookups stay out of the budgets
+        await client.get("/patients")
+        for method, path, kwargs, _ in scenarios(ids):
+            label = f"{method} {path}"
+            budget = budget_for(method, path)
+            try:
+                with query_budget(budget, label) as stats:
+                    response = await client.request(method, path, **kwargs)
+            except QueryBudgetExceeded as exc:
+                failures.append(str(exc))
+            results.append(
+                {
+                    "request": label,
+                    "status": response.status_code,
+                    "queries": stats.count,
+                    "budget": budget,
+                    "server_timing": response.headers.get("server-timing"),
+                }
+            )
+    return {"results": results, "failures": failures}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=50)
+    args = parser.parse_args()
+
+    use_benchmark_database("query_budgets")
+    ensure_user()
+    ids = seed(args.patients, appointments_per_patient=10, notes_per_patient=3)
+    report = asyncio.run(run(ids))
+    print_report(report)
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
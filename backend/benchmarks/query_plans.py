@@ -0,0 +1,329 @@
+"""
+Query-plan regression check for the router queries.
+
+Loads a synthetic dataset, calls every data endpoint through the ASGI app,
+captures the SELECT statements it sends and runs EXPLAIN on each of them
+with the same parameters. Exits with status 1 when a plan contains a full
+table scan, so it can gate CI:
+
+    python -m benchmarks.query_plans
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.query_plans
+
+SQLite reports ``SCAN <table>`` for a table scan and PostgreSQL
+``Seq Scan on <table>``. Index scans (``SCAN t USING INDEX``) are accepted.
+"""
+
+import argparse
+import asyncio
+import random
+import re
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import List, Tuple
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+
+# Tables that are read through the principal cache or only on login
+IGNORED_TABLES = {"users", "refresh_tokens"}
+
+SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+POSTGRES_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+
+def seed(patients: int, appointments_per_patient: int, notes_per_patient: int) -> dict:
+    from sqlalchemy import text
+
+    from app.core.database import engine
+    from app.models.appointment import Appointment
+    from app.models.patient import Patient
+    from app.models.payment import Payment, PaymentMethod, payment_appointments
+    from app.models.session_note import SessionNote
+
+    rng = random.Random(42)
+    first_day = date(2024, 1, 1)
+    now = datetime(2026, 1, 1, 12, 0)
+
+    with engine.begin() as conn:
+        conn.execute(
+            Patient.__table__.insert(),
+            [{"id": i, "name": f"Pacjent {i}"} for i in range(1, patients + 1)],
+        )
+
+        notes = []
+        for patient_id in range(1, patients + 1):
+            for _ in range(notes_per_patient):
+                notes.append(
+                    {
+                        "id": len(notes) + 1,
+                        "patient_id": patient_id,
+                        "content": "Notatka",
+                        "created_at": now - timedelta(minutes=rng.randint(0, 10**6)),
+                    }
+                )
+        conn.execute(SessionNote.__table__.insert(), notes)
+
+        # Twenty half-hour slots a day, shuffled so appointments cannot overlap
+        slots = list(range(patients * appointments_per_patient))
+        rng.shuffle(slots)
+
+        appointments, payments, links = [], [], []
+        for patient_id in range(1, patients + 1):
+            for index in range(appointments_per_patient):
+                slot = slots[len(appointments)]
+                start = time(8 + slot % 20 // 2, slot % 2 * 30)
+                appointment_id = len(appointments) + 1
+                note_id = (patient_id - 1) * notes_per_patient + index + 1
+                is_paid = rng.random() < 0.7
+                appointments.append(
+                    {
+                        "id": appointment_id,
+                        "patient_id": patient_id,
+                        "date": first_day + timedelta(days=slot // 20),
+                        "start_time": start,
+                        "end_time": time(start.hour, start.minute + 29),
+                        "is_paid": is_paid,
+                        "price": Decimal("150.00"),
+                        "session_note_id": note_id
+                        if index < notes_per_patient
+                        else None,
+                    }
+                )
+                if is_paid:
+                    payments.append(
+                        {
+                            "id": len(payments) + 1,
+                            "patient_id": patient_id,
+                            "amount": Decimal("150.00"),
+                            "payment_date": now
+                            - timedelta(minutes=rng.randint(0, 10**6)),
+                            "payment_method": rng.choice(list(PaymentMethod)),
+                        }
+                    )
+                    links.append(
+                        {"payment_id": len(payments), "appointment_id": appointment_id}
+                    )
+        conn.execute(Appointment.__table__.insert(), appointments)
+        conn.execute(Payment.__table__.insert(), payments)
+        conn.execute(payment_appointments.insert(), links)
+        conn.execute(text("ANALYZE"))
+
+    paid = next(a for a in reversed(appointments) if a["is_paid"])
+    return {
+        "patient_id": patients // 2,
+        "deleted_patient_id": patients,
+        "appointment_id": len(appointments) // 2,
+        "paid_appointment_id": paid["id"],
+        "note_id": len(notes) // 2,
+        "deleted_note_id": len(notes),
+        "payment_id": len(payments) // 2,
+    }
+
+
+def _cursor(keyset, **key) -> dict:
+    return {"cursor": keyset.encode(SimpleNamespace(**key))}
+
+
+def scenarios(ids: dict) -> List[Tuple[str, str, dict, set]]:
+    """(method, path, request kwargs, tables a full scan is accepted on)"""
+    from app.routers.appointments import APPOINTMENT_KEYSET
+    from app.routers.patients import PATIENT_KEYSET
+    from app.routers.payments import PAYMENT_KEYSET
+    from app.routers.session_notes import SESSION_NOTE_KEYSET
+
+    range_params = {"date_from": "2025-03-01", "date_to": "2025-03-07"}
+    deep = datetime(2025, 3, 1, 12, 0)
+    return [
+        # Unfiltered, paginated listings read the first page of the table
+        ("GET", "/patients", {}, {"patients"}),
+        ("GET", f"/patients/{ids['patient_id']}", {}, set()),
+        ("GET", f"/patients/{ids['patient_id']}/overview", {}, set()),
+        ("GET", "/appointments", {"params": range_params}, set()),
+        ("GET", f"/appointments/{ids['appointment_id']}", {}, set()),
+        (
+            "GET",
+            "/appointments/calendar",
+            {"params": {"from": "2025-02-24", "to": "2025-04-06"}},
+            set(),
+        ),
+        (
+            "GET",
+            "/appointments/free-slots",
+            {"params": {"from": "2025-01-01", "to": "2025-03-31", "duration": 50}},
+            set(),
+        ),
+        ("GET", "/session_notes", {}, set()),
+        ("GET", f"/session_notes/{ids['patient_id']}", {}, set()),
+        ("GET", f"/session_notes/note/{ids['note_id']}", {}, set()),
+        ("GET", "/payments", {"params": {"patient_id": ids["patient_id"]}}, set()),
+        ("GET", "/payments", {"params": range_params}, set()),
+        ("GET", f"/payments/{ids['payment_id']}", {}, set()),
+        (
+            "GET",
+            f"/payments/patient/{ids['patient_id']}/unpaid-appointments",
+            {},
+            set(),
+        ),
+        ("GET", "/payments/statistics/summary", {"params": range_params}, set()),
+        # Keyset pages deep into the history
+        (
+            "GET",
+            "/patients",
+            {"params": _cursor(PATIENT_KEYSET, id=ids["patient_id"])},
+            set(),
+        ),
+        (
+            "GET",
+            "/appointments",
+            {
+                "params": _cursor(
+                    APPOINTMENT_KEYSET,
+                    date=deep.date(),
+                    start_time=time(10, 0),
+                    id=ids["appointment_id"],
+                )
+            },
+            set(),
+        ),
+        (
+            "GET",
+            "/session_notes",
+            {"params": _cursor(SESSION_NOTE_KEYSET, created_at=deep, id=ids["note_id"])},
+            set(),
+        ),
+        (
+            "GET",
+            "/payments",
+            {
+                "params": _cursor(
+                    PAYMENT_KEYSET, payment_date=deep, id=ids["payment_id"]
+                )
+            },
+            set(),
+        ),
+        (
+            "POST",
+            "/appointments",
+            {
+                "json": {
+                    "patient_id": ids["patient_id"],
+                    "date": "2040-01-02",
+                    "start_time": "10:00:00",
+                    "end_time": "10:50:00",
+                    "price": "150.00",
+                }
+            },
+            set(),
+        ),
+        ("DELETE", f"/appointments/{ids['paid_appointment_id']}", {}, set()),
+        ("DELETE", f"/session_notes/{ids['deleted_note_id']}", {}, set()),
+        ("DELETE", f"/patients/{ids['deleted_patient_id']}", {}, set()),
+    ]
+
+
+@contextmanager
+def capture_selects(engine):
+    from sqlalchemy import event
+
+    statements = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
+def _base_table(name: str) -> str:
+    # Eager loads alias tables as appointments_1, patients_1, ...
+    return re.sub(r"_\d+$", "", name)
+
+
+def explain(engine, statement: str, parameters) -> Tuple[List[str], List[str]]:
+    """Return the plan lines and the tables scanned sequentially."""
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plan = [row[-1] for row in rows]
+            matches = [SQLITE_SCAN.match(line) for line in plan]
+        else:
+            rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            plan = [row[0] for row in rows]
+            matches = [POSTGRES_SCAN.search(line) for line in plan]
+    scanned = [
+        _base_table(match.group(1))
+        for match in matches
+        if match and not match.group(1).startswith("anon_")
+    ]
+    return plan, scanned
+
+
+async def run(ids: dict, verbose: bool) -> dict:
+    from app.core.database import engine
+    from app.main import app
+
+    results, failures = [], []
+    async with asgi_client(app, headers=auth_headers()) as client:
+        for method, path, kwargs, allowed in scenarios(ids):
+            with capture_selects(engine) as statements:
+                response = await client.request(method, path, **kwargs)
+            entry = {
+                "request": f"{method} {path}",
+                "status": response.status_code,
+                "statements": 0,
+            }
+            for statement, parameters in statements:
+                plan, scanned = explain(engine, statement, parameters)
+                tables = {_base_table(t) for t in re.findall(r"FROM (\w+)", statement)}
+                if tables <= IGNORED_TABLES:
+                    continue
+                entry["statements"] += 1
+                offending = sorted(set(scanned) - allowed - IGNORED_TABLES)
+                if offending:
+                    failures.append(
+                        {
+                            "request": entry["request"],
+                            "tables": offending,
+                            "statement": " ".join(statement.split()),
+                            "plan": plan,
+                        }
+                    )
+                if verbose:
+                    entry.setdefault("plans", []).append(plan)
+            if response.status_code >= 400:
+                failures.append({"request": entry["request"], "error": response.text})
+            results.append(entry)
+    return {"dialect": engine.dialect.name, "results": results, "failures": failures}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--appointments-per-patient", type=int, default=25)
+    parser.add_argument("--notes-per-patient", type=int, default=5)
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    use_benchmark_database("query_plans")
+
+    ensure_user()
+    ids = seed(args.patients, args.appointments_per_patient, args.notes_per_patient)
+    report = asyncio.run(run(ids, args.verbose))
+    print_report(report)
+    sys.exit(1 if report["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Read-replica routing check with SQLite files standing in for the servers.
+
+Replication is simulated by copying the primary file over each replica, so
+the replicas lag until ``replicate()`` is called. The script checks that
+read-only endpoints go to the replicas round-robin, and that a user who has
+just written reads from the primary until READ_YOUR_WRITES_SECONDS passes,
+also when another worker serves the read and only the ``X-Last-Write``
+header it echoes tells of the write.
+
+    python -m benchmarks.read_replicas --reads 200
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+
+OTHER_EMAIL = "replica-reader@example.com"
+REPLICAS = 2
+
+
+def _prepare_environment() -> list:
+    replica_paths = [
+        os.path.join(tempfile.gettempdir(), f"therapyassistance_replica_{i + 1}.db")
+        for i in range(REPLICAS)
+    ]
+    for path in replica_paths:
+        if os.path.exists(path):
+            os.remove(path)
+    os.environ["DATABASE_REPLICA_URLS"] = ",".join(
+        f"sqlite:///{path}" for path in replica_paths
+    )
+    os.environ.setdefault("READ_YOUR_WRITES_SECONDS", "1")
+    return replica_paths
+
+
+def _replicate(primary_path: str, replica_paths: list) -> None:
+    from app.core.database import replica_engines
+
+    for replica_engine in replica_engines:
+        replica_engine.dispose()
+    for path in replica_paths:
+        shutil.copyfile(primary_path, path)
+
+
+def _checkouts() -> dict:
+    from app.core.pool_metrics import pool_report
+
+    return {entry["name"]: entry["checkouts"] for entry in pool_report()}
+
+
+async def _names(client, headers) -> set:
+    response = await client.get("/patients", headers=headers)
+    response.raise_for_status()
+    return {patient["name"] for patient in response.json()}
+
+
+async def run(reads: int, primary_path: str, replica_paths: list) -> dict:
+    from app.core.config import settings
+    from app.core.database import LAST_WRITE_HEADER, recent_writers
+    from app.main import app
+
+    ensure_user()
+    ensure_user(OTHER_EMAIL)
+    _replicate(primary_path, replica_paths)
+
+    writer = auth_headers()
+    reader = auth_headers(OTHER_EMAIL)
+    checks = {}
+
+    async with asgi_client(app) as client:
+        response = await client.post(
+            "/patients", json={"name": "Nowy Pacjent"}, headers=writer
+        )
+        response.raise_for_status()
+
+        checks["writer_sees_own_write"] = "Nowy Pacjent" in await _names(client, writer)
+        checks["other_user_reads_stale_replica"] = "Nowy Pacjent" not in await _names(
+            client, reader
+        )
+
+        # A worker that did not commit the write only has the echoed header
+        marker = {LAST_WRITE_HEADER: response.headers[LAST_WRITE_HEADER]}
+        recent_writers._until.clear()
+        checks["other_worker_routes_by_header"] = "Nowy Pacjent" in await _names(
+            client, {**writer, **marker}
+        )
+
+        await asyncio.sleep(settings.READ_YOUR_WRITES_SECONDS + 0.1)
+        checks["writer_back_on_replica_after_window"] = "Nowy Pacjent" not in (
+            await _names(client, {**writer, **marker})
+        )
+
+        _replicate(primary_path, replica_paths)
+        checks["replica_caught_up"] = "Nowy Pacjent" in await _names(client, reader)
+
+        before = _checkouts()
+        for _ in range(reads):
+            (await client.get("/payments", headers=reader)).raise_for_status()
+        after = _checkouts()
+
+    return {
+        "checks": checks,
+        "passed": all(checks.values()),
+        "payments_reads": reads,
+        "checkouts_per_engine": {
+            name: after[name] - before.get(name, 0) for name in after
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--reads", type=int, default=200)
+    args = parser.parse_args()
+
+    database_url = use_benchmark_database("replica_primary")
+    replica_paths = _prepare_environment()
+    primary_path = database_url[len("sqlite:///") :]
+    print_report(asyncio.run(run(args.reads, primary_path, replica_paths)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+List payloads with long notes: full rows, previews and sparse fieldsets.
+
+Loads a practice with ``benchmarks.dataset``, then gives every session note
+``--note-kb`` kilobytes of content and every patient a long ``notes`` text.
+Requests each list variant ``--repeat`` times and reports the response
+size and median wall time:
+
+* ``/session_notes``: ``content=full``, the default preview, and
+  ``fields=id,patient_id,created_at``;
+* ``/patients``: every field and ``fields=name``.
+
+    python -m benchmarks.sparse_fields --note-kb 8
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    ensure_user,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import generate
+
+VARIANTS = {
+    "/session_notes": {
+        "full": {"content": "full"},
+        "preview": {},
+        "fields": {"fields": "id,patient_id,created_at"},
+    },
+    "/patients": {
+        "full": {},
+        "fields": {"fields": "name"},
+    },
+}
+
+
+def lengthen_notes(note_kb: int) -> None:
+    from sqlalchemy import update
+
+    from app.core.database import engine
+    from app.models.patient import Patient
+    from app.models.session_note import SessionNote
+
+    paragraph = "Pacjent opisuje przebieg tygodnia i postępy w terapii. "
+    text = (paragraph * (note_kb * 1024 // len(paragraph) + 1))[: note_kb * 1024]
+    with engine.begin() as conn:
+        conn.execute(update(SessionNote).values(content=text))
+        conn.execute(update(Patient).values(notes=text[:2048]))
+
+
+async def measure(client, path: str, params: dict, limit: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(path, params={"limit": limit, **params})
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return {
+        "rows": len(response.json()),
+        "kb": round(len(response.content) / 1024, 1),
+        "ms": round(statistics.median(timings) * 1000, 2),
+    }
+
+
+async def run(limit: int, repeat: int) -> dict:
+    from app.main import app
+
+    report = {}
+    async with asgi_client(app, headers=auth_headers()) as client:
+        await client.get("/patients", params={"limit": 1})
+        for path, variants in VARIANTS.items():
+            report[path] = {
+                name: await measure(client, path, params, limit, repeat)
+                for name, params in variants.items()
+            }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--patients", type=int, default=1_000)
+    parser.add_argument("--notes", type=int, default=5_000)
+    parser.add_argument("--note-kb", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    use_benchmark_database("sparse_fields")
+    ensure_user()
+    generate(
+        patients=args.patients,
+        appointments=args.notes,
+        payments=0,
+        notes=args.notes,
+    )
+    lengthen_notes(args.note_kb)
+    print_report(asyncio.run(run(args.limit, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
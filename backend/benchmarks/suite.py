@@ -0,0 +1,327 @@
+"""
+End-to-end benchmark of the API on a synthetic practice.
+
+Generates (or reuses, with ``--keep``) a dataset from ``benchmarks.dataset``
+and drives the app through workload mixes. Each mix iteration is one user
+action made of several requests:
+
+* ``dashboard``: patient list, today's appointments, recent payments and
+  this month's statistics;
+* ``calendar``: a random week of appointments, then one appointment;
+* ``payment_entry``: a patient's unpaid appointments, a payment for one of
+  them, then the payment detail;
+* ``statistics``: yearly statistics and a filtered payment listing.
+
+Requests go through the ASGI app in-process by default, or to a running
+server with ``--url``. The JSON report has throughput per mix and
+p50/p95/p99 per endpoint template. Compare two reports with
+``benchmarks.compare``.
+
+    python -m benchmarks.suite --preset medium --output before.json
+    python -m benchmarks.suite --preset medium --keep --output after.json
+    python -m benchmarks.compare before.json after.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from benchmarks.common import (
+    asgi_client,
+    auth_headers,
+    percentile,
+    print_report,
+    use_benchmark_database,
+)
+from benchmarks.dataset import add_size_arguments, ensure_dataset
+
+
+class Recorder:
+    """Latency and status of every request, keyed by endpoint template."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(
+        self, client: httpx.AsyncClient, template: str, method: str, url: str, **kwargs
+    ) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[f"{method} {template}"].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[f"{method} {template}"] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        requests = sum(len(values) for values in self.latencies.values())
+        return {
+            "requests": requests,
+            "errors": sum(self.errors.values()),
+            "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+            "endpoints": {
+                endpoint: {
+                    "requests": len(values),
+                    "errors": self.errors.get(endpoint, 0),
+                    "p50_ms": round(percentile(values, 50) * 1000, 2),
+                    "p95_ms": round(percentile(values, 95) * 1000, 2),
+                    "p99_ms": round(percentile(values, 99) * 1000, 2),
+                }
+                for endpoint, values in sorted(self.latencies.items())
+            },
+        }
+
+
+class Workload:
+    def __init__(self, bounds: dict, seed: int):
+        self.rng = random.Random(seed)
+        self.first_day = bounds["first_day"]
+        self.last_day = bounds["last_day"]
+        self.patients = bounds["patients"]
+        self.appointments = bounds["appointments"]
+
+    def _day(self) -> date:
+        span = (self.last_day - self.first_day).days
+        return self.first_day + timedelta(days=self.rng.randint(0, max(span - 7, 0)))
+
+    async def dashboard(self, client, record: Recorder) -> None:
+        today = self.last_day
+        await record.request(client, "/patients", "GET", "/patients", params={"limit": 50})
+        await record.request(
+            client,
+            "/appointments",
+            "GET",
+            "/appointments",
+            params={"date_from": today.isoformat(), "date_to": today.isoformat()},
+        )
+        await record.request(client, "/payments", "GET", "/payments", params={"limit": 20})
+        await record.request(
+            client,
+            "/payments/statistics/summary",
+            "GET",
+            "/payments/statistics/summary",
+            params={"date_from": today.replace(day=1).isoformat()},
+        )
+
+    async def calendar(self, client, record: Recorder) -> None:
+        monday = self._day()
+        response = await record.request(
+            client,
+            "/appointments",
+            "GET",
+            "/appointments",
+            params={
+                "date_from": monday.isoformat(),
+                "date_to": (monday + timedelta(days=6)).isoformat(),
+                "limit": 500,
+            },
+        )
+        appointments = response.json() if response.status_code == 200 else []
+        appointment_id = (
+            self.rng.choice(appointments)["id"]
+            if appointments
+            else self.rng.randint(1, self.appointments)
+        )
+        await record.request(
+            client,
+            "/appointments/{appointment_id}",
+            "GET",
+            f"/appointments/{appointment_id}",
+        )
+
+    async def payment_entry(self, client, record: Recorder) -> None:
+        patient_id = self.rng.randint(1, self.patients)
+        response = await record.request(
+            client,
+            "/payments/patient/{patient_id}/unpaid-appointments",
+            "GET",
+            f"/payments/patient/{patient_id}/unpaid-appointments",
+        )
+        unpaid = response.json() if response.status_code == 200 else []
+        if not unpaid:
+            return
+        response = await record.request(
+            client,
+            "/payments",
+            "POST",
+            "/payments",
+            json={
+                "patient_id": patient_id,
+                # Covers the highest price in the dataset
+                "amount": "200.00",
+                "payment_method": self.rng.choice(["CASH", "TRANSFER"]),
+                "appointment_ids": [self.rng.choice(unpaid)],
+            },
+        )
+        if response.status_code == 200:
+            payment_id = response.json()["id"]
+            await record.request(
+                client, "/payments/{payment_id}", "GET", f"/payments/{payment_id}"
+            )
+
+    async def statistics(self, client, record: Recorder) -> None:
+        year_start = self._day().replace(month=1, day=1)
+        year_end = year_start.replace(month=12, day=31)
+        await record.request(
+            client,
+            "/payments/statistics/summary",
+            "GET",
+            "/payments/statistics/summary",
+            params={"date_from": year_start.isoformat(), "date_to": year_end.isoformat()},
+        )
+        await record.request(
+            client,
+            "/payments",
+            "GET",
+            "/payments",
+            params={
+                "date_from": year_start.isoformat(),
+                "date_to": year_end.isoformat(),
+                "payment_method": "TRANSFER",
+                "limit": 100,
+            },
+        )
+
+    def mixes(self) -> Dict[str, Callable[..., Awaitable[None]]]:
+        return {
+            "dashboard": self.dashboard,
+            "calendar": self.calendar,
+            "payment_entry": self.payment_entry,
+            "statistics": self.statistics,
+        }
+
+
+async def run_mix(client, action, concurrency: int, iterations: int) -> dict:
+    record = Recorder()
+    remaining = iterations
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await action(client, record)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return record.report(time.perf_counter() - started)
+
+
+def dataset_bounds() -> dict:
+    from sqlalchemy import func
+
+    from app.core.database import SessionLocal
+    from app.models.appointment import Appointment
+    from app.models.patient import Patient
+
+    db = SessionLocal()
+    try:
+        first_day, last_day, appointments = db.query(
+            func.min(Appointment.date), func.max(Appointment.date), func.max(Appointment.id)
+        ).one()
+        patients = db.query(func.max(Patient.id)).scalar()
+    finally:
+        db.close()
+    return {
+        "first_day": first_day,
+        "last_day": last_day,
+        "appointments": appointments,
+        "patients": patients,
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_suite(args, bounds: dict) -> dict:
+    workload = Workload(bounds, args.seed)
+    mixes = workload.mixes()
+    selected = args.mix or list(mixes)
+
+    if args.url:
+        client = httpx.AsyncClient(
+            base_url=args.url, headers=auth_headers(), timeout=60.0
+        )
+    else:
+        from app.main import app
+
+        client = asgi_client(app, headers=auth_headers(), timeout=60.0)
+
+    results = {}
+    async with client:
+        for name in selected:
+            # Warm-up, not recorded
+            await run_mix(client, mixes[name], args.concurrency, args.concurrency)
+            results[name] = await run_mix(
+                client, mixes[name], args.concurrency, args.iterations
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_size_arguments(parser)
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="reuse the benchmark database if it already holds a dataset",
+    )
+    parser.add_argument(
+        "--mix", action="append", choices=["dashboard", "calendar", "payment_entry", "statistics"]
+    )
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200, help="actions per mix")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--url", help="benchmark a running server instead of the ASGI app")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    database_url = use_benchmark_database(f"suite_{args.preset}", fresh=not args.keep)
+    dataset = ensure_dataset(
+        args.preset,
+        patients=args.patients,
+        appointments=args.appointments,
+        payments=args.payments,
+        notes=args.notes,
+    )
+    bounds = dataset_bounds()
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "database": database_url.split("://", 1)[0],
+            "target": args.url or "asgi",
+            "preset": args.preset,
+            "dataset": dataset,
+            "concurrency": args.concurrency,
+            "iterations": args.iterations,
+        },
+        "mixes": asyncio.run(run_suite(args, bounds)),
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, ensure_ascii=False, default=str)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
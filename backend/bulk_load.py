@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Skrypt do szybkiego ładowania dużej ilości danych testowych.
+
+Generuje pacjentów, wizyty, notatki z sesji i płatności partiami. Na
+PostgreSQL dane trafiają do bazy przez COPY, na SQLite przez executemany,
+więc milion wizyt ładuje się w kilka minut zamiast godzin.
+
+    python bulk_load.py --preset large
+    python bulk_load.py --patients 2000 --appointments 200000
+"""
+
+import argparse
+
+from benchmarks.dataset import PRESETS, add_size_arguments, generate
+
+
+def bulk_load(preset: str, **overrides: int) -> None:
+    from app.core.database import SessionLocal
+    from app.core.security import get_password_hash
+    from app.core.startup import prepare_database
+    from app.models.patient import Patient
+    from app.models.user import User
+
+    prepare_database()
+
+    db = SessionLocal()
+    try:
+        if db.query(Patient.id).first() is not None:
+            print("❌ Baza danych zawiera już pacjentów. Ładowanie wymaga pustych tabel.")
+            return
+        if not db.query(User).filter(User.email == "terapeuta@example.com").first():
+            db.add(
+                User(
+                    email="terapeuta@example.com",
+                    hashed_password=get_password_hash("haslo123"),
+                )
+            )
+            db.commit()
+            print("✅ Utworzono użytkownika: terapeuta@example.com (hasło: haslo123)")
+    finally:
+        db.close()
+
+    sizes = dict(PRESETS[preset])
+    sizes.update({key: value for key, value in overrides.items() if value is not None})
+    print(
+        f"⏳ Ładowanie: {sizes['patients']} pacjentów, {sizes['appointments']} wizyt, "
+        f"ok. {sizes['payments']} płatności, ok. {sizes['notes']} notatek"
+    )
+    counts = generate(**sizes)
+    print(
+        f"✅ Załadowano {counts['appointments']} wizyt, {counts['payments']} płatności "
+        f"i {counts['notes']} notatek w {counts['seconds']} s ({counts['method']})"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_size_arguments(parser)
+    args = parser.parse_args()
+    bulk_load(
+        args.preset,
+        patients=args.patients,
+        appointments=args.appointments,
+        payments=args.payments,
+        notes=args.notes,
+    )
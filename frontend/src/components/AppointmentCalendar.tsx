@@ -30,14 +30,16 @@ import {
   DollarSign,
   FileText,
 } from "lucide-react";
-import { Appointment, Patient } from "../types";
-import { appointmentsApi, patientsApi, sessionNotesApi } from "../services/api";
+import { Appointment, CalendarAppointment } from "../types";
+import { appointmentsApi, sessionNotesApi } from "../services/api";
 import { toast } from "react-toastify";
 import AppointmentForm from "./AppointmentForm";
 import QuickSessionNoteForm from "./QuickSessionNoteForm";
 
-interface AppointmentWithPatient extends Appointment {
-  patient?: Patient;
+// A calendar entry with its day and patient, as the views below use it
+interface AppointmentWithPatient extends CalendarAppointment {
+  date: string;
+  patient: { id: number; name: string };
 }
 
 const AppointmentCalendar: React.FC = () => {
@@ -46,7 +48,6 @@ const AppointmentCalendar: React.FC = () => {
   const [appointments, setAppointments] = useState<AppointmentWithPatient[]>(
     [],
   );
-  const [_patients, setPatients] = useState<Patient[]>([]);
   const [loading, setLoading] = useState(true);
   const [viewMode, setViewMode] = useState<"month" | "week" | "day">("month");
   const [showAppointmentForm, setShowAppointmentForm] = useState(false);
@@ -64,24 +65,37 @@ const AppointmentCalendar: React.FC = () => {
   >(undefined);
 
   useEffect(() => {
-    fetchAppointmentsAndPatients();
-  }, []);
+    fetchAppointments();
+  }, [currentDate, viewMode]);
 
-  const fetchAppointmentsAndPatients = async () => {
+  // The month grid, or the week of the current day: one request per view
+  const getVisibleRange = () => {
+    const days = viewMode === "month" ? getMonthDays() : getWeekDays();
+    return [days[0], days[days.length - 1]];
+  };
+
+  // `loading` only covers the first load; switching periods keeps the
+  // previous view on screen until the next one arrives
+  const fetchAppointments = async () => {
     try {
-      setLoading(true);
-      const [appointmentsData, patientsData] = await Promise.all([
-        appointmentsApi.getAll(),
-        patientsApi.getAll(),
-      ]);
-
-      const appointmentsWithPatients = appointmentsData.map((appointment) => ({
-        ...appointment,
-        patient: patientsData.find((p) => p.id === appointment.patient_id),
-      }));
-
-      setAppointments(appointmentsWithPatients);
-      setPatients(patientsData);
+      const [from, to] = getVisibleRange();
+      const calendar = await appointmentsApi.getCalendar(
+        format(from, "yyyy-MM-dd"),
+        format(to, "yyyy-MM-dd"),
+      );
+
+      setAppointments(
+        calendar.days.flatMap((day) =>
+          day.appointments.map((appointment) => ({
+            ...appointment,
+            date: day.date,
+            patient: {
+              id: appointment.patient_id,
+              name: appointment.patient_name,
+            },
+          })),
+        ),
+      );
     } catch (error) {
       toast.error("Błąd podczas pobierania danych");
     } finally {
@@ -160,7 +174,7 @@ const AppointmentCalendar: React.FC = () => {
         toast.error("Błąd podczas przypisywania notatki do wizyty");
       }
     }
-    fetchAppointmentsAndPatients();
+    fetchAppointments();
     setShowQuickNoteForm(false);
     setNoteAppointment(null);
     setEditingNoteContent(undefined);
@@ -177,7 +191,7 @@ const AppointmentCalendar: React.FC = () => {
       try {
         await appointmentsApi.delete(id);
         toast.success("Wizyta została usunięta");
-        fetchAppointmentsAndPatients();
+        fetchAppointments();
       } catch (error) {
         toast.error("Błąd podczas usuwania wizyty");
       }
@@ -190,8 +204,14 @@ const AppointmentCalendar: React.FC = () => {
     setShowAppointmentForm(true);
   };
 
-  const handleEditAppointment = (appointment: Appointment) => {
-    setEditingAppointment(appointment);
+  const handleEditAppointment = async (appointment: AppointmentWithPatient) => {
+    try {
+      // Calendar entries are compact; the form needs the whole appointment
+      setEditingAppointment(await appointmentsApi.getById(appointment.id));
+    } catch (error) {
+      toast.error("Błąd podczas pobierania wizyty");
+      return;
+    }
     setFormPreselectedDate(undefined);
     setShowAppointmentForm(true);
   };
@@ -200,7 +220,7 @@ const AppointmentCalendar: React.FC = () => {
     setShowAppointmentForm(false);
     setEditingAppointment(undefined);
     setFormPreselectedDate(undefined);
-    fetchAppointmentsAndPatients();
+    fetchAppointments();
   };
 
   const renderMonthView = () => {
@@ -7,6 +7,7 @@ import {
   Patient,
   Appointment,
   SessionNote,
+  FreeSlot,
 } from "../types";
 import { appointmentsApi, patientsApi, sessionNotesApi } from "../services/api";
 import { toast } from "react-toastify";
@@ -26,9 +27,12 @@ const AppointmentForm: React.FC<AppointmentFormProps> = ({
   preselectedDate,
   preselectedPatientId,
 }) => {
-  const [patients, setPatients] = useState<Patient[]>([]);
+  const [patients, setPatients] = useState<Pick<Patient, "id" | "name">[]>(
+    [],
+  );
   const [sessionNotes, setSessionNotes] = useState<SessionNote[]>([]);
   const [loading, setLoading] = useState(false);
+  const [freeSlots, setFreeSlots] = useState<FreeSlot[]>([]);
 
   const {
     register,
@@ -74,7 +78,7 @@ const AppointmentForm: React.FC<AppointmentFormProps> = ({
 
   const fetchPatients = async () => {
     try {
-      const data = await patientsApi.getAll();
+      const data = await patientsApi.getAll(["name"]);
       setPatients(data);
     } catch (error) {
       toast.error("Błąd podczas pobierania listy pacjentów");
@@ -151,6 +155,20 @@ const AppointmentForm: React.FC<AppointmentFormProps> = ({
     }
   }, [watchStartTime, appointment, setValue]);
 
+  const watchDate = watch("date");
+
+  // Free time on the chosen day for a one-hour visit, the form's default
+  useEffect(() => {
+    if (!watchDate) {
+      setFreeSlots([]);
+      return;
+    }
+    appointmentsApi
+      .getFreeSlots(watchDate, watchDate, 60)
+      .then((data) => setFreeSlots(data.days[0]?.slots ?? []))
+      .catch(() => setFreeSlots([]));
+  }, [watchDate]);
+
   // Generate time options for select
   const timeOptions = [];
   for (let hour = 7; hour <= 20; hour++) {
@@ -220,6 +238,17 @@ const AppointmentForm: React.FC<AppointmentFormProps> = ({
             {errors.date && (
               <p className="text-red-500 text-sm mt-1">{errors.date.message}</p>
             )}
+            {freeSlots.length > 0 && (
+              <p className="text-gray-500 text-xs mt-1">
+                Wolne terminy:{" "}
+                {freeSlots
+                  .map(
+                    (slot) =>
+                      `${slot.start_time.slice(0, 5)}–${slot.end_time.slice(0, 5)}`,
+                  )
+                  .join(", ")}
+              </p>
+            )}
           </div>
 
           {/* Czas rozpoczęcia */}
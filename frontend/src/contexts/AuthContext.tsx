@@ -52,6 +52,9 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
     try {
       const response = await authApi.login(data);
       localStorage.setItem('access_token', response.access_token);
+      if (response.refresh_token) {
+        localStorage.setItem('refresh_token', response.refresh_token);
+      }
       localStorage.setItem('user_email', data.username);
       setUser({ id: 1, email: data.username, created_at: new Date().toISOString() });
       toast.success('Zalogowano pomyślnie!');
@@ -75,7 +78,12 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+      authApi.logout(refreshToken).catch(() => undefined);
+    }
     localStorage.removeItem('access_token');
+    localStorage.removeItem('refresh_token');
     localStorage.removeItem('user_email');
     setUser(null);
     toast.info('Wylogowano pomyślnie');
@@ -45,19 +45,18 @@ const Dashboard: React.FC = () => {
       const patients = await patientsApi.getAll();
       setRecentPatients(patients.slice(0, 5));
 
-      // Fetch appointments
-      const appointments = await appointmentsApi.getAll();
-
-      // Calculate stats
+      // Appointments of the coming week, today included
       const today = new Date().toISOString().split("T")[0];
       const nextWeek = new Date();
       nextWeek.setDate(nextWeek.getDate() + 7);
       const nextWeekStr = nextWeek.toISOString().split("T")[0];
+      const calendar = await appointmentsApi.getCalendar(today, nextWeekStr);
 
-      const todayAppts = appointments.filter((app) => app.date === today);
-      const weekAppts = appointments.filter(
-        (app) => app.date >= today && app.date <= nextWeekStr,
-      );
+      // Calculate stats
+      const todayAppts = calendar.days
+        .filter((day) => day.date === today)
+        .flatMap((day) => day.appointments);
+      const weekAppts = calendar.days.flatMap((day) => day.appointments);
 
       setStats({
         totalPatients: patients.length,
@@ -18,13 +18,8 @@ import {
 } from "lucide-react";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/Card";
 import { Button } from "@/components/ui/Button";
-import {
-  patientsApi,
-  appointmentsApi,
-  sessionNotesApi,
-  paymentsApi,
-} from "@/services/api";
-import { Patient, Appointment, SessionNote, PaymentWithPatient } from "@/types";
+import { patientsApi } from "@/services/api";
+import { Patient, PatientOverview } from "@/types";
 import { formatDate, formatTime, getInitials } from "@/lib/utils";
 import { toast } from "react-toastify";
 
@@ -32,9 +27,7 @@ const PatientDetail: React.FC = () => {
   const { id } = useParams();
   const navigate = useNavigate();
   const [patient, setPatient] = useState<Patient | null>(null);
-  const [appointments, setAppointments] = useState<Appointment[]>([]);
-  const [sessionNotes, setSessionNotes] = useState<SessionNote[]>([]);
-  const [payments, setPayments] = useState<PaymentWithPatient[]>([]);
+  const [overview, setOverview] = useState<PatientOverview | null>(null);
   const [loading, setLoading] = useState(true);
   const [deleting, setDeleting] = useState(false);
 
@@ -47,33 +40,9 @@ const PatientDetail: React.FC = () => {
   const fetchPatientData = async (patientId: number) => {
     try {
       setLoading(true);
-      const [patientData, appointmentsData, notesData, paymentsData] =
-        await Promise.all([
-          patientsApi.getById(patientId),
-          appointmentsApi.getAll(),
-          sessionNotesApi.getByPatient(patientId),
-          paymentsApi.getAll({ patient_id: patientId }),
-        ]);
-
-      setPatient(patientData);
-      // Filter appointments for this patient
-      const patientAppointments = appointmentsData.filter(
-        (apt) => apt.patient_id === patientId,
-      );
-      setAppointments(
-        patientAppointments.sort(
-          (a, b) =>
-            new Date(b.date + " " + b.start_time).getTime() -
-            new Date(a.date + " " + a.start_time).getTime(),
-        ),
-      );
-      setSessionNotes(
-        notesData.sort(
-          (a, b) =>
-            new Date(b.created_at).getTime() - new Date(a.created_at).getTime(),
-        ),
-      );
-      setPayments(paymentsData.payments);
+      const data = await patientsApi.getOverview(patientId);
+      setPatient(data.patient);
+      setOverview(data);
     } catch (error) {
       console.error("Error fetching patient data:", error);
       toast.error("Błąd podczas pobierania danych pacjenta");
@@ -107,37 +76,15 @@ const PatientDetail: React.FC = () => {
     }
   };
 
-  const getUpcomingAppointments = () => {
-    const now = new Date();
-    return appointments
-      .filter((apt) => {
-        const aptDate = new Date(apt.date + " " + apt.start_time);
-        return aptDate >= now;
-      })
-      .slice(0, 3);
-  };
-
-  const getPastAppointments = () => {
-    const now = new Date();
-    return appointments
-      .filter((apt) => {
-        const aptDate = new Date(apt.date + " " + apt.start_time);
-        return aptDate < now;
-      })
-      .slice(0, 3);
-  };
-
-  const getTotalPayments = () => {
-    return payments.reduce((sum, payment) => sum + payment.amount, 0);
-  };
-
-  const getPaidAppointments = () => {
-    return appointments.filter((apt) => apt.is_paid).length;
-  };
-
-  const getUnpaidAppointments = () => {
-    return appointments.filter((apt) => !apt.is_paid).length;
-  };
+  const stats = overview?.stats;
+  const sessionNotes = overview?.session_notes ?? [];
+  const payments = overview?.payments ?? [];
+  const upcomingAppointments =
+    overview?.upcoming_appointments.slice(0, 3) ?? [];
+  const pastAppointments = overview?.recent_appointments.slice(0, 3) ?? [];
+  const pastAppointmentsCount = stats
+    ? stats.appointments - stats.upcoming_appointments
+    : 0;
 
   const formatAmount = (amount: number) => {
     return new Intl.NumberFormat("pl-PL", {
@@ -236,10 +183,10 @@ const PatientDetail: React.FC = () => {
                 <div>
                   <p className="text-sm text-gray-500">Łączne płatności</p>
                   <p className="text-xl font-semibold">
-                    {formatAmount(getTotalPayments())}
+                    {formatAmount(Number(stats?.payments_amount ?? 0))}
                   </p>
                   <p className="text-xs text-gray-400">
-                    {payments.length} płatności
+                    {stats?.payments ?? 0} płatności
                   </p>
                 </div>
               </div>
@@ -250,10 +197,10 @@ const PatientDetail: React.FC = () => {
                 <div>
                   <p className="text-sm text-gray-500">Opłacone wizyty</p>
                   <p className="text-xl font-semibold">
-                    {getPaidAppointments()}
+                    {stats?.paid_appointments ?? 0}
                   </p>
                   <p className="text-xs text-gray-400">
-                    z {appointments.length} wizyt
+                    z {stats?.appointments ?? 0} wizyt
                   </p>
                 </div>
               </div>
@@ -264,7 +211,7 @@ const PatientDetail: React.FC = () => {
                 <div>
                   <p className="text-sm text-gray-500">Nieopłacone wizyty</p>
                   <p className="text-xl font-semibold">
-                    {getUnpaidAppointments()}
+                    {stats?.unpaid_appointments ?? 0}
                   </p>
                   <p className="text-xs text-gray-400">do opłacenia</p>
                 </div>
@@ -345,9 +292,9 @@ const PatientDetail: React.FC = () => {
             </CardTitle>
           </CardHeader>
           <CardContent>
-            {getUpcomingAppointments().length > 0 ? (
+            {upcomingAppointments.length > 0 ? (
               <div className="space-y-3">
-                {getUpcomingAppointments().map((appointment) => (
+                {upcomingAppointments.map((appointment) => (
                   <div
                     key={appointment.id}
                     className="p-3 border rounded-lg hover:bg-gray-50 cursor-pointer"
@@ -378,24 +325,13 @@ const PatientDetail: React.FC = () => {
                     )}
                   </div>
                 ))}
-                {appointments.filter(
-                  (apt) =>
-                    new Date(apt.date + " " + apt.start_time) >= new Date(),
-                ).length > 3 && (
+                {(stats?.upcoming_appointments ?? 0) > 3 && (
                   <Button
                     variant="link"
                     className="w-full"
                     onClick={() => navigate("/appointments")}
                   >
-                    Zobacz wszystkie (
-                    {
-                      appointments.filter(
-                        (apt) =>
-                          new Date(apt.date + " " + apt.start_time) >=
-                          new Date(),
-                      ).length
-                    }
-                    )
+                    Zobacz wszystkie ({stats?.upcoming_appointments})
                   </Button>
                 )}
               </div>
@@ -440,13 +376,13 @@ const PatientDetail: React.FC = () => {
                     </p>
                   </div>
                 ))}
-                {sessionNotes.length > 3 && (
+                {(stats?.session_notes ?? 0) > 3 && (
                   <Button
                     variant="link"
                     className="w-full"
                     onClick={() => navigate(`/notes/${patient.id}`)}
                   >
-                    Zobacz wszystkie ({sessionNotes.length})
+                    Zobacz wszystkie ({stats?.session_notes})
                   </Button>
                 )}
               </div>
@@ -514,7 +450,7 @@ const PatientDetail: React.FC = () => {
                   )}
                 </div>
               ))}
-              {payments.length > 5 && (
+              {(stats?.payments ?? 0) > 5 && (
                 <Button
                   variant="link"
                   className="w-full"
@@ -522,7 +458,7 @@ const PatientDetail: React.FC = () => {
                     navigate(`/payments?patient_id=${patient?.id}`)
                   }
                 >
-                  Zobacz wszystkie płatności ({payments.length})
+                  Zobacz wszystkie płatności ({stats?.payments})
                 </Button>
               )}
             </div>
@@ -535,7 +471,7 @@ const PatientDetail: React.FC = () => {
       </Card>
 
       {/* Past Appointments */}
-      {getPastAppointments().length > 0 && (
+      {pastAppointments.length > 0 && (
         <Card>
           <CardHeader>
             <CardTitle className="flex items-center">
@@ -545,7 +481,7 @@ const PatientDetail: React.FC = () => {
           </CardHeader>
           <CardContent>
             <div className="space-y-3">
-              {getPastAppointments().map((appointment) => (
+              {pastAppointments.map((appointment) => (
                 <div
                   key={appointment.id}
                   className="p-3 border rounded-lg hover:bg-gray-50 cursor-pointer"
@@ -589,22 +525,13 @@ const PatientDetail: React.FC = () => {
                   )}
                 </div>
               ))}
-              {appointments.filter(
-                (apt) => new Date(apt.date + " " + apt.start_time) < new Date(),
-              ).length > 3 && (
+              {pastAppointmentsCount > 3 && (
                 <Button
                   variant="link"
                   className="w-full"
                   onClick={() => navigate("/appointments")}
                 >
-                  Zobacz całą historię (
-                  {
-                    appointments.filter(
-                      (apt) =>
-                        new Date(apt.date + " " + apt.start_time) < new Date(),
-                    ).length
-                  }
-                  )
+                  Zobacz całą historię ({pastAppointmentsCount})
                 </Button>
               )}
             </div>
@@ -33,15 +33,27 @@ const Patients: React.FC = () => {
   }, []);
 
   useEffect(() => {
-    const filtered = patients.filter((patient) => {
-      const searchLower = searchQuery.toLowerCase();
-      return (
-        patient.name.toLowerCase().includes(searchLower) ||
-        patient.email?.toLowerCase().includes(searchLower) ||
-        patient.phone?.toLowerCase().includes(searchLower)
-      );
-    });
-    setFilteredPatients(filtered);
+    const query = searchQuery.trim();
+    if (!query) {
+      setFilteredPatients(patients);
+      return;
+    }
+    // Search on the server, once typing pauses
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const results = await patientsApi.search(query, 50);
+        if (!cancelled) {
+          setFilteredPatients(results);
+        }
+      } catch (error) {
+        console.error("Error searching patients:", error);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
   }, [searchQuery, patients]);
 
   const fetchPatients = async () => {
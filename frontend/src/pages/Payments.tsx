@@ -19,7 +19,9 @@ import LoadingSpinner from "../components/LoadingSpinner";
 
 const Payments: React.FC = () => {
   const [payments, setPayments] = useState<PaymentWithPatient[]>([]);
-  const [patients, setPatients] = useState<Patient[]>([]);
+  const [patients, setPatients] = useState<Pick<Patient, "id" | "name">[]>(
+    [],
+  );
   const [loading, setLoading] = useState(true);
   const [statistics, setStatistics] = useState<PaymentStatistics | null>(null);
   const [filters, setFilters] = useState({
@@ -72,7 +74,7 @@ const Payments: React.FC = () => {
 
       const [paymentsData, patientsData, statsData] = await Promise.all([
         paymentsApi.getAll(paymentsParams),
-        patientsApi.getAll(),
+        patientsApi.getAll(["name"]),
         paymentsApi.getStatistics(statsParams),
       ]);
 
@@ -1,4 +1,4 @@
-import axios, { AxiosError } from "axios";
+import axios, { AxiosError, InternalAxiosRequestConfig } from "axios";
 import { toast } from "react-toastify";
 import {
   AuthResponse,
@@ -7,8 +7,11 @@ import {
   User,
   Patient,
   PatientFormData,
+  PatientOverview,
   Appointment,
   AppointmentFormData,
+  Calendar,
+  FreeSlots,
   SessionNote,
   SessionNoteFormData,
   ApiError,
@@ -36,6 +39,10 @@ const api = axios.create({
   },
 });
 
+// Time of our last committed write, sent back so that whichever backend
+// worker serves the next read routes it to the primary database
+const LAST_WRITE_HEADER = "X-Last-Write";
+
 // Request interceptor to add auth token
 api.interceptors.request.use(
   (config) => {
@@ -43,6 +50,10 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    const lastWrite = localStorage.getItem("last_write");
+    if (lastWrite) {
+      config.headers[LAST_WRITE_HEADER] = lastWrite;
+    }
     return config;
   },
   (error) => {
@@ -50,13 +61,69 @@ api.interceptors.request.use(
   },
 );
 
+// Single in-flight refresh shared by all requests that hit an expired token
+let refreshPromise: Promise<string | null> | null = null;
+
+const refreshAccessToken = (): Promise<string | null> => {
+  const refreshToken = localStorage.getItem("refresh_token");
+  if (!refreshToken) {
+    return Promise.resolve(null);
+  }
+  if (!refreshPromise) {
+    refreshPromise = axios
+      .post<AuthResponse>(`${API_URL}/auth/refresh`, {
+        refresh_token: refreshToken,
+      })
+      .then((response) => {
+        localStorage.setItem("access_token", response.data.access_token);
+        if (response.data.refresh_token) {
+          localStorage.setItem("refresh_token", response.data.refresh_token);
+        }
+        return response.data.access_token;
+      })
+      .catch(() => {
+        localStorage.removeItem("refresh_token");
+        return null;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // Response interceptor for error handling
 api.interceptors.response.use(
-  (response) => response,
-  (error: AxiosError<ApiError>) => {
+  (response) => {
+    const lastWrite = response.headers[LAST_WRITE_HEADER.toLowerCase()];
+    if (lastWrite) {
+      localStorage.setItem("last_write", lastWrite);
+    }
+    return response;
+  },
+  async (error: AxiosError<ApiError>) => {
+    const originalRequest = error.config as
+      | (InternalAxiosRequestConfig & { _retried?: boolean })
+      | undefined;
+    if (
+      error.response?.status === 401 &&
+      originalRequest &&
+      !originalRequest._retried &&
+      !originalRequest.url?.startsWith("/auth/")
+    ) {
+      // Access token expired: renew it with the refresh token and retry once
+      originalRequest._retried = true;
+      const accessToken = await refreshAccessToken();
+      if (accessToken) {
+        originalRequest.headers.Authorization = `Bearer ${accessToken}`;
+        return api(originalRequest);
+      }
+    }
+
     if (error.response?.status === 401) {
       // Token expired or invalid
       localStorage.removeItem("access_token");
+      localStorage.removeItem("refresh_token");
       window.location.href = "/login";
       toast.error("Sesja wygasła. Zaloguj się ponownie.");
     } else if (error.response?.data?.detail) {
@@ -86,12 +153,28 @@ export const authApi = {
     const response = await api.post<User>("/auth/register", data);
     return response.data;
   },
+
+  logout: async (refreshToken: string): Promise<void> => {
+    await api.post("/auth/logout", { refresh_token: refreshToken });
+  },
 };
 
 // Patients endpoints
 export const patientsApi = {
-  getAll: async (): Promise<Patient[]> => {
-    const response = await api.get<Patient[]>("/patients");
+  // `fields` limits the response to those keys (plus `id`)
+  getAll: async <K extends keyof Patient = keyof Patient>(
+    fields?: K[],
+  ): Promise<Pick<Patient, K | "id">[]> => {
+    const response = await api.get<Pick<Patient, K | "id">[]>("/patients", {
+      params: fields ? { fields: fields.join(",") } : undefined,
+    });
+    return response.data;
+  },
+
+  search: async (q: string, limit = 20): Promise<Patient[]> => {
+    const response = await api.get<Patient[]>("/patients/search", {
+      params: { q, limit },
+    });
     return response.data;
   },
 
@@ -100,6 +183,13 @@ export const patientsApi = {
     return response.data;
   },
 
+  getOverview: async (id: number): Promise<PatientOverview> => {
+    const response = await api.get<PatientOverview>(
+      `/patients/${id}/overview`,
+    );
+    return response.data;
+  },
+
   create: async (data: PatientFormData): Promise<Patient> => {
     const response = await api.post<Patient>("/patients", data);
     return response.data;
@@ -125,6 +215,26 @@ export const appointmentsApi = {
     return response.data;
   },
 
+  // Appointments from `from` to `to` (inclusive, YYYY-MM-DD), grouped by day
+  getCalendar: async (from: string, to: string): Promise<Calendar> => {
+    const response = await api.get<Calendar>("/appointments/calendar", {
+      params: { from, to },
+    });
+    return response.data;
+  },
+
+  // Gaps in the working hours that fit a visit of `duration` minutes
+  getFreeSlots: async (
+    from: string,
+    to: string,
+    duration: number,
+  ): Promise<FreeSlots> => {
+    const response = await api.get<FreeSlots>("/appointments/free-slots", {
+      params: { from, to, duration },
+    });
+    return response.data;
+  },
+
   getById: async (id: number): Promise<Appointment> => {
     const response = await api.get<Appointment>(`/appointments/${id}`);
     return response.data;
@@ -17,6 +17,7 @@ export interface RegisterData {
 export interface AuthResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string;
 }
 
 export interface Patient {
@@ -26,6 +27,7 @@ export interface Patient {
   email?: string;
   notes?: string;
   created_at: string;
+  updated_at?: string;
 }
 
 export interface PatientFormData {
@@ -46,6 +48,45 @@ export interface Appointment {
   is_paid: boolean;
   price?: number;
   created_at: string;
+  updated_at?: string;
+}
+
+// One visit in /appointments/calendar
+export interface CalendarAppointment {
+  id: number;
+  start_time: string;
+  end_time: string;
+  patient_id: number;
+  patient_name: string;
+  is_paid: boolean;
+  price?: number;
+  // Absent when the visit has no session note
+  session_note_id?: number;
+}
+
+export interface CalendarDay {
+  date: string;
+  appointments: CalendarAppointment[];
+}
+
+export interface Calendar {
+  date_from: string;
+  date_to: string;
+  // Only days with appointments
+  days: CalendarDay[];
+}
+
+export interface FreeSlot {
+  start_time: string;
+  end_time: string;
+}
+
+export interface FreeSlots {
+  date_from: string;
+  date_to: string;
+  duration: number;
+  // Only working days with a free slot
+  days: { date: string; slots: FreeSlot[] }[];
 }
 
 export interface AppointmentFormData {
@@ -62,7 +103,9 @@ export interface AppointmentFormData {
 export interface SessionNote {
   id: number;
   patient_id: number;
+  // Only the start of the note in lists, unless fetched with content=full
   content: string;
+  content_truncated?: boolean;
   created_at: string;
 }
 
@@ -115,6 +158,27 @@ export interface PaymentFormData {
   description?: string;
 }
 
+export interface PatientStats {
+  appointments: number;
+  upcoming_appointments: number;
+  paid_appointments: number;
+  unpaid_appointments: number;
+  unpaid_amount: number;
+  payments: number;
+  payments_amount: number;
+  session_notes: number;
+}
+
+export interface PatientOverview {
+  patient: Patient;
+  stats: PatientStats;
+  upcoming_appointments: Appointment[];
+  recent_appointments: Appointment[];
+  recent_appointments_next_cursor?: string;
+  session_notes: SessionNote[];
+  payments: Payment[];
+}
+
 export interface PaymentListResponse {
   total: number;
   payments: PaymentWithPatient[];